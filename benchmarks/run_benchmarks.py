@@ -0,0 +1,177 @@
+"""
+Time every public Graph and WeightedGraph algorithm on seeded synthetic
+graphs, record peak memory, and compare the results against a baseline.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run_benchmarks --size 2000 --output results.json
+    python -m benchmarks.run_benchmarks --baseline results.json
+
+Each case is timed `--repeat` times and the best time is kept, then run once
+more under tracemalloc to measure its peak memory. With --baseline, any case
+slower than the baseline by more than --tolerance is reported, and the exit
+status is 1.
+"""
+import argparse
+import fnmatch
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from graphs.components import STRONG, WEAK
+from graphs.landmarks import LandmarkIndex
+from util import graph_generators
+
+
+def build_graphs(size, seed):
+    """Generate one graph of each family, with about `size` vertices each."""
+    side = max(2, int(size ** 0.5))
+    return {
+        'er': graph_generators.erdos_renyi(size, 8 / size, seed),
+        'er_directed': graph_generators.erdos_renyi(size, 8 / size, seed, is_directed=True),
+        'ba': graph_generators.barabasi_albert(size, 4, seed),
+        'grid': graph_generators.grid(side, side, seed),
+        'dag': graph_generators.random_dag(size, 8 / size, seed),
+        'er_weighted': graph_generators.erdos_renyi(size, 8 / size, seed, weights=(1.0, 10.0)),
+        'grid_weighted': graph_generators.grid(side, side, seed, weights=(1.0, 10.0)),
+        # all-pairs algorithms are cubic, so they get a much smaller graph
+        'er_weighted_small': graph_generators.erdos_renyi(min(size, 150), 0.05, seed, weights=(1.0, 10.0)),
+    }
+
+
+def build_cases(graphs):
+    """
+    Return the benchmark cases as a dictionary of name -> zero-argument
+    callable. Queries run between vertices far apart in each graph.
+    """
+    last = {name: len(graph.get_vertices()) - 1 for name, graph in graphs.items()}
+    er, ba, grid, dag = graphs['er'], graphs['ba'], graphs['grid'], graphs['dag']
+    er_directed = graphs['er_directed']
+    er_weighted, grid_weighted = graphs['er_weighted'], graphs['grid_weighted']
+    small = graphs['er_weighted_small']
+    landmarks = LandmarkIndex.build(grid_weighted, k=8, seed=0)
+
+    return {
+        'graph.bfs_traversal[er]': lambda: er.bfs_traversal(0),
+        'graph.find_shortest_path[er]': lambda: er.find_shortest_path(0, last['er']),
+        'graph.find_shortest_path_bidirectional[er]': lambda: er.find_shortest_path(0, last['er'], bidirectional=True),
+        'graph.find_shortest_path[grid]': lambda: grid.find_shortest_path(0, last['grid']),
+        'graph.find_vertices_n_away[ba]': lambda: ba.find_vertices_n_away(0, 3),
+        'graph.find_vertices_n_away_many[ba]': lambda: ba.find_vertices_n_away_many(range(0, last['ba'], 8), 3),
+        'graph.find_path_dfs_iter[er]': lambda: er.find_path_dfs_iter(0, last['er']),
+        'graph.iter_dfs[ba]': lambda: list(ba.iter_dfs(0)),
+        'graph.find_connected_components[er_directed,weak]': lambda: er_directed.find_connected_components(WEAK),
+        'graph.find_connected_components[er_directed,strong]': lambda: er_directed.find_connected_components(STRONG),
+        'graph.find_bipartition[grid]': lambda: grid.find_bipartition(),
+        'graph.contains_cycle[dag]': lambda: dag.contains_cycle(),
+        'graph.topological_sort[dag,dfs]': lambda: dag.topological_sort(),
+        'graph.topological_sort[dag,kahn]': lambda: dag.topological_sort(method='kahn'),
+        'graph.compile[er]': lambda: er.compile(),
+        'graph.page_rank[ba]': lambda: ba.page_rank(),
+        'graph.k_hop_reachable[ba]': lambda: ba.k_hop_reachable([0], 3),
+        'compact.bfs_traversal[er]': (lambda compact: lambda: compact.bfs_traversal(0))(er.compile()),
+        'weighted.find_shortest_path[er_weighted]': lambda: er_weighted.find_shortest_path(0, last['er_weighted']),
+        'weighted.find_shortest_route[grid_weighted]': lambda: grid_weighted.find_shortest_route(0, last['grid_weighted']),
+        'weighted.find_all_distances[er_weighted]': lambda: er_weighted.find_all_distances(0),
+        'weighted.astar_euclidean[grid_weighted]':
+            lambda: grid_weighted.astar_shortest_path(0, last['grid_weighted'], 'euclidean'),
+        'weighted.astar_landmarks[grid_weighted]':
+            lambda: grid_weighted.astar_shortest_path(0, last['grid_weighted'], landmarks),
+        'weighted.build_landmark_index[grid_weighted]': lambda: LandmarkIndex.build(grid_weighted, k=8, seed=0),
+        'weighted.minimum_spanning_tree_kruskal[er_weighted]': lambda: er_weighted.minimum_spanning_forest('kruskal'),
+        'weighted.minimum_spanning_tree_prim[er_weighted]': lambda: er_weighted.minimum_spanning_forest('prim'),
+        'weighted.floyd_warshall[er_weighted_small,python]':
+            lambda: small.all_pairs_shortest_paths(use_numpy=False),
+        'weighted.floyd_warshall[er_weighted_small]': lambda: small.floyd_warshall(),
+    }
+
+
+def measure(case, repeat):
+    """
+    Time a benchmark case and measure its peak memory.
+    Returns:
+    dict: best and mean wall time in seconds, and peak traced memory in bytes.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        case()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds': min(times), 'mean_seconds': sum(times) / len(times), 'peak_bytes': peak}
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results against a baseline of the same format.
+    Returns:
+    list<string>: The names of the cases more than `tolerance` (a fraction) slower.
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        before = baseline.get(name)
+        if before is None:
+            print(f'{name:70} new')
+            continue
+        ratio = result['seconds'] / before['seconds'] if before['seconds'] else float('inf')
+        flag = ''
+        if ratio > 1 + tolerance:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f'{name:70} {ratio:6.2f}x{flag}')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=1000, help='approximate vertex count of each graph')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the graph generators')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per case; the best is kept')
+    parser.add_argument('--only', default='*', help='run only the cases matching this glob pattern')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare against the results in this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown against the baseline')
+    args = parser.parse_args(argv)
+
+    cases = build_cases(build_graphs(args.size, args.seed))
+    results = {}
+    for name, case in cases.items():
+        if fnmatch.fnmatchcase(name, args.only):
+            results[name] = measure(case, args.repeat)
+            print(f"{name:70} {results[name]['seconds'] * 1000:10.3f} ms "
+                  f"{results[name]['peak_bytes'] / 1024:10.1f} KiB")
+
+    report = {
+        'meta': {
+            'size': args.size,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.baseline} (size {baseline['meta']['size']}):")
+        if compare(results, baseline['results'], args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,270 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to plain Python lists
+    np = None
+
+from graphs import instrumentation
+
+INFINITY = float('inf')
+NO_PREDECESSOR = -1
+
+
+class AllPairsShortestPaths:
+    """ AllPairsShortestPaths Class
+    The result of an all-pairs shortest path run: a dense V x V distance
+    matrix plus a predecessor matrix, where predecessors[i][j] is the vertex
+    just before j on a shortest path from i (or -1 if there is none).
+
+    `result[a][b]` reads the distance between two vertex ids, like the
+    dictionary returned by WeightedGraph.floyd_warshall. The matrices are
+    read-only, so one result can be shared, e.g. by the query cache.
+    """
+
+    def __init__(self, vertex_ids, distances, predecessors):
+        """
+        Parameters:
+        vertex_ids (list): The vertex id for each matrix row/column.
+        distances: V x V matrix (NumPy array or list of lists) of distances.
+        predecessors: V x V matrix of predecessor indices.
+        The matrices are made read-only: NumPy arrays in place, and lists
+        of lists are converted to tuples of tuples.
+        """
+        self.__vertex_ids = vertex_ids
+        self.__index = {vertex_id: i for i, vertex_id in enumerate(vertex_ids)}
+        self.__distances = _read_only(distances)
+        self.__predecessors = _read_only(predecessors)
+
+    def __getitem__(self, vertex_id):
+        """Return a dictionary of vertex id -> distance from vertex_id."""
+        row = self.__distances[self.__index[vertex_id]]
+        if np is not None and isinstance(row, np.ndarray):
+            row = row.tolist()
+        return dict(zip(self.__vertex_ids, row))
+
+    def __contains__(self, vertex_id):
+        return vertex_id in self.__index
+
+    def __iter__(self):
+        return iter(self.__vertex_ids)
+
+    def __len__(self):
+        return len(self.__vertex_ids)
+
+    def get_vertex_ids(self):
+        """Return the vertex ids, in matrix order."""
+        return list(self.__vertex_ids)
+
+    def get_distance_matrix(self):
+        """Return the raw, read-only distance matrix, in the order of get_vertex_ids()."""
+        return self.__distances
+
+    def get_predecessor_matrix(self):
+        """Return the raw, read-only predecessor matrix, in the order of get_vertex_ids()."""
+        return self.__predecessors
+
+    def distance(self, start_id, target_id):
+        """Return the shortest distance from start_id to target_id (inf if unreachable)."""
+        return float(self.__distances[self.__index[start_id]][self.__index[target_id]])
+
+    def path(self, start_id, target_id):
+        """
+        Return the vertex ids on a shortest path from start_id to target_id,
+        or None if the target cannot be reached.
+        """
+        start = self.__index[start_id]
+        current = self.__index[target_id]
+        if self.__distances[start][current] == INFINITY:
+            return None
+
+        path = [current]
+        while current != start:
+            current = int(self.__predecessors[start][current])
+            path.append(current)
+            if len(path) > len(self.__vertex_ids):
+                raise RuntimeError(f'The predecessors from {start_id!r} to {target_id!r} form a cycle')
+        path.reverse()
+        return [self.__vertex_ids[i] for i in path]
+
+    def to_dict(self):
+        """
+        Return the distances as a dictionary of dictionaries, so that
+        `to_dict()[a][b]` is the distance from a to b.
+        """
+        return {vertex_id: self[vertex_id] for vertex_id in self.__vertex_ids}
+
+
+def _read_only(matrix):
+    """Return a matrix that cannot be modified: a read-only array, or a tuple of tuples."""
+    if np is not None and isinstance(matrix, np.ndarray):
+        matrix.setflags(write=False)
+        return matrix
+    return tuple(tuple(row) for row in matrix)
+
+
+def floyd_warshall(compact_graph, block_size=None, use_numpy=None):
+    """
+    Compute shortest paths between every pair of vertices.
+    Parameters:
+    compact_graph (CompactGraph): The graph, with or without weights.
+    block_size (integer): If given (and NumPy is used), relax the matrix in
+    square tiles of this size (e.g. 256) so each step works on cache-sized
+    blocks. Graphs with a weight of 0 or less are relaxed without tiles.
+    use_numpy (boolean): Force the NumPy (True) or pure Python (False)
+    implementation. By default NumPy is used when it is installed.
+    Returns:
+    AllPairsShortestPaths: The distance and predecessor matrices.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise ImportError('NumPy is required for use_numpy=True')
+
+    compact_graph.compact()  # the matrices are indexed by dense vertex indices
+    vertex_ids = compact_graph.get_vertex_ids()
+    if use_numpy:
+        distances, predecessors = _initial_matrices_numpy(compact_graph)
+        if block_size:
+            _relax_blocked_numpy(distances, predecessors, block_size)
+        else:
+            _relax_numpy(distances, predecessors)
+    else:
+        distances, predecessors = _initial_matrices_python(compact_graph)
+        _relax_python(distances, predecessors)
+
+    return AllPairsShortestPaths(vertex_ids, distances, predecessors)
+
+
+def _initial_matrices_python(compact_graph):
+    """Build the starting distance/predecessor matrices as lists of lists."""
+    vertex_count = len(compact_graph)
+    distances = [[INFINITY] * vertex_count for _ in range(vertex_count)]
+    predecessors = [[NO_PREDECESSOR] * vertex_count for _ in range(vertex_count)]
+    for i in range(vertex_count):
+        distances[i][i] = 0
+        predecessors[i][i] = i
+    for source, target, weight in compact_graph.iter_edges():
+        if weight < distances[source][target]:
+            distances[source][target] = weight
+            predecessors[source][target] = source
+    return distances, predecessors
+
+
+def _relax_python(distances, predecessors):
+    """Run the Floyd-Warshall relaxation in place over lists of lists."""
+    vertex_count = len(distances)
+    stats = instrumentation.current()
+    for k in range(vertex_count):
+        row_k = distances[k]
+        predecessors_k = predecessors[k]
+        relaxations = 0
+        for i in range(vertex_count):
+            distance_ik = distances[i][k]
+            if distance_ik == INFINITY:
+                continue  # nothing reaches k from i, so row i cannot improve
+            row_i = distances[i]
+            predecessors_i = predecessors[i]
+            for j, distance_kj in enumerate(row_k):
+                if distance_ik + distance_kj < row_i[j]:
+                    row_i[j] = distance_ik + distance_kj
+                    predecessors_i[j] = predecessors_k[j]
+                    relaxations += 1
+        if stats is not None:
+            # each pivot is one vertex expansion, examining every pair through it
+            stats.visit_many(1, vertex_count * vertex_count)
+            stats.relaxations += relaxations
+
+
+def _initial_matrices_numpy(compact_graph):
+    """Build the starting distance/predecessor matrices as NumPy arrays."""
+    vertex_count = len(compact_graph)
+    distances = np.full((vertex_count, vertex_count), INFINITY)
+    predecessors = np.full((vertex_count, vertex_count), NO_PREDECESSOR, dtype=np.int64)
+    np.fill_diagonal(distances, 0)
+    np.fill_diagonal(predecessors, np.arange(vertex_count))
+    for source, target, weight in compact_graph.iter_edges():
+        if weight < distances[source, target]:
+            distances[source, target] = weight
+            predecessors[source, target] = source
+    return distances, predecessors
+
+
+def _relax_numpy(distances, predecessors):
+    """
+    Run the Floyd-Warshall relaxation in place, one vectorized update per k:
+    every row i is relaxed through k at once by broadcasting column k against row k.
+    """
+    candidate = np.empty_like(distances)
+    improved = np.empty(distances.shape, dtype=bool)
+    stats = instrumentation.current()
+    for k in range(distances.shape[0]):
+        np.add(distances[:, k, None], distances[None, k, :], out=candidate)
+        np.less(candidate, distances, out=improved)
+        np.copyto(distances, candidate, where=improved)
+        np.copyto(predecessors, predecessors[None, k, :], where=improved)
+        if stats is not None:
+            stats.visit_many(1, distances.size)
+            stats.relaxations += int(np.count_nonzero(improved))
+
+
+def _relax_tile(distances, predecessors, rows, columns, pivots, candidate, improved, stats):
+    """
+    Relax the tile distances[rows, columns] in place through each pivot k in
+    turn. The tile and the scratch buffers stay in cache across the pivots.
+    """
+    tile = distances[rows, columns]
+    tile_predecessors = predecessors[rows, columns]
+    candidate = candidate[:tile.shape[0], :tile.shape[1]]
+    improved = improved[:tile.shape[0], :tile.shape[1]]
+    for k in range(pivots.start, pivots.stop):
+        np.add(distances[rows, k, None], distances[None, k, columns], out=candidate)
+        np.less(candidate, tile, out=improved)
+        np.copyto(tile, candidate, where=improved)
+        np.copyto(tile_predecessors, predecessors[None, k, columns], where=improved)
+        if stats is not None:
+            stats.relaxations += int(np.count_nonzero(improved))
+    if stats is not None:
+        stats.visit_many(0, tile.size * (pivots.stop - pivots.start))
+
+
+def _relax_blocked_numpy(distances, predecessors, block_size):
+    """
+    Run the blocked (tiled) Floyd-Warshall relaxation in place.
+
+    For each diagonal block of pivots K: relax the K x K tile, then the
+    tiles in K's rows and columns, then every other tile, each through the
+    pivots of K in turn. Each tile is updated block_size times while it is
+    in cache, instead of the whole matrix streaming through memory once per
+    pivot.
+
+    Relaxing out of the sequential pivot order is only safe for the
+    predecessors when every edge weight is positive, so that each
+    predecessor is strictly closer than the vertex after it. Otherwise
+    equal-cost routes (zero-weight edges) could leave predecessors pointing
+    at each other, so such graphs get the sequential relaxation instead.
+    """
+    vertex_count = distances.shape[0]
+    if np.count_nonzero(distances <= 0) > vertex_count:  # a weight <= 0 besides the zero diagonal
+        _relax_numpy(distances, predecessors)
+        return
+
+    blocks = [slice(start, min(start + block_size, vertex_count))
+              for start in range(0, vertex_count, block_size)]
+    size = min(block_size, vertex_count)
+    candidate = np.empty((size, size))
+    improved = np.empty((size, size), dtype=bool)
+    stats = instrumentation.current()
+
+    for pivots in blocks:
+        if stats is not None:
+            stats.visit_many(pivots.stop - pivots.start, 0)
+        _relax_tile(distances, predecessors, pivots, pivots, pivots, candidate, improved, stats)
+        for other in blocks:
+            if other != pivots:
+                _relax_tile(distances, predecessors, pivots, other, pivots, candidate, improved, stats)
+                _relax_tile(distances, predecessors, other, pivots, pivots, candidate, improved, stats)
+        for rows in blocks:
+            if rows == pivots:
+                continue
+            for columns in blocks:
+                if columns != pivots:
+                    _relax_tile(distances, predecessors, rows, columns, pivots, candidate, improved, stats)
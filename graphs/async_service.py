@@ -0,0 +1,271 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from time import perf_counter
+
+from graphs import instrumentation
+from graphs.instrumentation import AlgorithmStats, DeadlineExceeded
+
+
+class ReadWriteLock:
+    """ ReadWriteLock Class
+    Lets any number of readers share the lock, or one writer hold it alone.
+    Waiting writers block new readers, so a stream of queries cannot starve
+    mutations.
+    """
+
+    def __init__(self):
+        self.__condition = threading.Condition()
+        self.__readers = 0
+        self.__writing = False
+        self.__writers_waiting = 0
+
+    def acquire_read(self):
+        with self.__condition:
+            while self.__writing or self.__writers_waiting:
+                self.__condition.wait()
+            self.__readers += 1
+
+    def release_read(self):
+        with self.__condition:
+            self.__readers -= 1
+            if not self.__readers:
+                self.__condition.notify_all()
+
+    def acquire_write(self):
+        with self.__condition:
+            self.__writers_waiting += 1
+            while self.__writing or self.__readers:
+                self.__condition.wait()
+            self.__writers_waiting -= 1
+            self.__writing = True
+
+    def release_write(self):
+        with self.__condition:
+            self.__writing = False
+            self.__condition.notify_all()
+
+
+class _Job:
+    """One running query, shared by every caller that asked for it while it ran."""
+
+    def __init__(self, future, stats):
+        self.future = future  # settled with the query's result by its task
+        self.stats = stats  # its deadline is the latest of the waiters' deadlines
+        self.waiters = 0
+        self.task = None  # the asyncio.Task running the query
+        self.running = False  # False while the task waits for a slot
+
+
+def _retrieve_exception(future):
+    """Mark a job's failure as retrieved, so failures nobody waited for are not logged."""
+    if not future.cancelled():
+        future.exception()
+
+
+class AsyncGraphService:
+    """ AsyncGraphService Class
+    An asyncio front-end for a Graph or WeightedGraph.
+
+    Queries run on a bounded thread pool, so the event loop is never blocked.
+    Identical queries asked while one is already running share its result
+    instead of searching again. Each request may have a timeout; a search
+    whose every caller has given up is stopped at its next vertex expansion,
+    through its instrumentation stats. Mutations go through the service
+    too, and wait for running queries to finish (and block new ones) while
+    they change the graph. Close the service with `aclose()` (or an
+    `async with` block) from inside the event loop.
+    """
+
+    def __init__(self, graph, max_workers=4, max_pending=None, default_timeout=None):
+        """
+        Parameters:
+        graph (Graph): The graph to serve.
+        max_workers (integer): The number of worker threads.
+        max_pending (integer): The most queries to queue or run at once;
+        further requests wait for a free slot. Defaults to 4 * max_workers.
+        default_timeout (number): Seconds allowed per request when none is given.
+        """
+        self.__graph = graph
+        self.__executor = ThreadPoolExecutor(max_workers, thread_name_prefix='graph-query')
+        self.__slots = None  # asyncio.Semaphore, created inside the running loop
+        self.__max_pending = max_pending or 4 * max_workers
+        self.__lock = ReadWriteLock()
+        self.__in_flight = {}  # (graph version, method name, arguments) -> _Job
+        self.__jobs = set()  # every unsettled _Job, shared or not
+        self.__default_timeout = default_timeout
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Fail the queries still waiting for a slot, then shut down the worker
+        threads once the running queries finish, without blocking the loop.
+        """
+        tasks = self.__abandon_queued()
+        await asyncio.get_running_loop().run_in_executor(None, self.__executor.shutdown)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self):
+        """
+        Fail the queries still waiting for a slot and shut down the worker
+        threads, blocking until the running queries finish. Inside an event
+        loop, use aclose instead.
+        """
+        self.__abandon_queued()
+        self.__executor.shutdown(wait=True)
+
+    def __abandon_queued(self):
+        """Settle every job still waiting for a slot; return the tasks of all unsettled jobs."""
+        tasks = [job.task for job in self.__jobs]
+        queued = {job for job in self.__jobs if not job.running}
+        for job in queued:
+            if not job.future.done():
+                job.future.set_exception(RuntimeError('AsyncGraphService was closed'))
+            job.task.cancel()  # a task cancelled before it starts never reaches its finally
+        self.__jobs -= queued
+        self.__in_flight = {key: job for key, job in self.__in_flight.items() if job not in queued}
+        return tasks
+
+    async def query(self, method_name, *args, timeout=None, **kwargs):
+        """
+        Run any graph query method in a worker thread and return its result.
+        Parameters:
+        method_name (string): The name of the graph method, e.g. 'find_shortest_path'.
+        timeout (number): Seconds to wait before raising DeadlineExceeded;
+        defaults to the service's default_timeout (None waits forever).
+        Other arguments are passed to the method.
+        """
+        if timeout is None:
+            timeout = self.__default_timeout
+        deadline = None if timeout is None else perf_counter() + timeout
+
+        key = (self.__graph._version, method_name, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            key = None  # unhashable arguments: never shared
+
+        job = self.__in_flight.get(key) if key is not None else None
+        if job is None:
+            job = self.__start(key, method_name, args, kwargs, deadline)
+        elif job.stats.deadline is not None:
+            job.stats.deadline = None if deadline is None else max(job.stats.deadline, deadline)
+
+        job.waiters += 1
+        try:
+            remaining = None if deadline is None else max(0, deadline - perf_counter())
+            return await asyncio.wait_for(asyncio.shield(job.future), remaining)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f'{method_name} did not finish within {timeout} seconds') from None
+        finally:
+            job.waiters -= 1
+            if not job.waiters and not job.future.done():
+                job.stats.deadline = 0  # nobody is waiting: stop the search
+                self.__forget(key, job)  # and let later callers start afresh
+
+    def __start(self, key, method_name, args, kwargs, deadline):
+        """
+        Register a query as in flight, then run it once a slot is free.
+        It is registered before waiting for the slot, so identical queries
+        asked meanwhile still share it.
+        """
+        loop = asyncio.get_running_loop()
+        stats = AlgorithmStats(f'{type(self.__graph).__name__}.{method_name}', args, deadline)
+        method = partial(getattr(self.__graph, method_name), *args, **kwargs)
+        job = _Job(loop.create_future(), stats)
+        job.future.add_done_callback(_retrieve_exception)
+
+        if key is not None:
+            self.__in_flight[key] = job
+        self.__jobs.add(job)
+        job.task = loop.create_task(self.__run(key, job, method))
+        return job
+
+    async def __run(self, key, job, method):
+        """Wait for a slot, run the query in the thread pool and settle its job."""
+        if self.__slots is None:
+            self.__slots = asyncio.Semaphore(self.__max_pending)
+        try:
+            async with self.__slots:
+                job.running = True
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self.__executor, self.__read, method, job.stats)
+        except asyncio.CancelledError:
+            if not job.future.done():
+                job.future.cancel()
+            raise
+        except Exception as error:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+        finally:
+            self.__forget(key, job)
+            self.__jobs.discard(job)
+
+    def __forget(self, key, job):
+        """Stop sharing a job with new callers."""
+        if key is not None and self.__in_flight.get(key) is job:
+            del self.__in_flight[key]
+
+    def __read(self, method, stats):
+        """Worker thread: run a query under the read lock, counting into stats."""
+        self.__lock.acquire_read()
+        try:
+            with instrumentation.track(stats):
+                return method()
+        finally:
+            self.__lock.release_read()
+
+    def __write(self, method):
+        """Worker thread: run a mutation under the write lock."""
+        self.__lock.acquire_write()
+        try:
+            return method()
+        finally:
+            self.__lock.release_write()
+
+    async def mutate(self, method_name, *args, **kwargs):
+        """
+        Run a graph mutation method (e.g. 'add_edge') once every running query
+        has finished, while no new query may start, and return its result.
+        """
+        method = partial(getattr(self.__graph, method_name), *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self.__executor, self.__write, method)
+
+    async def find_shortest_path(self, start_id, target_id, timeout=None):
+        """Awaitable `find_shortest_path`; see Graph and WeightedGraph."""
+        return await self.query('find_shortest_path', start_id, target_id, timeout=timeout)
+
+    async def find_shortest_route(self, start_id, target_id, timeout=None):
+        """Awaitable `WeightedGraph.find_shortest_route`."""
+        return await self.query('find_shortest_route', start_id, target_id, timeout=timeout)
+
+    async def find_vertices_n_away(self, start_id, target_distance, timeout=None):
+        """Awaitable `find_vertices_n_away`."""
+        return await self.query('find_vertices_n_away', start_id, target_distance, timeout=timeout)
+
+    async def bfs_traversal(self, start_id, timeout=None):
+        """Awaitable `bfs_traversal`."""
+        return await self.query('bfs_traversal', start_id, timeout=timeout)
+
+    async def add_vertex(self, vertex_id):
+        """Awaitable `add_vertex`, run under the write lock."""
+        return await self.mutate('add_vertex', vertex_id)
+
+    async def add_edge(self, *args):
+        """Awaitable `add_edge` (with a weight for a WeightedGraph), run under the write lock."""
+        return await self.mutate('add_edge', *args)
+
+    async def remove_edge(self, vertex_id1, vertex_id2):
+        """Awaitable `remove_edge`, run under the write lock."""
+        return await self.mutate('remove_edge', vertex_id1, vertex_id2)
+
+    async def remove_vertex(self, vertex_id):
+        """Awaitable `remove_vertex`, run under the write lock."""
+        return await self.mutate('remove_vertex', vertex_id)
@@ -0,0 +1,103 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from graphs.compact_graph import CompactGraph
+from graphs.snapshot import load_snapshot, save_snapshot
+
+# The graph each worker process answers queries against; set by _load_worker_graph.
+_worker_graph = None
+
+
+def _load_worker_graph(filename):
+    """Pool initializer: memory-map the shared snapshot once per worker."""
+    global _worker_graph
+    _worker_graph = load_snapshot(filename)
+
+
+def _answer_path_query(query):
+    """
+    Answer one shortest path query against the worker's graph.
+    A (source, target) pair returns the path (weighted graphs: (distance,
+    path)); a bare source returns the distances to every reachable vertex.
+    """
+    if isinstance(query, tuple) and len(query) == 2:
+        source, target = query
+        if _worker_graph.is_weighted():
+            return _worker_graph.find_shortest_route(source, target)
+        return _worker_graph.find_shortest_path(source, target)
+    return _worker_graph.find_all_distances(query)
+
+
+def _answer_n_away_query(query):
+    """Answer one find_vertices_n_away query, given as (source, distance)."""
+    source, target_distance = query
+    return _worker_graph.find_vertices_n_away(source, target_distance)
+
+
+def _answer_chunk(answer, chunk):
+    """Answer a list of (position, query) pairs, keeping their positions."""
+    return [(position, answer(query)) for position, query in chunk]
+
+
+def run_queries(graph, queries, answer, max_workers=None, ordered=True, chunksize=64):
+    """
+    Answer independent queries in parallel across a pool of worker processes.
+
+    The graph is compiled and written once to a temporary binary snapshot,
+    which every worker memory-maps, so it is never pickled per task and all
+    workers share one copy of it in memory.
+
+    Parameters:
+    graph (Graph or CompactGraph): The graph to query.
+    queries (iterable): The queries to answer.
+    answer (callable): A module-level function answering one query against
+    `_worker_graph`.
+    max_workers (integer): The number of processes; defaults to the CPU count.
+    ordered (boolean): Yield results in query order. Otherwise, yield
+    (position, result) pairs as soon as each chunk of queries completes.
+    chunksize (integer): The number of queries sent to a worker at a time.
+
+    Yields:
+    The result of each query (or (position, result) pairs if not ordered).
+    """
+    compact = graph if isinstance(graph, CompactGraph) else graph.compile()
+    descriptor, filename = tempfile.mkstemp(suffix='.graph')
+    os.close(descriptor)
+
+    try:
+        save_snapshot(compact, filename)
+        with ProcessPoolExecutor(max_workers, initializer=_load_worker_graph, initargs=(filename,)) as executor:
+            if ordered:
+                yield from executor.map(answer, queries, chunksize=chunksize)
+                return
+
+            queries = list(enumerate(queries))
+            futures = [executor.submit(_answer_chunk, answer, queries[start:start + chunksize])
+                       for start in range(0, len(queries), chunksize)]
+            for future in as_completed(futures):
+                yield from future.result()
+    finally:
+        os.remove(filename)
+
+
+def batch_shortest_paths(graph, queries, max_workers=None, ordered=True, chunksize=64):
+    """
+    Answer many shortest path queries in parallel.
+    Parameters:
+    queries (iterable): (source, target) pairs, which return the shortest
+    path (or (distance, path) for a weighted graph), or bare source ids,
+    which return a dictionary of distances to every reachable vertex.
+    See run_queries for the other parameters.
+    """
+    return run_queries(graph, queries, _answer_path_query, max_workers, ordered, chunksize)
+
+
+def batch_vertices_n_away(graph, queries, max_workers=None, ordered=True, chunksize=64):
+    """
+    Answer many find_vertices_n_away queries in parallel.
+    Parameters:
+    queries (iterable): (source, target_distance) pairs.
+    See run_queries for the other parameters.
+    """
+    return run_queries(graph, queries, _answer_n_away_query, max_workers, ordered, chunksize)
@@ -0,0 +1,597 @@
+from array import array
+from collections import deque
+from heapq import heappop, heappush
+from itertools import repeat
+
+
+def _index_typecode(count):
+    """Return the smallest signed array typecode able to index `count` items."""
+    return 'i' if count < 2 ** 31 else 'q'
+
+
+class CompactGraph:
+    """ CompactGraph Class
+    A compressed sparse row (CSR) representation of a Graph or WeightedGraph.
+
+    Vertex ids are interned to integer indices 0..V-1. The neighbors of the
+    vertex with index i are `targets[offsets[i]:offsets[i + 1]]`, and their
+    edge weights (if any) are the matching slice of `weights`. All three are
+    contiguous arrays, so traversals are sequential scans over machine ints
+    instead of walks over per-vertex objects and dictionaries.
+
+    Edges and vertices can be removed without rebuilding the arrays: a
+    removed edge's target becomes the tombstone -1 and a removed vertex is
+    flagged, and traversals skip both. Once half of the edges or vertices
+    are dead, the arrays are compacted, so the rebuild cost is amortized
+    over the removals that caused it.
+    """
+
+    def __init__(self, vertex_ids, offsets, targets, weights=None, is_directed=True):
+        """
+        Initialize a compact graph from already-built CSR arrays.
+        Parameters:
+        vertex_ids (list): The vertex id for each integer index.
+        offsets (sequence<int>): V + 1 offsets into `targets`.
+        targets (sequence<int>): The neighbor indices of every vertex, concatenated.
+        weights (sequence<float>): Edge weights parallel to `targets`, or None.
+        is_directed (boolean): Whether the graph is directed.
+        """
+        self.__vertex_ids = vertex_ids  # index -> id
+        self.__index = None  # id -> index, built on first lookup
+        self.__offsets = offsets
+        self.__targets = targets
+        self.__weights = weights
+        self.__is_directed = is_directed
+        self.__reverse = None  # (offsets, targets) of the transposed graph
+        self.__removed = bytearray(len(vertex_ids))  # 1 for each removed vertex index
+        self.__removed_count = 0
+        self.__dead_edges = 0  # tombstoned slots in targets (and the transpose)
+
+    @classmethod
+    def from_graph(cls, graph, weighted=False):
+        """
+        Compile a Graph or WeightedGraph into a CompactGraph.
+        Parameters:
+        graph (Graph): The graph to compile.
+        weighted (boolean): Whether to store edge weights (WeightedGraph only).
+        Returns:
+        CompactGraph: The compiled graph.
+        """
+        vertices = graph.get_vertices()
+        vertex_ids = [vertex.get_id() for vertex in vertices]
+        index = {vertex_id: i for i, vertex_id in enumerate(vertex_ids)}
+
+        offsets = array('q', [0])
+        targets = array(_index_typecode(len(vertex_ids)))
+        weights = array('d') if weighted else None
+
+        for vertex in vertices:
+            if weighted:
+                for neighbor, weight in vertex.iter_neighbors_with_weights():
+                    targets.append(index[neighbor.get_id()])
+                    weights.append(weight)
+            else:
+                targets.extend([index[neighbor.get_id()] for neighbor in vertex.iter_neighbors()])
+            offsets.append(len(targets))
+
+        compact = cls(vertex_ids, offsets, targets, weights, graph.is_directed())
+        compact.__index = index
+        return compact
+
+    def __len__(self):
+        """Return the number of vertices."""
+        return len(self.__vertex_ids) - self.__removed_count
+
+    def __str__(self):
+        """Return a string representation of the graph."""
+        return f'CompactGraph with {len(self)} vertices and {self.number_of_edges()} edges'
+
+    def __repr__(self):
+        """Return a string representation of the graph."""
+        return self.__str__()
+
+    def is_directed(self):
+        """Return True if the graph is directed."""
+        return self.__is_directed
+
+    def is_weighted(self):
+        """Return True if the graph stores edge weights."""
+        return self.__weights is not None
+
+    def number_of_edges(self):
+        """Return the number of stored (directed) edges."""
+        return len(self.__targets) - self.__dead_edges
+
+    def iter_edges(self):
+        """
+        Iterate over every stored edge as a tuple of integer indices and weight.
+        Yields:
+        (int, int, number): The source index, target index and edge weight
+        (1 for unweighted graphs).
+        """
+        for source in range(self._capacity()):
+            if self.__weights is None:
+                for target in self._neighbor_indices(source):
+                    yield source, target, 1
+            else:
+                yield from zip(repeat(source), self._neighbor_indices(source), self._neighbor_weights(source))
+
+    def get_csr_arrays(self):
+        """
+        Return the CSR arrays, compacting away any removed edges and vertices
+        first, so they are indexed like get_vertex_ids().
+        Returns:
+        tuple: The offsets, targets and weights (None if unweighted) arrays.
+        """
+        self.compact()
+        return self.__offsets, self.__targets, self.__weights
+
+    def get_vertex_ids(self):
+        """Return all vertex ids, in index order."""
+        if self.__removed_count:
+            return [vertex_id for i, vertex_id in enumerate(self.__vertex_ids) if not self.__removed[i]]
+        return list(self.__vertex_ids)
+
+    def contains_id(self, vertex_id):
+        """Return True if the graph contains a vertex with this id."""
+        return vertex_id in self._index()
+
+    def index_of(self, vertex_id):
+        """Return the integer index of a vertex id, raising KeyError if absent."""
+        return self._index()[vertex_id]
+
+    def id_of(self, vertex_index):
+        """Return the vertex id stored at an integer index."""
+        return self.__vertex_ids[vertex_index]
+
+    def _index(self):
+        """Return the id -> index table, building it on first use."""
+        if self.__index is None:
+            self.__index = {vertex_id: i for i, vertex_id in enumerate(self.__vertex_ids)
+                            if not self.__removed[i]}
+        return self.__index
+
+    def _capacity(self):
+        """Return the number of vertex indices in use, including removed ones."""
+        return len(self.__vertex_ids)
+
+    def _neighbor_indices(self, vertex_index):
+        """Return the neighbor indices of a vertex as a contiguous slice (minus tombstones)."""
+        neighbors = self.__targets[self.__offsets[vertex_index]:self.__offsets[vertex_index + 1]]
+        if self.__dead_edges:
+            return [neighbor for neighbor in neighbors if neighbor >= 0]
+        return neighbors
+
+    def _neighbor_weights(self, vertex_index):
+        """Return the edge weights of a vertex, parallel to `_neighbor_indices`."""
+        start, end = self.__offsets[vertex_index], self.__offsets[vertex_index + 1]
+        if self.__dead_edges:
+            return [weight for neighbor, weight in zip(self.__targets[start:end], self.__weights[start:end])
+                    if neighbor >= 0]
+        return self.__weights[start:end]
+
+    def _reverse_neighbor_indices(self, vertex_index):
+        """Return the indices of the vertices with an edge into this vertex."""
+        if not self.__is_directed:
+            return self._neighbor_indices(vertex_index)
+
+        if self.__reverse is None:
+            self.__reverse = self._transpose()
+        offsets, targets = self.__reverse
+        neighbors = targets[offsets[vertex_index]:offsets[vertex_index + 1]]
+        if self.__dead_edges:
+            return [neighbor for neighbor in neighbors if neighbor >= 0]
+        return neighbors
+
+    def _transpose(self):
+        """Build the (offsets, targets) arrays of the reversed graph with a counting sort."""
+        vertex_count = self._capacity()
+        in_degree = [0] * vertex_count
+        for target in self.__targets:
+            if target >= 0:
+                in_degree[target] += 1
+
+        offsets = array('q', [0]) * (vertex_count + 1)
+        for i in range(vertex_count):
+            offsets[i + 1] = offsets[i] + in_degree[i]
+
+        position = list(offsets[:-1])
+        targets = array(_index_typecode(vertex_count), [0]) * self.number_of_edges()
+        for source in range(vertex_count):
+            for target in self._neighbor_indices(source):
+                targets[position[target]] = source
+                position[target] += 1
+
+        return offsets, targets
+
+    def remove_edge(self, source_id, target_id):
+        """
+        Remove the edge from source_id to target_id (and its mirror image in
+        an undirected graph) by tombstoning its slot. Takes O(degree) time.
+        """
+        if not self.contains_id(source_id) or not self.contains_id(target_id):
+            raise KeyError("One or both vertices are not in the graph!")
+
+        source = self.index_of(source_id)
+        target = self.index_of(target_id)
+        if not self._tombstone_edge(source, target):
+            raise KeyError("Edge not found")
+        if not self.__is_directed and source != target:
+            self._tombstone_edge(target, source)
+        self._compact_if_sparse()
+
+    def remove_vertex(self, vertex_id):
+        """
+        Remove a vertex and every edge into or out of it. Takes O(degree)
+        time, once the transposed graph of a directed graph has been built.
+        """
+        if not self.contains_id(vertex_id):
+            raise KeyError("Vertex not found")
+
+        vertex = self.index_of(vertex_id)
+        for source in list(self._reverse_neighbor_indices(vertex)):
+            self._tombstone_edge(source, vertex)
+        for target in list(self._neighbor_indices(vertex)):
+            self._tombstone_edge(vertex, target)
+
+        self.__removed[vertex] = 1
+        self.__removed_count += 1
+        del self._index()[vertex_id]
+        self._compact_if_sparse()
+
+    def _tombstone_edge(self, source, target):
+        """
+        Mark the edge source -> target as removed, in the transposed graph too.
+        Returns:
+        boolean: True if the edge existed.
+        """
+        targets = self.__targets
+        for position in range(self.__offsets[source], self.__offsets[source + 1]):
+            if targets[position] == target:
+                targets[position] = -1
+                break
+        else:
+            return False
+
+        if self.__is_directed and self.__reverse is not None:
+            offsets, sources = self.__reverse
+            for position in range(offsets[target], offsets[target + 1]):
+                if sources[position] == source:
+                    sources[position] = -1
+                    break
+        self.__dead_edges += 1
+        return True
+
+    def _compact_if_sparse(self):
+        """Compact the arrays once at least half of the edges or vertices are removed."""
+        if self.__dead_edges * 2 >= len(self.__targets) or self.__removed_count * 2 >= self._capacity():
+            self.compact()
+
+    def compact(self):
+        """
+        Rebuild the arrays without removed edges and vertices. Vertices are
+        renumbered, so indices from before the call are no longer valid.
+        """
+        if not self.__dead_edges and not self.__removed_count:
+            return
+
+        new_index = array('q', [-1]) * self._capacity()
+        vertex_ids = []
+        for i, vertex_id in enumerate(self.__vertex_ids):
+            if not self.__removed[i]:
+                new_index[i] = len(vertex_ids)
+                vertex_ids.append(vertex_id)
+
+        offsets = array('q', [0])
+        targets = array(_index_typecode(len(vertex_ids)))
+        weights = None if self.__weights is None else array('d')
+        for i in range(self._capacity()):
+            if self.__removed[i]:
+                continue
+            targets.extend([new_index[neighbor] for neighbor in self._neighbor_indices(i)])
+            if weights is not None:
+                weights.extend(self._neighbor_weights(i))
+            offsets.append(len(targets))
+
+        self.__vertex_ids = vertex_ids
+        self.__index = None
+        self.__offsets = offsets
+        self.__targets = targets
+        self.__weights = weights
+        self.__reverse = None
+        self.__removed = bytearray(len(vertex_ids))
+        self.__removed_count = 0
+        self.__dead_edges = 0
+
+    def bfs_traversal(self, start_id):
+        """
+        Traverse the graph using breadth-first search.
+        Parameters:
+        start_id (string): The id of the start vertex.
+        Returns:
+        list<string>: The vertex ids in the order they were visited.
+        """
+        if not self.contains_id(start_id):
+            raise KeyError("One or both vertices are not in the graph!")
+
+        start = self.index_of(start_id)
+        seen = bytearray(self._capacity())
+        seen[start] = 1
+        order = [start]
+
+        # the visit order doubles as the queue
+        position = 0
+        while position < len(order):
+            current = order[position]
+            position += 1
+            for neighbor in self._neighbor_indices(current):
+                if not seen[neighbor]:
+                    seen[neighbor] = 1
+                    order.append(neighbor)
+
+        return [self.__vertex_ids[i] for i in order]
+
+    def find_shortest_path(self, start_id, target_id):
+        """
+        Find and return the shortest (fewest edges) path from start_id to target_id.
+        Parameters:
+        start_id (string): The id of the start vertex.
+        target_id (string): The id of the target (end) vertex.
+        Returns:
+        list<string>: A list of all vertex ids in the shortest path, from start to end.
+        """
+        if not self.contains_id(start_id) or not self.contains_id(target_id):
+            raise KeyError("One or both vertices are not in the graph!")
+
+        start = self.index_of(start_id)
+        target = self.index_of(target_id)
+
+        # parent pointer per vertex; -1 means unseen
+        parent = array('q', [-1]) * self._capacity()
+        parent[start] = start
+        queue = deque([start])
+
+        while queue and parent[target] == -1:
+            current = queue.popleft()
+            for neighbor in self._neighbor_indices(current):
+                if parent[neighbor] == -1:
+                    parent[neighbor] = current
+                    queue.append(neighbor)
+
+        if parent[target] == -1:  # path not found
+            return None
+
+        path = [target]
+        while path[-1] != start:
+            path.append(parent[path[-1]])
+        return [self.__vertex_ids[i] for i in reversed(path)]
+
+    def _dijkstra(self, start, targets=None):
+        """
+        Run Dijkstra's Algorithm over vertex indices with a lazy-deletion heap.
+        Unweighted graphs use a weight of 1 for every edge.
+        Parameters:
+        start (integer): The index of the start vertex.
+        targets (set<integer>): Stop once all of these are settled; None settles everything.
+        Returns:
+        (list, array): The distance of every vertex (inf if unsettled), and
+        the predecessor index of every vertex (-1 if none).
+        """
+        distances = [float('inf')] * self._capacity()
+        settled = bytearray(self._capacity())
+        predecessors = array('q', [-1]) * self._capacity()
+        remaining = None if targets is None else set(targets)
+
+        distances[start] = 0
+        heap = [(0, start)]
+        while heap:
+            distance, current = heappop(heap)
+            if settled[current]:
+                continue  # stale entry
+            settled[current] = 1
+
+            if remaining is not None:
+                remaining.discard(current)
+                if not remaining:
+                    break
+
+            if self.__weights is None:
+                weights = repeat(1)
+            else:
+                weights = self._neighbor_weights(current)
+            for neighbor, weight in zip(self._neighbor_indices(current), weights):
+                if distance + weight < distances[neighbor]:
+                    distances[neighbor] = distance + weight
+                    predecessors[neighbor] = current
+                    heappush(heap, (distance + weight, neighbor))
+
+        for i in range(self._capacity()):
+            if not settled[i]:
+                distances[i] = float('inf')
+        return distances, predecessors
+
+    def find_shortest_route(self, start_id, target_id):
+        """
+        Use Dijkstra's Algorithm to find the lowest-weight path from start_id to target_id.
+        Returns:
+        (number, list<string>): The total weight and the vertex ids on the path,
+        from start to end, or None if the target cannot be reached.
+        """
+        if not self.contains_id(start_id) or not self.contains_id(target_id):
+            raise KeyError("One or both vertices are not in the graph!")
+
+        start = self.index_of(start_id)
+        target = self.index_of(target_id)
+        distances, predecessors = self._dijkstra(start, {target})
+        if distances[target] == float('inf'):
+            return None
+
+        path = [target]
+        while path[-1] != start:
+            path.append(predecessors[path[-1]])
+        return distances[target], [self.__vertex_ids[i] for i in reversed(path)]
+
+    def find_all_distances(self, start_id):
+        """
+        Return a dictionary of vertex id -> distance from start_id, for every
+        vertex reachable from it. Distances are total edge weights for a
+        weighted graph, and numbers of edges otherwise.
+        """
+        if not self.contains_id(start_id):
+            raise KeyError("Vertex not found")
+
+        start = self.index_of(start_id)
+        if self.__weights is not None:
+            distances, _ = self._dijkstra(start)
+            return {self.__vertex_ids[i]: distance
+                    for i, distance in enumerate(distances) if distance != float('inf')}
+
+        distances = {start: 0}
+        frontier = [start]
+        depth = 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for current in frontier:
+                for neighbor in self._neighbor_indices(current):
+                    if neighbor not in distances:
+                        distances[neighbor] = depth
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return {self.__vertex_ids[i]: distance for i, distance in distances.items()}
+
+    def find_vertices_n_away(self, start_id, target_distance):
+        """
+        Find and return all vertices n distance away.
+        Arguments:
+        start_id (string): The id of the start vertex.
+        target_distance (integer): The distance from the start vertex we are looking for
+        Returns:
+        list<string>: All vertex ids that are `target_distance` away from the start vertex
+        """
+        if not self.contains_id(start_id):
+            raise KeyError("Vertex not found")
+        if target_distance < 0:
+            return []
+
+        seen = bytearray(self._capacity())
+        start = self.index_of(start_id)
+        seen[start] = 1
+        frontier = [start]
+
+        # expand one whole level at a time, stopping at the requested depth
+        for _ in range(target_distance):
+            next_frontier = []
+            for current in frontier:
+                for neighbor in self._neighbor_indices(current):
+                    if not seen[neighbor]:
+                        seen[neighbor] = 1
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+            if not frontier:
+                break
+
+        return [self.__vertex_ids[i] for i in frontier]
+
+    def find_connected_components(self):
+        """
+        Return a list of all connected components, with each connected component
+        represented as a list of vertex ids. Edge direction is ignored.
+        """
+        seen = bytearray(self._capacity())
+        components = []
+
+        for start in range(self._capacity()):
+            if seen[start] or self.__removed[start]:
+                continue
+
+            seen[start] = 1
+            component = [start]
+            position = 0
+            while position < len(component):
+                current = component[position]
+                position += 1
+                for neighbor in self._neighbor_indices(current):
+                    if not seen[neighbor]:
+                        seen[neighbor] = 1
+                        component.append(neighbor)
+                if self.__is_directed:
+                    for neighbor in self._reverse_neighbor_indices(current):
+                        if not seen[neighbor]:
+                            seen[neighbor] = 1
+                            component.append(neighbor)
+
+            components.append([self.__vertex_ids[i] for i in component])
+
+        return components
+
+    def find_bipartition(self):
+        """
+        2-colour every component of the graph with breadth-first search over
+        vertex indices, ignoring edge direction.
+        Returns:
+        (True, (list, list)): The two sides of the partition, if the graph is bipartite.
+        (False, list): Otherwise, the vertex ids around an odd-length cycle.
+        """
+        uncolored = 2
+        color = bytearray([uncolored]) * self._capacity()
+        parent = array('q', [-1]) * self._capacity()
+
+        for root in range(self._capacity()):
+            if color[root] != uncolored or self.__removed[root]:
+                continue
+
+            color[root] = 0
+            queue = deque([root])
+            while queue:
+                current = queue.popleft()
+                neighbors = self._neighbor_indices(current)
+                if self.__is_directed:
+                    neighbors = list(neighbors) + list(self._reverse_neighbor_indices(current))
+
+                for neighbor in neighbors:
+                    if color[neighbor] == uncolored:
+                        color[neighbor] = color[current] ^ 1
+                        parent[neighbor] = current
+                        queue.append(neighbor)
+                    elif color[neighbor] == color[current]:
+                        # walk both same-depth ends up to their common ancestor
+                        path1, path2 = [current], [neighbor]
+                        while path1[-1] != path2[-1]:
+                            path1.append(parent[path1[-1]])
+                            path2.append(parent[path2[-1]])
+                        return False, [self.__vertex_ids[i] for i in path1 + path2[-2::-1]]
+
+        left = [self.__vertex_ids[i] for i in range(self._capacity()) if color[i] == 0]
+        right = [self.__vertex_ids[i] for i in range(self._capacity()) if color[i] == 1]
+        return True, (left, right)
+
+    def is_bipartite(self):
+        """Return True if the graph is bipartite, and False otherwise."""
+        is_bipartite, _ = self.find_bipartition()
+        return is_bipartite
+
+    def topological_sort(self):
+        """
+        Return a valid ordering of vertices in a directed acyclic graph, using
+        Kahn's algorithm. If the graph contains a cycle, throw a ValueError.
+        """
+        in_degree = [0] * self._capacity()
+        for target in self.__targets:
+            if target >= 0:
+                in_degree[target] += 1
+
+        order = [i for i in range(self._capacity()) if in_degree[i] == 0 and not self.__removed[i]]
+        position = 0
+        while position < len(order):
+            current = order[position]
+            position += 1
+            for neighbor in self._neighbor_indices(current):
+                in_degree[neighbor] -= 1
+                if in_degree[neighbor] == 0:
+                    order.append(neighbor)
+
+        if len(order) != len(self):
+            raise ValueError('Graph not DAG')
+
+        return [self.__vertex_ids[i] for i in order]
@@ -0,0 +1,162 @@
+from graphs import instrumentation
+from graphs.disjoint_set import DisjointSet
+
+WEAK = 'weak'
+STRONG = 'strong'
+
+
+def weak_component_labels(graph):
+    """
+    Label every vertex with its weakly connected component (edge direction is
+    ignored), by uniting the ends of every edge in a DisjointSet.
+    Runs in O(V + E) amortized time.
+    Returns:
+    dict: vertex id -> component label, numbered 0, 1, ... in vertex order.
+    """
+    vertices = graph.get_vertices()
+    index = {vertex.get_id(): i for i, vertex in enumerate(vertices)}
+    groups = DisjointSet(len(vertices))
+    stats = instrumentation.current()
+
+    for i, vertex in enumerate(vertices):
+        if stats is not None:
+            stats.visit(vertex, 0)
+        for neighbor in vertex.iter_neighbors():
+            groups.union(i, index[neighbor.get_id()])
+
+    root_to_label = {}
+    labels = {}
+    for i, vertex in enumerate(vertices):
+        root = groups.find(i)
+        if root not in root_to_label:
+            root_to_label[root] = len(root_to_label)
+        labels[vertex.get_id()] = root_to_label[root]
+    return labels
+
+
+def strong_component_labels(graph):
+    """
+    Label every vertex with its strongly connected component, using an
+    iterative version of Tarjan's algorithm. Runs in O(V + E) time.
+    Returns:
+    dict: vertex id -> component label. Labels are numbered in reverse
+    topological order of the components.
+    """
+    order = {}  # vertex id -> discovery order
+    lowlink = {}  # vertex id -> smallest discovery order reachable from its subtree
+    on_stack = set()
+    stack = []
+    labels = {}
+    component_count = 0
+    stats = instrumentation.current()
+
+    for root in graph.get_vertices():
+        if root.get_id() in order:
+            continue
+
+        if stats is not None:
+            stats.visit(root, 0)
+        order[root.get_id()] = lowlink[root.get_id()] = len(order)
+        stack.append(root.get_id())
+        on_stack.add(root.get_id())
+        work = [(root.get_id(), root.iter_neighbors())]
+
+        while work:
+            vertex_id, neighbors = work[-1]
+            for neighbor in neighbors:
+                neighbor_id = neighbor.get_id()
+                if neighbor_id not in order:
+                    if stats is not None:
+                        stats.visit(neighbor, len(work))
+                    order[neighbor_id] = lowlink[neighbor_id] = len(order)
+                    stack.append(neighbor_id)
+                    on_stack.add(neighbor_id)
+                    work.append((neighbor_id, neighbor.iter_neighbors()))
+                    break  # descend; resume this vertex's neighbors later
+                if neighbor_id in on_stack:
+                    lowlink[vertex_id] = min(lowlink[vertex_id], order[neighbor_id])
+            else:
+                work.pop()
+                if work:
+                    parent_id = work[-1][0]
+                    lowlink[parent_id] = min(lowlink[parent_id], lowlink[vertex_id])
+
+                # vertex_id is the root of a component: pop the whole component
+                if lowlink[vertex_id] == order[vertex_id]:
+                    while True:
+                        member_id = stack.pop()
+                        on_stack.discard(member_id)
+                        labels[member_id] = component_count
+                        if member_id == vertex_id:
+                            break
+                    component_count += 1
+
+    return labels
+
+
+def group_by_label(labels):
+    """Turn a vertex id -> label dictionary into a list of components (lists of vertex ids)."""
+    components = {}
+    for vertex_id, label in labels.items():
+        components.setdefault(label, []).append(vertex_id)
+    return list(components.values())
+
+
+class ConnectivityIndex:
+    """ ConnectivityIndex Class
+    Weakly connected components, kept up to date as vertices and edges are
+    added, so connectivity queries never need a fresh traversal.
+    Each vertex is an element of a DisjointSet; adding an edge unites its ends.
+    """
+
+    def __init__(self, graph=None):
+        """
+        Initialize the index, covering every vertex and edge already in graph.
+        Parameters:
+        graph (Graph): The graph to index, or None to start empty.
+        """
+        self.__index = {}  # vertex id -> DisjointSet element
+        self.__groups = DisjointSet()
+
+        if graph is not None:
+            for vertex in graph.get_vertices():
+                self.add_vertex(vertex.get_id())
+            for vertex in graph.get_vertices():
+                for neighbor in vertex.iter_neighbors():
+                    self.add_edge(vertex.get_id(), neighbor.get_id())
+
+    def add_vertex(self, vertex_id):
+        """Start tracking vertex_id in a component of its own, if it is new."""
+        if vertex_id not in self.__index:
+            self.__index[vertex_id] = self.__groups.add()
+
+    def add_edge(self, vertex_id1, vertex_id2):
+        """Merge the components of both ends of a new edge."""
+        self.add_vertex(vertex_id1)
+        self.add_vertex(vertex_id2)
+        self.__groups.union(self.__index[vertex_id1], self.__index[vertex_id2])
+
+    def connected(self, vertex_id1, vertex_id2):
+        """Return True if both vertices are in the same component."""
+        if vertex_id1 not in self.__index or vertex_id2 not in self.__index:
+            raise KeyError("One or both vertices are not in the graph!")
+        return self.__groups.connected(self.__index[vertex_id1], self.__index[vertex_id2])
+
+    def component_size(self, vertex_id):
+        """Return the number of vertices in vertex_id's component."""
+        return self.__groups.set_size(self.__index[vertex_id])
+
+    def component_count(self):
+        """Return the number of components."""
+        return self.__groups.set_count()
+
+    def labels(self):
+        """Return a dictionary of vertex id -> component label, like weak_component_labels."""
+        root_to_label = {}
+        labels = {}
+        for vertex_id, element in self.__index.items():
+            root = self.__groups.find(element)
+            if root not in root_to_label:
+                root_to_label[root] = len(root_to_label)
+            labels[vertex_id] = root_to_label[root]
+        return labels
@@ -0,0 +1,80 @@
+from array import array
+
+
+class DisjointSet:
+    """ DisjointSet Class
+    Union-find over the integers 0..n-1, stored in flat arrays.
+    `find` compresses paths (by halving) and `union` links by rank, so any
+    sequence of operations runs in near-constant amortized time per call.
+    """
+
+    def __init__(self, size=0):
+        """
+        Initialize `size` singleton sets.
+        Parameters:
+        size (integer): The number of elements to start with.
+        """
+        self.__parent = array('q', range(size))
+        self.__rank = bytearray(size)
+        self.__size = array('q', [1]) * size
+        self.__count = size  # number of disjoint sets
+
+    def __len__(self):
+        """Return the number of elements."""
+        return len(self.__parent)
+
+    def add(self):
+        """
+        Add a new singleton set.
+        Returns:
+        integer: The new element.
+        """
+        element = len(self.__parent)
+        self.__parent.append(element)
+        self.__rank.append(0)
+        self.__size.append(1)
+        self.__count += 1
+        return element
+
+    def find(self, element):
+        """Return the root (or, group label) of the set containing element."""
+        parent = self.__parent
+        while parent[element] != element:
+            # point every other node on the path at its grandparent
+            parent[element] = parent[parent[element]]
+            element = parent[element]
+        return element
+
+    def union(self, element1, element2):
+        """
+        Merge the sets containing element1 and element2.
+        Returns:
+        boolean: True if they were in different sets, False otherwise.
+        """
+        root1 = self.find(element1)
+        root2 = self.find(element2)
+        if root1 == root2:
+            return False
+
+        # attach the shallower tree under the deeper one
+        if self.__rank[root1] < self.__rank[root2]:
+            root1, root2 = root2, root1
+        self.__parent[root2] = root1
+        self.__size[root1] += self.__size[root2]
+        if self.__rank[root1] == self.__rank[root2]:
+            self.__rank[root1] += 1
+
+        self.__count -= 1
+        return True
+
+    def connected(self, element1, element2):
+        """Return True if both elements are in the same set."""
+        return self.find(element1) == self.find(element2)
+
+    def set_size(self, element):
+        """Return the size of the set containing element."""
+        return self.__size[self.find(element)]
+
+    def set_count(self):
+        """Return the number of disjoint sets."""
+        return self.__count
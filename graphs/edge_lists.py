@@ -0,0 +1,88 @@
+"""
+Normalize the edge lists accepted by `add_edges_bulk` and `from_edges`.
+
+An edge list may be any iterable of (id1, id2[, weight]) rows, a 2-D NumPy
+array with one row per edge, or columns: a pandas DataFrame or a dictionary
+of column name -> sequence, whose first columns are taken in order. Arrays
+and columns are converted with `.tolist()`, so the graph holds plain Python
+ids and weights rather than NumPy scalars.
+"""
+import gc
+from contextlib import contextmanager
+
+KEEP_FIRST = 'first'
+KEEP_LAST = 'last'
+KEEP_MIN = 'min'
+
+
+def edge_rows(edges, width):
+    """
+    Return an iterable of edge rows from any supported edge list.
+    Parameters:
+    edges: The edge list.
+    width (integer): The number of values per edge: 2, or 3 with weights.
+    Returns:
+    iterable: Rows of exactly `width` values (for columns and arrays), or
+    `edges` itself for any other iterable.
+    """
+    columns = getattr(edges, 'columns', None)  # pandas DataFrame
+    if columns is None and isinstance(edges, dict):
+        columns = list(edges)
+    if columns is not None:
+        columns = list(columns)[:width]
+        if len(columns) < width:
+            raise ValueError(f'Expected {width} edge columns, got {len(columns)}')
+        return zip(*(_to_list(edges[column]) for column in columns))
+
+    if getattr(edges, 'ndim', None) == 2:  # NumPy array
+        if edges.shape[1] < width:
+            raise ValueError(f'Expected {width} edge columns, got {edges.shape[1]}')
+        return edges[:, :width].tolist()
+    return edges
+
+
+def _to_list(column):
+    """Return a column as a list of Python values."""
+    return column.tolist() if hasattr(column, 'tolist') else list(column)
+
+
+def dedupe_weighted(rows, is_directed, keep):
+    """
+    Collapse repeated edges in (id1, id2, weight) rows to one row each.
+    In an undirected graph, (a, b) and (b, a) are the same edge.
+    Parameters:
+    rows (iterable): The weighted edge rows.
+    is_directed (boolean): Whether the edges are directed.
+    keep (string): Which weight to keep: KEEP_FIRST, KEEP_LAST or KEEP_MIN.
+    Returns:
+    list<tuple>: The rows, in the order each edge first appeared.
+    """
+    if keep not in (KEEP_FIRST, KEEP_LAST, KEEP_MIN):
+        raise ValueError(f"Unknown keep: {keep!r}; expected 'first', 'last' or 'min'")
+
+    best = {}  # (id1, id2) -> weight
+    for vertex_id1, vertex_id2, weight in rows:
+        key = (vertex_id1, vertex_id2)
+        if not is_directed and key not in best and (vertex_id2, vertex_id1) in best:
+            key = (vertex_id2, vertex_id1)
+
+        if key not in best or keep == KEEP_LAST or (keep == KEEP_MIN and weight < best[key]):
+            best[key] = weight
+    return [(vertex_id1, vertex_id2, weight) for (vertex_id1, vertex_id2), weight in best.items()]
+
+
+@contextmanager
+def gc_paused():
+    """
+    Pause the cyclic garbage collector for the duration of the block.
+    Loading a graph allocates millions of vertices, dictionaries and tuples
+    that all survive; each allocation burst would otherwise trigger a
+    collection that rescans them, which takes most of the loading time.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
@@ -1,11 +1,32 @@
 from collections import deque
-from random import choice
+from itertools import chain
+from operator import methodcaller
+
+from graphs import batch, components, edge_lists, instrumentation, matrix, multi_source, snapshot
+from graphs.compact_graph import CompactGraph
+from graphs.instrumentation import instrumented
+from graphs.query_cache import QueryCache, cached_query
+
+# Depth-first search events
+PRE_ORDER = 'pre'
+POST_ORDER = 'post'
+BACK_EDGE = 'back'
+
+# Depth-first search vertex colours
+WHITE, GREY, BLACK = 0, 1, 2
+
+
+def _as_list(values):
+    """Return a NumPy array or any other sequence as a list of Python values."""
+    return values.tolist() if hasattr(values, 'tolist') else values
 
 
 class Vertex(object):
     """
     Defines a single vertex and its neighbors.
+    Slots instead of an instance dictionary keep each vertex small.
     """
+    __slots__ = ('__id', '__neighbors_dict')
 
     def __init__(self, vertex_id):
         """
@@ -38,6 +59,24 @@ class Vertex(object):
         """Return the neighbors of this vertex."""
         return list(self.__neighbors_dict.values())
 
+    def iter_neighbors(self):
+        """Iterate over the neighbors of this vertex without copying them into a list."""
+        return iter(self.__neighbors_dict.values())
+
+    def remove_neighbor(self, vertex_obj):
+        """
+        Remove a neighbor of this vertex.
+        Parameters:
+        vertex_obj (Vertex): The neighbor to remove.
+        Returns:
+        boolean: True if vertex_obj was a neighbor.
+        """
+        return self.__neighbors_dict.pop(vertex_obj.__id, None) is not None
+
+    def get_degree(self):
+        """Return the number of neighbors of this vertex."""
+        return len(self.__neighbors_dict)
+
     def get_id(self):
         """Return the id of this vertex."""
         return self.__id
@@ -56,6 +95,15 @@ class Graph:
         """
         self.__vertex_dict = {}  # id -> object
         self.__is_directed = is_directed
+        self._reverse_index = None  # id -> {predecessor id -> object}
+        self._track_predecessors = False  # keep _reverse_index up to date on every change
+        self._component_labels = {}  # mode -> {id -> label}, built on demand
+        self._connectivity = None  # ConnectivityIndex, once enabled
+        self._connectivity_stale = False  # a removal split components; rebuild on next query
+        self._version = 0  # bumped on every change, to expire cached query results
+        self._query_cache = None  # QueryCache, once enabled
+        self._vertex_attributes = {}  # id -> {attribute name -> value}
+        self._adjacency_matrix = None  # (version, AdjacencyMatrix), built on demand
 
     def add_vertex(self, vertex_id):
         """
@@ -67,6 +115,8 @@ class Graph:
         """
         vertex = Vertex(vertex_id)
         self.__vertex_dict[vertex_id] = vertex
+        self._vertex_added(vertex)
+        self._graph_changed()
         return vertex
 
     def get_vertex(self, vertex_id):
@@ -95,6 +145,263 @@ class Graph:
         if not self.__is_directed:
             self.__vertex_dict[vertex_id2].add_neighbor(self.__vertex_dict[vertex_id1])
 
+        self._edge_added(self.__vertex_dict[vertex_id1], self.__vertex_dict[vertex_id2])
+        self._graph_changed()
+
+    @classmethod
+    def from_edges(cls, edges, is_directed=True, vertices=(), **options):
+        """
+        Build a graph from an edge list in one pass; see `add_edges_bulk`.
+        Parameters:
+        edges: (vertex_id1, vertex_id2) pairs, a 2-D NumPy array, or columns
+        (a pandas DataFrame or a dictionary of column name -> sequence).
+        is_directed (boolean): Whether the graph is directed.
+        vertices (iterable): Extra vertex ids, e.g. for vertices without edges.
+        Other keyword arguments are passed to `add_edges_bulk`.
+        Returns:
+        Graph: The new graph.
+        """
+        graph = cls(is_directed)
+        for vertex_id in vertices:
+            if not graph.contains_id(vertex_id):
+                graph.add_vertex(vertex_id)
+        graph.add_edges_bulk(edges, **options)
+        return graph
+
+    def add_edges_bulk(self, edges):
+        """
+        Add many edges at once, creating any missing vertices.
+        Unlike `add_edge`, this skips the per-edge method calls and membership
+        checks, so it is the fast path for loading large graphs. Repeated
+        edges are added once.
+        Parameters:
+        edges: (vertex_id1, vertex_id2) pairs, a 2-D NumPy array, or columns
+        (a pandas DataFrame or a dictionary of column name -> sequence).
+        """
+        vertex_dict = self.__vertex_dict
+        get_vertex = vertex_dict.get
+        is_directed = self.__is_directed
+        maintain_indexes = self._has_maintained_indexes()
+
+        with edge_lists.gc_paused():
+            for vertex_id1, vertex_id2 in edge_lists.edge_rows(edges, 2):
+                vertex_obj1 = get_vertex(vertex_id1)
+                if vertex_obj1 is None:
+                    vertex_obj1 = vertex_dict[vertex_id1] = Vertex(vertex_id1)
+                    if maintain_indexes:
+                        self._vertex_added(vertex_obj1)
+                vertex_obj2 = get_vertex(vertex_id2)
+                if vertex_obj2 is None:
+                    vertex_obj2 = vertex_dict[vertex_id2] = Vertex(vertex_id2)
+                    if maintain_indexes:
+                        self._vertex_added(vertex_obj2)
+
+                vertex_obj1.add_neighbor(vertex_obj2)
+                if not is_directed:
+                    vertex_obj2.add_neighbor(vertex_obj1)
+                if maintain_indexes:
+                    self._edge_added(vertex_obj1, vertex_obj2)
+
+        self._graph_changed()
+
+    def remove_edge(self, vertex_id1, vertex_id2):
+        """
+        Remove the edge from `vertex_id1` to `vertex_id2` (and its mirror image
+        in an undirected graph). The vertices are kept. Takes O(1) time.
+        Parameters:
+        vertex_id1 (string): The unique identifier of the first vertex.
+        vertex_id2 (string): The unique identifier of the second vertex.
+        """
+        vertex_obj1 = self.get_vertex(vertex_id1)
+        vertex_obj2 = self.get_vertex(vertex_id2)
+        if vertex_obj1 is None or vertex_obj2 is None:
+            raise KeyError("One or both vertices are not in the graph!")
+
+        if not vertex_obj1.remove_neighbor(vertex_obj2):
+            raise KeyError("Edge not found")
+        if not self.is_directed():
+            vertex_obj2.remove_neighbor(vertex_obj1)
+
+        self._edge_removed(vertex_obj1, vertex_obj2)
+        self._graph_changed()
+
+    def remove_vertex(self, vertex_id):
+        """
+        Remove a vertex and every edge into or out of it. Takes O(degree)
+        time; in a directed graph, this needs the reverse index (see
+        enable_reverse_index) to find the incoming edges without a full scan.
+        Parameters:
+        vertex_id (string): The unique identifier of the vertex to remove.
+        """
+        vertex_obj = self.get_vertex(vertex_id)
+        if vertex_obj is None:
+            raise KeyError("Vertex not found")
+
+        for predecessor in list(self._get_predecessors(vertex_obj)):
+            predecessor.remove_neighbor(vertex_obj)
+            self._edge_removed(predecessor, vertex_obj)
+        for neighbor in list(vertex_obj.iter_neighbors()):
+            vertex_obj.remove_neighbor(neighbor)
+            self._edge_removed(vertex_obj, neighbor)
+
+        self._pop_vertex(vertex_id)
+        if self._connectivity is not None:
+            self._connectivity_stale = True  # even without edges, the vertex is in the index
+        self._vertex_attributes.pop(vertex_id, None)
+        if self._track_predecessors:
+            del self._reverse_index[vertex_id]
+        self._graph_changed()
+
+    def set_vertex_attribute(self, vertex_id, name, value):
+        """
+        Attach a named value (e.g. coordinates) to a vertex.
+        Parameters:
+        vertex_id (string): The unique identifier of the vertex.
+        name (string): The attribute name.
+        value: The attribute value.
+        """
+        if not self.contains_id(vertex_id):
+            raise KeyError("Vertex not found")
+        self._vertex_attributes.setdefault(vertex_id, {})[name] = value
+
+    def set_vertex_attributes(self, name, values):
+        """Set the attribute `name` of many vertices at once, from a dictionary of vertex id -> value."""
+        for vertex_id, value in values.items():
+            self.set_vertex_attribute(vertex_id, name, value)
+
+    def get_vertex_attribute(self, vertex_id, name, default=None):
+        """Return the attribute `name` of a vertex, or default if it was never set."""
+        return self._vertex_attributes.get(vertex_id, {}).get(name, default)
+
+    def _pop_vertex(self, vertex_id):
+        """Remove a vertex object from the vertex dictionary and return it."""
+        return self.__vertex_dict.pop(vertex_id)
+
+    def _has_maintained_indexes(self):
+        """Return True if any index must be updated as vertices and edges are added."""
+        return self._connectivity is not None or self._track_predecessors
+
+    def _vertex_added(self, vertex_obj):
+        """Update the incrementally maintained indexes for a new vertex."""
+        if self._connectivity is not None and not self._connectivity_stale:
+            self._connectivity.add_vertex(vertex_obj.get_id())
+        if self._track_predecessors:
+            self._reverse_index.setdefault(vertex_obj.get_id(), {})
+
+    def _edge_added(self, vertex_obj1, vertex_obj2):
+        """Update the incrementally maintained indexes for a new edge."""
+        if self._connectivity is not None and not self._connectivity_stale:
+            self._connectivity.add_edge(vertex_obj1.get_id(), vertex_obj2.get_id())
+        if self._track_predecessors:
+            self._reverse_index.setdefault(vertex_obj2.get_id(), {})[vertex_obj1.get_id()] = vertex_obj1
+
+    def _edge_removed(self, vertex_obj1, vertex_obj2):
+        """
+        Update the maintained indexes for a removed edge. A union-find
+        connectivity index cannot split a component, so it is rebuilt the
+        next time it is queried, once for any number of removals.
+        """
+        if self._connectivity is not None:
+            self._connectivity_stale = True
+        if self._track_predecessors:
+            self._reverse_index[vertex_obj2.get_id()].pop(vertex_obj1.get_id(), None)
+
+    def _get_connectivity(self):
+        """Return the connectivity index (or None), rebuilding it if removals made it stale."""
+        if self._connectivity_stale:
+            self._connectivity = components.ConnectivityIndex(self)
+            self._connectivity_stale = False
+        return self._connectivity
+
+    def _graph_changed(self):
+        """Drop every index derived from the graph's structure; called after each mutation."""
+        if not self._track_predecessors:
+            self._reverse_index = None
+        self._component_labels = {}
+        self._version += 1
+
+    def enable_query_cache(self, maxsize=1024):
+        """
+        Cache the results of repeated queries (shortest paths, vertices n away,
+        all-pairs distances) in a least-recently-used cache. Any change to the
+        graph discards the cached results. Every call gets its own copy of a
+        cached result.
+        Parameters:
+        maxsize (integer): The most results to keep.
+        """
+        self._query_cache = QueryCache(maxsize)
+
+    def disable_query_cache(self):
+        """Stop caching query results and drop the cache."""
+        self._query_cache = None
+
+    def query_cache_stats(self):
+        """
+        Return the query cache's hit, miss and eviction counts (see QueryCache.stats),
+        or None if the cache is not enabled.
+        """
+        if self._query_cache is None:
+            return None
+        return self._query_cache.stats()
+
+    def _get_predecessors(self, vertex_obj):
+        """
+        Return the vertex objects with an edge into vertex_obj.
+        Directed graphs use a reverse adjacency index. Unless it is maintained
+        (see enable_reverse_index), it is rebuilt on first use after each change.
+        """
+        if not self.is_directed():
+            return vertex_obj.iter_neighbors()
+        return self._get_reverse_index()[vertex_obj.get_id()].values()
+
+    def _get_reverse_index(self):
+        """Return the id -> {predecessor id -> predecessor object} index, building it if needed."""
+        if self._reverse_index is None:
+            reverse_index = {vertex.get_id(): {} for vertex in self.get_vertices()}
+            for vertex in self.get_vertices():
+                for neighbor in vertex.iter_neighbors():
+                    reverse_index[neighbor.get_id()][vertex.get_id()] = vertex
+            self._reverse_index = reverse_index
+        return self._reverse_index
+
+    def enable_reverse_index(self):
+        """
+        Keep the reverse adjacency (predecessor) index of a directed graph up
+        to date on every add_vertex/add_edge, instead of rebuilding it after
+        changes. Predecessor lookups and in-degrees then cost O(in-degree).
+        Undirected graphs need no reverse index.
+        """
+        if self.is_directed() and not self._track_predecessors:
+            self._get_reverse_index()
+            self._track_predecessors = True
+
+    def get_predecessors(self, vertex_id):
+        """
+        Return the vertices with an edge into vertex_id (its neighbors, for an undirected graph).
+        Returns:
+        List<Vertex>: The predecessor vertex objects.
+        """
+        vertex_obj = self.get_vertex(vertex_id)
+        if vertex_obj is None:
+            raise KeyError("Vertex not found")
+        return list(self._get_predecessors(vertex_obj))
+
+    def in_degree(self, vertex_id):
+        """Return the number of edges into vertex_id."""
+        vertex_obj = self.get_vertex(vertex_id)
+        if vertex_obj is None:
+            raise KeyError("Vertex not found")
+        if not self.is_directed():
+            return vertex_obj.get_degree()
+        return len(self._get_reverse_index()[vertex_id])
+
+    def out_degree(self, vertex_id):
+        """Return the number of edges out of vertex_id."""
+        vertex_obj = self.get_vertex(vertex_id)
+        if vertex_obj is None:
+            raise KeyError("Vertex not found")
+        return vertex_obj.get_degree()
+
     def get_vertices(self):
         """
         Return all vertices in the graph.
@@ -106,6 +413,155 @@ class Graph:
     def contains_id(self, vertex_id):
         return vertex_id in self.__vertex_dict
 
+    def is_directed(self):
+        """Return True if the graph is directed."""
+        return self.__is_directed
+
+    def compile(self):
+        """
+        Compile the graph into a compact CSR representation.
+        Later changes to this graph are not reflected in the compiled copy.
+        Returns:
+        CompactGraph: The compiled graph.
+        """
+        return CompactGraph.from_graph(self)
+
+    def adjacency_matrix(self):
+        """
+        Return the adjacency matrix of the graph, with edge weights for a
+        WeightedGraph, for vectorized whole-graph analytics. It is rebuilt
+        only after the graph changes. Requires NumPy.
+        Returns:
+        AdjacencyMatrix: The matrix, whose rows follow get_vertices() order.
+        """
+        if self._adjacency_matrix is None or self._adjacency_matrix[0] != self._version:
+            self._adjacency_matrix = (self._version, matrix.AdjacencyMatrix.from_compact(self.compile()))
+        return self._adjacency_matrix[1]
+
+    def to_sparse_matrix(self):
+        """
+        Export the adjacency matrix as a SciPy sparse matrix. Requires SciPy.
+        Returns:
+        tuple: The `scipy.sparse.csr_array`, and the list of vertex ids
+        for its rows and columns.
+        """
+        adjacency = self.adjacency_matrix()
+        return adjacency.to_sparse_matrix(), adjacency.get_vertex_ids()
+
+    @classmethod
+    def from_sparse_matrix(cls, sparse_matrix, vertex_ids=None, is_directed=True):
+        """
+        Build a graph from an adjacency matrix, with an edge for every stored
+        entry (weighted by its value for a WeightedGraph). Requires SciPy.
+        Parameters:
+        sparse_matrix: A square SciPy sparse matrix or dense NumPy array.
+        vertex_ids (list): The vertex id of each row; defaults to 0..V-1.
+        is_directed (boolean): Whether the graph is directed. A symmetric
+        matrix gives each undirected edge once.
+        Returns:
+        Graph: The new graph, with a vertex for every row.
+        """
+        size, rows, columns, values = matrix.from_sparse_matrix(sparse_matrix)
+        if vertex_ids is None:
+            vertex_ids = list(range(size))
+        elif len(vertex_ids) != size:
+            raise ValueError(f'Expected {size} vertex ids, got {len(vertex_ids)}')
+
+        edges = {
+            'source': [vertex_ids[row] for row in rows],
+            'target': [vertex_ids[column] for column in columns],
+            'weight': values,
+        }
+        return cls.from_edges(edges, is_directed, vertices=vertex_ids)
+
+    def page_rank(self, damping=0.85, tolerance=1e-10, max_iterations=100):
+        """
+        Rank the vertices with PageRank, by power iteration over the adjacency
+        matrix; see AdjacencyMatrix.page_rank. Requires NumPy.
+        Returns:
+        dict: vertex id -> rank; the ranks sum to 1.
+        """
+        adjacency = self.adjacency_matrix()
+        ranks = adjacency.page_rank(damping, tolerance, max_iterations)
+        return dict(zip(adjacency.get_vertex_ids(), ranks.tolist()))
+
+    def degree_vectors(self, weighted=False):
+        """
+        Return the out- and in-degree of every vertex as NumPy arrays.
+        Parameters:
+        weighted (boolean): Sum the edge weights instead of counting edges.
+        Returns:
+        tuple: The vertex ids, their out-degrees and their in-degrees.
+        """
+        adjacency = self.adjacency_matrix()
+        return adjacency.get_vertex_ids(), adjacency.out_degrees(weighted), adjacency.in_degrees(weighted)
+
+    def k_hop_reachable(self, source_ids, max_hops):
+        """
+        Find every vertex within max_hops edges of any of the sources, by
+        vectorized matrix-vector products over the adjacency matrix.
+        Parameters:
+        source_ids (iterable): The ids of the source vertices.
+        max_hops (integer): The most edges to follow.
+        Returns:
+        dict: vertex id -> fewest hops from the nearest source, for every
+        reachable vertex (the sources themselves at 0).
+        """
+        adjacency = self.adjacency_matrix()
+        hops = adjacency.hop_distances(source_ids, max_hops).tolist()
+        return {vertex_id: hop for vertex_id, hop in zip(adjacency.get_vertex_ids(), hops) if hop != matrix.UNREACHED}
+
+    def save_binary(self, filename):
+        """
+        Save the graph as a binary snapshot that `load_binary` can map back in.
+        Parameters:
+        filename (string): The path of the file to write.
+        """
+        snapshot.save_snapshot(self.compile(), filename)
+
+    @staticmethod
+    def load_binary(filename):
+        """
+        Memory-map a binary snapshot written by `save_binary`. The arrays are
+        not copied, so this is fast regardless of the graph's size, and
+        processes loading the same file share its memory.
+        Parameters:
+        filename (string): The path of the snapshot file.
+        Returns:
+        CompactGraph: A read-only compiled graph backed by the file.
+        """
+        return snapshot.load_snapshot(filename)
+
+    def batch_shortest_paths(self, queries, max_workers=None, ordered=True):
+        """
+        Answer many independent shortest path queries across a pool of worker
+        processes, which share one memory-mapped snapshot of the graph.
+        Parameters:
+        queries (iterable): (source, target) pairs, answered with the shortest
+        path (or (distance, path) on a WeightedGraph), or bare source ids,
+        answered with a dictionary of distances to every reachable vertex.
+        max_workers (integer): The number of processes; defaults to the CPU count.
+        ordered (boolean): Yield results in query order. Otherwise, yield
+        (position, result) pairs as they complete.
+        Returns:
+        generator: The query results.
+        """
+        return batch.batch_shortest_paths(self, queries, max_workers, ordered)
+
+    def batch_vertices_n_away(self, queries, max_workers=None, ordered=True):
+        """
+        Answer many independent find_vertices_n_away queries across a pool of
+        worker processes, which share one memory-mapped snapshot of the graph.
+        Parameters:
+        queries (iterable): (start_id, target_distance) pairs.
+        max_workers (integer): The number of processes; defaults to the CPU count.
+        ordered (boolean): Yield results in query order. Otherwise, yield
+        (position, result) pairs as they complete.
+        Returns:
+        generator: The query results.
+        """
+        return batch.batch_vertices_n_away(self, queries, max_workers, ordered)
+
     def __str__(self):
         """Return a string representation of the graph."""
         return f'Graph with vertices: {self.get_vertices()}'
@@ -114,56 +570,87 @@ class Graph:
         """Return a string representation of the graph."""
         return self.__str__()
 
-    def bfs_traversal(self, start_id):
+    def iter_bfs(self, start_id):
         """
-        Traverse the graph using breadth-first search.
+        Lazily yield vertex ids in breadth-first order, starting with start_id.
+        The caller may stop iterating at any point; no further work is done.
+        """
+        for vertex_id, _ in self.iter_bfs_levels(start_id):
+            yield vertex_id
+
+    def iter_bfs_levels(self, start_id, max_depth=None):
+        """
+        Lazily yield (vertex id, depth) pairs in breadth-first order, where
+        depth is the number of edges from start_id.
+        Parameters:
+        start_id (string): The id of the start vertex.
+        max_depth (integer): Do not expand vertices at this depth, so nothing
+        deeper is ever visited. If None, visit everything reachable.
         """
         if not self.contains_id(start_id):
-            raise KeyError("One or both vertices are not in the graph!")
+            raise KeyError("Vertex not found")
+
+        stats = instrumentation.current()
 
         # Keep a set to denote which vertices we've seen before
-        seen = set()
-        seen.add(start_id)
+        seen = {start_id}
 
         # Keep a queue so that we visit vertices in the appropriate order
         queue = deque()
-        queue.append(self.get_vertex(start_id))
+        queue.append((self.get_vertex(start_id), 0))
 
         while queue:
-            current_vertex_obj = queue.popleft()
-            current_vertex_id = current_vertex_obj.get_id()
+            current_vertex_obj, depth = queue.popleft()
+            yield current_vertex_obj.get_id(), depth
 
-            # Process current node
-            print('Processing vertex {}'.format(current_vertex_id))
+            if depth == max_depth:
+                continue  # don't look past the requested depth
+            if stats is not None:
+                stats.visit(current_vertex_obj, len(queue))
 
             # Add its neighbors to the queue
-            for neighbor in current_vertex_obj.get_neighbors():
+            for neighbor in current_vertex_obj.iter_neighbors():
                 if neighbor.get_id() not in seen:
                     seen.add(neighbor.get_id())
-                    queue.append(neighbor)
+                    queue.append((neighbor, depth + 1))
 
-        return  # everything has been processed
+    @instrumented
+    def bfs_traversal(self, start_id):
+        """
+        Traverse the graph using breadth-first search.
+        Returns:
+        list<string>: The vertex ids in the order they were visited.
+        """
+        return list(self.iter_bfs(start_id))
 
-    def find_shortest_path(self, start_id, target_id):
+    @instrumented
+    @cached_query
+    def find_shortest_path(self, start_id, target_id, bidirectional=False):
         """
         Find and return the shortest path from start_id to target_id.
         Parameters:
         start_id (string): The id of the start vertex.
         target_id (string): The id of the target (end) vertex.
+        bidirectional (boolean): Search from both ends at once, which explores
+        far fewer vertices on large graphs.
         Returns:
         list<string>: A list of all vertex ids in the shortest path, from start to end.
         """
         if not self.contains_id(start_id) or not self.contains_id(target_id):
             raise KeyError("One or both vertices are not in the graph!")
 
-        # vertex keys we've seen before and their paths from the start vertex
-        vertex_id_to_path = {
-            start_id: [start_id]  # only one thing in the path
+        if bidirectional:
+            return self._find_shortest_path_bidirectional(start_id, target_id)
+
+        # vertex keys we've seen before and the vertex we reached them from
+        vertex_id_to_parent = {
+            start_id: None
         }
 
         # queue of vertices to visit next
         queue = deque()
         queue.append(self.get_vertex(start_id))
+        stats = instrumentation.current()
 
         # while queue is not empty
         while queue:
@@ -173,22 +660,93 @@ class Graph:
             # found target, can stop the loop early
             if current_vertex_id == target_id:
                 break
+            if stats is not None:
+                stats.visit(current_vertex_obj, len(queue))
 
-            neighbors = current_vertex_obj.get_neighbors()
-            for neighbor in neighbors:
-                if neighbor.get_id() not in vertex_id_to_path:
-                    current_path = vertex_id_to_path[current_vertex_id]
-                    # extend the path by 1 vertex
-                    next_path = current_path + [neighbor.get_id()]
-                    vertex_id_to_path[neighbor.get_id()] = next_path
+            for neighbor in current_vertex_obj.iter_neighbors():
+                if neighbor.get_id() not in vertex_id_to_parent:
+                    vertex_id_to_parent[neighbor.get_id()] = current_vertex_id
                     queue.append(neighbor)
-                    # print(vertex_id_to_path)
 
-        if target_id not in vertex_id_to_path:  # path not found
+        if target_id not in vertex_id_to_parent:  # path not found
             return None
 
-        return vertex_id_to_path[target_id]
+        return self._path_to(vertex_id_to_parent, target_id)
 
+    @staticmethod
+    def _path_to(vertex_id_to_parent, vertex_id):
+        """Follow parent pointers back from vertex_id and return the path from the root."""
+        path = []
+        while vertex_id is not None:
+            path.append(vertex_id)
+            vertex_id = vertex_id_to_parent[vertex_id]
+        path.reverse()
+        return path
+
+    def _find_shortest_path_bidirectional(self, start_id, target_id):
+        """
+        Breadth-first search from both ends, one whole level at a time,
+        always expanding the smaller frontier. The search ends after the first
+        level in which the two sides meet, at the best meeting vertex found.
+        """
+        if start_id == target_id:
+            return [start_id]
+
+        forward_parent = {start_id: None}
+        forward_depth = {start_id: 0}
+        backward_parent = {target_id: None}
+        backward_depth = {target_id: 0}
+        forward_frontier = [self.get_vertex(start_id)]
+        backward_frontier = [self.get_vertex(target_id)]
+
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meeting_id = self._expand_level(
+                    forward_frontier, forward_parent, forward_depth, backward_depth, methodcaller('iter_neighbors'))
+            else:
+                backward_frontier, meeting_id = self._expand_level(
+                    backward_frontier, backward_parent, backward_depth, forward_depth, self._get_predecessors)
+
+            if meeting_id is not None:
+                # stitch start -> meeting vertex onto meeting vertex -> target
+                path = self._path_to(forward_parent, meeting_id)
+                path.extend(reversed(self._path_to(backward_parent, meeting_id)[:-1]))
+                return path
+
+        return None
+
+    @staticmethod
+    def _expand_level(frontier, parent, depth, other_depth, get_next):
+        """
+        Expand one whole BFS level of a bidirectional search.
+        Returns:
+        (list, string): The next frontier, and the id of the meeting vertex
+        with the shortest total path, or None if the two sides did not meet.
+        """
+        next_frontier = []
+        best_meeting_id = None
+        best_length = None
+        stats = instrumentation.current()
+
+        for vertex in frontier:
+            vertex_id = vertex.get_id()
+            if stats is not None:
+                stats.visit(vertex, len(frontier) + len(next_frontier))
+            for neighbor in get_next(vertex):
+                neighbor_id = neighbor.get_id()
+                if neighbor_id not in parent:
+                    parent[neighbor_id] = vertex_id
+                    depth[neighbor_id] = depth[vertex_id] + 1
+                    next_frontier.append(neighbor)
+                if neighbor_id in other_depth:
+                    length = depth[neighbor_id] + other_depth[neighbor_id]
+                    if best_length is None or length < best_length:
+                        best_meeting_id, best_length = neighbor_id, length
+
+        return next_frontier, best_meeting_id
+
+    @instrumented
+    @cached_query
     def find_vertices_n_away(self, start_id, target_distance):
         """
         Find and return all vertices n distance away.
@@ -198,127 +756,221 @@ class Graph:
         Returns:
         list<string>: All vertex ids that are `target_distance` away from the start vertex
         """
-        if not self.contains_id(start_id):
-            raise KeyError("Vertex not found")
-
-        # vertex keys we've seen before
-        visited = set()
-        # list of vertices that are the target_distance away from start vertex
-        n_away_vertices = []
-
-        # queue of vertices to visit next
-        queue = deque()
-        # add first item and its distance (0)
-        queue.append((start_id, 0))
-        visited.add(start_id)
+        # the search stops expanding once it reaches target_distance
+        return [vertex_id for vertex_id, depth in self.iter_bfs_levels(start_id, target_distance)
+                if depth == target_distance]
 
-        # do bfs
-        while queue:
-            # removes vertex_obj from queue and return it
-            current_vertex_obj = queue.popleft()
-
-            current_vertex_id = current_vertex_obj[0]
-            vertex_distance = current_vertex_obj[1]
-
-            # if distances match, add to n_away_vertices
-            if vertex_distance == target_distance:
-                n_away_vertices.append(current_vertex_id)
-
-            # get neighbors of current vertex
-            neighbors = self.get_vertex(current_vertex_id).get_neighbors()
-
-            for neighbor in neighbors:
-                # print(neighbor)
-                if neighbor.get_id() not in visited:
-                    queue.append((neighbor.get_id(), vertex_distance + 1))
-                    visited.add(neighbor.get_id())
-
-        return n_away_vertices
+    @instrumented
+    def multi_source_bfs(self, source_ids, max_depth=None, batch_size=64):
+        """
+        Run a breadth-first search from every source at once, advancing a
+        batch of sources together with one bit per source on each vertex,
+        so one scan over the edges serves the whole batch.
+        Parameters:
+        source_ids (iterable): The ids of the start vertices.
+        max_depth (integer): Do not search past this depth. If None, search everything reachable.
+        batch_size (integer): How many sources to search together.
+        Returns:
+        dict: source id -> list of levels, where level d is the list of
+        vertex ids exactly d edges from the source.
+        """
+        source_ids = list(dict.fromkeys(source_ids))  # each source once, in order
+        compact = self.compile()
+        levels = {source_id: [] for source_id in source_ids}
+        sources = [compact.index_of(source_id) for source_id in source_ids]
+        for depth, positions, vertices in multi_source.iter_levels(compact, sources, max_depth, batch_size):
+            for position, vertex in zip(_as_list(positions), _as_list(vertices)):
+                source_levels = levels[source_ids[position]]
+                while len(source_levels) <= depth:
+                    source_levels.append([])
+                source_levels[depth].append(compact.id_of(vertex))
+        return levels
+
+    def find_vertices_n_away_many(self, source_ids, target_distance, batch_size=64):
+        """
+        Answer find_vertices_n_away for many start vertices in one bit-parallel search.
+        Parameters:
+        source_ids (iterable): The ids of the start vertices.
+        target_distance (integer): The distance from each start vertex we are looking for.
+        batch_size (integer): How many sources to search together.
+        Returns:
+        dict: start id -> list of the vertex ids `target_distance` away from it.
+        """
+        levels = self.multi_source_bfs(source_ids, max(target_distance, 0), batch_size)
+        return {source_id: source_levels[target_distance] if 0 <= target_distance < len(source_levels) else []
+                for source_id, source_levels in levels.items()}
 
+    @instrumented
+    def multi_source_distances(self, source_ids, max_depth=None, batch_size=64):
+        """
+        Compute the BFS distance from each source to every vertex with one
+        bit-parallel search; see multi_source_bfs.
+        Parameters:
+        source_ids (iterable): The ids of the start vertices.
+        max_depth (integer): Do not search past this depth. If None, search everything reachable.
+        batch_size (integer): How many sources to search together.
+        Returns:
+        tuple: The vertex ids for the matrix columns, and a sources x vertices
+        matrix of distances (a NumPy array if NumPy is installed, else lists),
+        with -1 for vertices not reached.
+        """
+        source_ids = list(source_ids)
+        compact = self.compile()
+        sources = [compact.index_of(source_id) for source_id in source_ids]
+        levels = multi_source.iter_levels(compact, sources, max_depth, batch_size)
+        if multi_source.np is not None:
+            distances = multi_source.np.full((len(sources), len(compact)), multi_source.UNREACHED)
+            for depth, positions, vertices in levels:
+                distances[positions, vertices] = depth
+        else:
+            distances = [[multi_source.UNREACHED] * len(compact) for _ in sources]
+            for depth, positions, vertices in levels:
+                for position, vertex in zip(positions, vertices):
+                    distances[position][vertex] = depth
+        return compact.get_vertex_ids(), distances
+
+    @instrumented
     def is_bipartite(self):
         """
         Return True if the graph is bipartite, and False otherwise.
         """
-        queue = deque()
-        visited = {}
-        # visited = set()
-
-        current_color = 0
-
-        current_vertex_id = choice(list(self.__vertex_dict.keys()))
-
-        queue.append(current_vertex_id)
-        visited[current_vertex_id] = current_color
-        # visited.add((current_vertex_id, current_color))
-
-        while queue:
-            # use bitwise operator to 'change color' (toggle 0 and 1)
-            current_color ^= 1
-
-            # grab next in queue
-            current_vertex_id = queue.popleft()
-
-            # get neighbors
-            neighbors = self.get_vertex(current_vertex_id).get_neighbors()
-
-            for neighbor in neighbors:
-                # if not already visited,
-                if neighbor.get_id() not in visited.keys():
-                    # tag neighbor with alt color, add to visited
-                    visited[neighbor.get_id()] = current_color
-
-                    # add to queue
-                    queue.append(neighbor.get_id())
-                else:
-                    # is neighbor same color as current vertex color?
-                    if visited[current_vertex_id] == visited[neighbor.get_id()]:
-                        return False
+        is_bipartite, _ = self.find_bipartition()
+        return is_bipartite
 
-        return True
-
-    def find_connected_components(self):
+    @instrumented
+    def find_bipartition(self):
         """
-        Return a list of all connected components, with each connected component represented as a list of vertex ids.
+        2-colour every component of the graph with breadth-first search,
+        ignoring edge direction. Runs in O(V + E) and is deterministic.
+        Returns:
+        (True, (list, list)): The two sides of the partition, if the graph is bipartite.
+        (False, list): Otherwise, the vertex ids around an odd-length cycle,
+        which proves the graph is not bipartite.
         """
-        vertices = set(self.__vertex_dict.keys())
-
-        components = []
+        color = {}  # vertex id -> 0 or 1, its depth parity in the BFS forest
+        parent = {}  # vertex id -> BFS tree parent id
+        stats = instrumentation.current()
 
-        # while there are unvisited vertices
-        while vertices:
-            component = []
-            queue = []
+        for root in self.get_vertices():
+            if root.get_id() in color:
+                continue
 
-            start_id = vertices.pop()
+            color[root.get_id()] = 0
+            parent[root.get_id()] = None
+            queue = deque([root])
 
-            # add initial vertex to queue and component lists
-            queue.append(start_id)
-            component.append(start_id)
-
-            # while queue is not empty
             while queue:
-                # pop vertex in queue
-                current_id = queue.pop()
-                current_vertex = self.get_vertex(current_id)
+                current_vertex_obj = queue.popleft()
+                current_id = current_vertex_obj.get_id()
+                if stats is not None:
+                    stats.visit(current_vertex_obj, len(queue))
+
+                neighbors = current_vertex_obj.iter_neighbors()
+                if self.is_directed():
+                    neighbors = chain(neighbors, self._get_predecessors(current_vertex_obj))
 
-                # get neighbors
-                for neighbor in current_vertex.get_neighbors():
+                for neighbor in neighbors:
                     neighbor_id = neighbor.get_id()
+                    if neighbor_id not in color:
+                        # tag neighbor with the opposite colour (toggle 0 and 1)
+                        color[neighbor_id] = color[current_id] ^ 1
+                        parent[neighbor_id] = current_id
+                        queue.append(neighbor)
+                    elif color[neighbor_id] == color[current_id]:
+                        return False, self._odd_cycle(parent, current_id, neighbor_id)
+
+        left = [vertex_id for vertex_id, side in color.items() if side == 0]
+        right = [vertex_id for vertex_id, side in color.items() if side == 1]
+        return True, (left, right)
+
+    @staticmethod
+    def _odd_cycle(parent, vertex_id1, vertex_id2):
+        """
+        Return the cycle formed by an edge between two same-coloured vertices
+        and their paths up the BFS tree to their lowest common ancestor.
+        Both vertices have the same depth, so the cycle has odd length.
+        """
+        path1 = [vertex_id1]
+        path2 = [vertex_id2]
+        while path1[-1] != path2[-1]:
+            path1.append(parent[path1[-1]])
+            path2.append(parent[path2[-1]])
+        # vertex_id1 ... ancestor ... vertex_id2, closed by the edge back to vertex_id1
+        return path1 + path2[-2::-1]
+
+    @instrumented
+    def find_connected_components(self, mode=components.WEAK):
+        """
+        Return a list of all connected components, with each connected component represented as a list of vertex ids.
+        Parameters:
+        mode (string): 'weak' ignores edge direction; 'strong' groups vertices
+        that can each reach the other. Both are the same for undirected graphs.
+        """
+        return components.group_by_label(self.component_labels(mode))
 
-                    # if neighbor unvisited, remove from vertices list
-                    if neighbor_id in vertices:
-                        vertices.remove(neighbor_id)
+    @instrumented
+    def component_labels(self, mode=components.WEAK):
+        """
+        Return a dictionary of vertex id -> component label. The labels are
+        computed in O(V + E) and cached until the graph next changes.
+        Parameters:
+        mode (string): 'weak' or 'strong', as in find_connected_components.
+        """
+        if mode not in (components.WEAK, components.STRONG):
+            raise ValueError(f'Unknown component mode: {mode}')
+        if mode == components.STRONG and not self.is_directed():
+            mode = components.WEAK  # the same thing, and union-find is cheaper
+
+        if mode not in self._component_labels:
+            if mode == components.WEAK and self._get_connectivity() is not None:
+                self._component_labels[mode] = self._get_connectivity().labels()
+            elif mode == components.WEAK:
+                self._component_labels[mode] = components.weak_component_labels(self)
+            else:
+                self._component_labels[mode] = components.strong_component_labels(self)
+        return self._component_labels[mode]
+
+    def in_same_component(self, vertex_id1, vertex_id2, mode=components.WEAK):
+        """
+        Return True if both vertices are in the same component. After the
+        first call this is a constant-time lookup until the graph changes.
+        """
+        labels = self.component_labels(mode)
+        if vertex_id1 not in labels or vertex_id2 not in labels:
+            raise KeyError("One or both vertices are not in the graph!")
+        return labels[vertex_id1] == labels[vertex_id2]
 
-                    # if neighbor not already in component, add to queue for processing, add to component list
-                    if neighbor_id not in component:
-                        queue.append(neighbor_id)
-                        component.append(neighbor_id)
+    def enable_connectivity_index(self):
+        """
+        Start maintaining weakly connected components incrementally, as
+        vertices and edges are added. Afterwards `are_connected` and
+        `component_size` answer in near-constant time without rescanning the
+        graph, even between mutations. Removals cost one rebuild, at the
+        next query.
+        """
+        if self._connectivity is None:
+            self._connectivity = components.ConnectivityIndex(self)
+            self._component_labels.pop(components.WEAK, None)
 
-            # add component group to components
-            components.append(component)
+    def are_connected(self, vertex_id1, vertex_id2):
+        """
+        Return True if the two vertices are in the same weakly connected component.
+        Uses the connectivity index if enabled, and cached component labels otherwise.
+        """
+        if self._get_connectivity() is not None:
+            return self._get_connectivity().connected(vertex_id1, vertex_id2)
+        return self.in_same_component(vertex_id1, vertex_id2)
 
-        return components
+    def component_size(self, vertex_id):
+        """Return the number of vertices in vertex_id's weakly connected component."""
+        if not self.contains_id(vertex_id):
+            raise KeyError("Vertex not found")
+        if self._get_connectivity() is not None:
+            return self._get_connectivity().component_size(vertex_id)
+        labels = self.component_labels()
+        return sum(1 for label in labels.values() if label == labels[vertex_id])
 
+    @instrumented
     def find_path_dfs_iter(self, start_id, target_id):
         """
         Use DFS with a stack to find a path from start_id to target_id.
@@ -331,10 +983,11 @@ class Graph:
         stack = deque()
         stack.append(self.get_vertex(start_id))
 
-        # vertex keys we've seen before and their paths from the start vertex
-        path_to_target = {
-            start_id: [start_id]
+        # vertex keys we've seen before and the vertex we reached them from
+        vertex_id_to_parent = {
+            start_id: None
         }
+        stats = instrumentation.current()
 
         # while stack is not empty
         while stack:
@@ -344,111 +997,150 @@ class Graph:
             # found target, can stop the loop early
             if current_vertex_id == target_id:
                 break
+            if stats is not None:
+                stats.visit(current_vertex_obj, len(stack))
 
-            neighbors = current_vertex_obj.get_neighbors()
-            for neighbor in neighbors:
-                if neighbor.get_id() not in path_to_target:
+            for neighbor in current_vertex_obj.iter_neighbors():
+                if neighbor.get_id() not in vertex_id_to_parent:
                     stack.append(neighbor)
-                    # print(vertex_id_to_path)
-
-                    current_path = path_to_target[current_vertex_id]
-                    # extend the path by 1 vertex
-                    next_path = current_path + [neighbor.get_id()]
-                    path_to_target[neighbor.get_id()] = next_path
+                    vertex_id_to_parent[neighbor.get_id()] = current_vertex_id
 
-        if target_id not in path_to_target:  # path not found
+        if target_id not in vertex_id_to_parent:  # path not found
             return None
 
-        return path_to_target[target_id]
+        return self._path_to(vertex_id_to_parent, target_id)
 
-    def dfs_traversal(self, start_id):
-        """Visit each vertex, starting with start_id, in DFS order."""
-
-        visited = set()  # set of vertices we've visited so far
+    def _dfs_events(self, start_ids=None):
+        """
+        Run an iterative depth-first search and yield its events as they happen.
 
-        def dfs_traversal_recursive(start_vertex):
-            print(f'Visiting vertex {start_vertex.get_id()}')
+        Vertices are coloured white (unseen), grey (on the current path) or
+        black (finished). An explicit stack of neighbor iterators replaces
+        recursion, so deep graphs cannot overflow the call stack.
+        Parameters:
+        start_ids (iterable<string>): The vertices to start from, in order.
+        If None, every vertex is covered.
+        Yields:
+        (string, string, string): One of
+        (PRE_ORDER, vertex_id, parent_id) when a vertex is first reached,
+        (POST_ORDER, vertex_id, parent_id) when all its descendants are done, and
+        (BACK_EDGE, vertex_id, neighbor_id) for an edge back to a grey vertex,
+        which means the graph has a cycle.
+        """
+        if start_ids is None:
+            start_ids = [vertex.get_id() for vertex in self.get_vertices()]
+        is_directed = self.is_directed()
+        color = {}  # vertex id -> GREY or BLACK; missing means WHITE
+        stats = instrumentation.current()
+
+        for start_id in start_ids:
+            if start_id in color:
+                continue
+
+            color[start_id] = GREY
+            yield PRE_ORDER, start_id, None
+            stack = [(start_id, None, self.get_vertex(start_id).iter_neighbors())]
+            if stats is not None:
+                stats.visit(self.get_vertex(start_id), len(stack))
+
+            while stack:
+                vertex_id, parent_id, neighbors = stack[-1]
+                for neighbor in neighbors:
+                    neighbor_id = neighbor.get_id()
+                    state = color.get(neighbor_id, WHITE)
+                    if state == WHITE:
+                        color[neighbor_id] = GREY
+                        yield PRE_ORDER, neighbor_id, vertex_id
+                        stack.append((neighbor_id, vertex_id, neighbor.iter_neighbors()))
+                        if stats is not None:
+                            stats.visit(neighbor, len(stack))
+                        break  # descend; this frame resumes from its iterator later
+                    # in an undirected graph the edge back to the parent is the one we came in on
+                    if state == GREY and (is_directed or neighbor_id != parent_id):
+                        yield BACK_EDGE, vertex_id, neighbor_id
+                else:
+                    stack.pop()
+                    color[vertex_id] = BLACK
+                    yield POST_ORDER, vertex_id, parent_id
 
-            # recurse for each vertex in neighbors
-            for neighbor in start_vertex.get_neighbors():
-                if neighbor.get_id() not in visited:
-                    visited.add(neighbor.get_id())
-                    dfs_traversal_recursive(neighbor)
-            return
+    def iter_dfs(self, start_id=None, order=PRE_ORDER):
+        """
+        Lazily yield vertex ids in depth-first order.
+        Parameters:
+        start_id (string): The vertex to start from. If None, cover the whole graph.
+        order (string): PRE_ORDER ('pre') or POST_ORDER ('post').
+        """
+        if order not in (PRE_ORDER, POST_ORDER):
+            raise ValueError(f'Unknown depth-first order: {order}')
+        if start_id is not None and not self.contains_id(start_id):
+            raise KeyError("Vertex not found")
 
-        visited.add(start_id)
-        start_vertex = self.get_vertex(start_id)
-        dfs_traversal_recursive(start_vertex)
+        start_ids = None if start_id is None else [start_id]
+        for event, vertex_id, _ in self._dfs_events(start_ids):
+            if event == order:
+                yield vertex_id
 
-        return
+    @instrumented
+    def dfs_traversal(self, start_id):
+        """Visit each vertex, starting with start_id, in DFS order."""
+        for vertex_id in self.iter_dfs(start_id):
+            print(f'Visiting vertex {vertex_id}')
 
+    @instrumented
     def contains_cycle(self):
-
-        visited = set()
-        stack = set()
-
-        start_id = choice(list(self.__vertex_dict.keys()))
-
-        def dfs_cycle_check(vertex):
-            # print(f'Visiting vertex {start_vertex.get_id()}')
-
-            # if it's already visited, it's been cleared for no cycle
-            if vertex in visited:
-                return False
-
-            # else, add vertex to visited and to stack
-            visited.add(vertex)
-            stack.add(vertex)
-
-            # recurse for each vertex in neighbors
-            for neighbor in vertex.get_neighbors():
-                # if neighbor is already in the stack or seen during the recurse, it's a cycle
-                if neighbor in stack or dfs_cycle_check(neighbor):
-                    return True
-            # otherwise, no cycle, recurse done, pop from stack
-            stack.remove(vertex)
-            return False
-
-        stack.add(start_id)
-        start_vertex = self.get_vertex(start_id)
-
-        if dfs_cycle_check(start_vertex):
-            return True
+        """
+        Return True if the graph contains a cycle, and False otherwise.
+        Every vertex is covered, not just those reachable from one start.
+        """
+        for event, _, _ in self._dfs_events():
+            if event == BACK_EDGE:
+                return True
         return False
 
-        # An alternative: any() function returns True if any element of an iterable is True, returns False if any is False
-
-        # return any(dfs_cycle_check(start_vertex) for start_vertex in self.__vertex_dict.values())
-
-    def topological_sort(self):
+    @instrumented
+    def topological_sort(self, method='dfs'):
         """
         Return a valid ordering of vertices in a directed acyclic graph. If the graph contains a cycle, throw a ValueError.
+        Parameters:
+        method (string): 'dfs' orders by reversed depth-first post-order;
+        'kahn' repeatedly removes vertices with no remaining incoming edges,
+        using the reverse adjacency index for the in-degrees.
         """
+        if method == 'kahn':
+            return self._topological_sort_kahn()
+        if method != 'dfs':
+            raise ValueError(f'Unknown topological sort method: {method}')
 
         stack = []
-        visited = set()
 
-        if self.contains_cycle():
-            raise ValueError('Graph not DAG')
-
-        def dfs_topo_sort(vertex):
-            # print(f'Visiting vertex {vertex.get_id()}')
-            visited.add(vertex.get_id())
+        # A vertex is finished only after everything reachable from it, so the
+        # reversed post-order lists every vertex before all of its neighbors.
+        for event, vertex_id, _ in self._dfs_events():
+            if event == BACK_EDGE:
+                raise ValueError('Graph not DAG')
+            if event == POST_ORDER:
+                stack.append(vertex_id)
 
-            # recurse for each vertex in neighbors
-            for neighbor in vertex.get_neighbors():
-                if neighbor.get_id() not in visited:
-                    dfs_topo_sort(neighbor)
+        # Reverse the contents of the stack and return it as a valid ordering.
+        return stack[::-1]
 
-            # On the way back up the recursion tree (that is, after visiting a vertex's neighbors), add the vertex to the stack.
-            # print(f'Visited: {visited} \nAdding {vertex.get_id()} to stack {stack}')
-            stack.append(vertex.get_id())
+    def _topological_sort_kahn(self):
+        """Kahn's algorithm: a BFS over vertices whose predecessors are all placed."""
+        in_degree = {vertex.get_id(): self.in_degree(vertex.get_id()) for vertex in self.get_vertices()}
+        queue = deque(vertex for vertex in self.get_vertices() if in_degree[vertex.get_id()] == 0)
+        order = []
+        stats = instrumentation.current()
 
-        # For each unvisited vertex, execute a DFS from that vertex.
-        for vertex in list(self.__vertex_dict.values()):
-            # print(vertex.get_id(), visited)
-            if vertex.get_id() not in visited:
-                dfs_topo_sort(vertex)
+        while queue:
+            vertex = queue.popleft()
+            order.append(vertex.get_id())
+            if stats is not None:
+                stats.visit(vertex, len(queue))
+            for neighbor in vertex.iter_neighbors():
+                in_degree[neighbor.get_id()] -= 1
+                if in_degree[neighbor.get_id()] == 0:
+                    queue.append(neighbor)
 
-        # Reverse the contents of the stack and return it as a valid ordering.
-        return stack[::-1]
\ No newline at end of file
+        if len(order) != len(in_degree):
+            raise ValueError('Graph not DAG')
+        return order
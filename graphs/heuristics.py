@@ -0,0 +1,65 @@
+from math import asin, cos, hypot, radians, sin, sqrt
+
+EUCLIDEAN = 'euclidean'
+HAVERSINE = 'haversine'
+
+# Mean radius of the Earth, in kilometres
+EARTH_RADIUS_KM = 6371.0088
+
+
+def no_heuristic(vertex_id, target_id):
+    """The zero lower bound, which turns A* back into Dijkstra's Algorithm."""
+    return 0
+
+
+def euclidean_distance(point1, point2):
+    """Return the straight-line distance between two (x, y, ...) points."""
+    return hypot(*(a - b for a, b in zip(point1, point2)))
+
+
+def haversine_distance(point1, point2, radius=EARTH_RADIUS_KM):
+    """
+    Return the great-circle distance between two points on a sphere.
+    Parameters:
+    point1, point2 (tuple): (latitude, longitude) pairs, in degrees.
+    radius (number): The radius of the sphere; by default, the Earth's in kilometres.
+    """
+    latitude1, longitude1 = map(radians, point1)
+    latitude2, longitude2 = map(radians, point2)
+    a = (sin((latitude2 - latitude1) / 2) ** 2
+         + cos(latitude1) * cos(latitude2) * sin((longitude2 - longitude1) / 2) ** 2)
+    return 2 * radius * asin(min(1.0, sqrt(a)))
+
+
+DISTANCE_FUNCTIONS = {
+    EUCLIDEAN: euclidean_distance,
+    HAVERSINE: haversine_distance,
+}
+
+
+def coordinate_heuristic(graph, distance_function, attribute='pos'):
+    """
+    Build an A* heuristic from the coordinates stored as a vertex attribute.
+    The heuristic is admissible as long as no edge weighs less than the
+    distance_function distance between its ends.
+    Parameters:
+    graph (Graph): The graph whose vertices have the coordinate attribute.
+    distance_function (callable or string): Takes two coordinates and returns
+    their distance; or one of 'euclidean' and 'haversine'.
+    attribute (string): The name of the vertex attribute holding the coordinates.
+    Returns:
+    callable: heuristic(vertex_id, target_id) -> lower bound on their distance.
+    """
+    if isinstance(distance_function, str):
+        if distance_function not in DISTANCE_FUNCTIONS:
+            raise ValueError(f'Unknown heuristic: {distance_function}')
+        distance_function = DISTANCE_FUNCTIONS[distance_function]
+
+    def heuristic(vertex_id, target_id):
+        position = graph.get_vertex_attribute(vertex_id, attribute)
+        target_position = graph.get_vertex_attribute(target_id, attribute)
+        if position is None or target_position is None:
+            return 0  # no coordinates: fall back to plain Dijkstra for this vertex
+        return distance_function(position, target_position)
+
+    return heuristic
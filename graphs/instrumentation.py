@@ -0,0 +1,250 @@
+"""
+Opt-in instrumentation for graph algorithms.
+
+Every public algorithm is wrapped with `instrumented`. While at least one
+sink is registered with `add_sink`, each call gets an AlgorithmStats whose
+counters the algorithm's inner loops fill in, and the finished stats are
+passed to every sink. With no sinks registered, the wrapper is a single
+list check and the algorithms skip all counting.
+
+A sink is any callable taking an AlgorithmStats, for example:
+
+    aggregator = StatsAggregator()
+    add_sink(aggregator)
+    ...
+    print(aggregator.to_prometheus())
+"""
+import json
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+
+_sinks = []  # callables receiving each finished AlgorithmStats
+_local = threading.local()  # .stats: the AlgorithmStats of the running algorithm, per thread
+
+COUNTERS = ('vertices_visited', 'edges_scanned', 'relaxations', 'heap_pushes', 'peak_frontier')
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised inside an algorithm that runs past the deadline of its AlgorithmStats."""
+
+
+class AlgorithmStats:
+    """ AlgorithmStats Class
+    The work done by one algorithm call: vertices expanded, edges scanned,
+    distance relaxations, heap pushes, the peak size of the search frontier
+    (queue, stack or heap), and the wall time.
+
+    If a deadline is set, the algorithm raises DeadlineExceeded from its next
+    vertex expansion once the deadline has passed.
+    """
+    __slots__ = ('algorithm', 'arguments', 'seconds', 'deadline') + COUNTERS
+
+    def __init__(self, algorithm, arguments=(), deadline=None):
+        """
+        Parameters:
+        algorithm (string): The qualified name of the algorithm, e.g. 'Graph.bfs_traversal'.
+        arguments (tuple): The positional arguments of the call.
+        deadline (number): A time.perf_counter() value to stop at, or None.
+        """
+        self.algorithm = algorithm
+        self.arguments = arguments
+        self.seconds = 0.0
+        self.deadline = deadline
+        self.vertices_visited = 0
+        self.edges_scanned = 0
+        self.relaxations = 0
+        self.heap_pushes = 0
+        self.peak_frontier = 0
+
+    def visit(self, vertex_obj, frontier_size):
+        """Count the expansion of vertex_obj, whose edges are all scanned, with frontier_size vertices waiting."""
+        self.vertices_visited += 1
+        self.edges_scanned += vertex_obj.get_degree()
+        if frontier_size > self.peak_frontier:
+            self.peak_frontier = frontier_size
+        if self.deadline is not None and perf_counter() > self.deadline:
+            raise DeadlineExceeded(f'{self.algorithm} ran past its deadline')
+
+    def visit_many(self, vertex_count, edge_count, frontier_size=0):
+        """
+        Count vertex_count expansions scanning edge_count edges in all, for
+        algorithms that work on many vertices (or matrix rows) at once.
+        """
+        self.vertices_visited += vertex_count
+        self.edges_scanned += edge_count
+        if frontier_size > self.peak_frontier:
+            self.peak_frontier = frontier_size
+        if self.deadline is not None and perf_counter() > self.deadline:
+            raise DeadlineExceeded(f'{self.algorithm} ran past its deadline')
+
+    def push(self, heap_size):
+        """Count a heap push that left heap_size entries on the heap."""
+        self.heap_pushes += 1
+        if heap_size > self.peak_frontier:
+            self.peak_frontier = heap_size
+
+    def as_dict(self):
+        """Return the stats as a JSON-serializable dictionary."""
+        stats = {counter: getattr(self, counter) for counter in COUNTERS}
+        stats.update(algorithm=self.algorithm, arguments=repr(self.arguments), seconds=self.seconds)
+        return stats
+
+    def __repr__(self):
+        """Return a one-line summary of the stats."""
+        counters = ', '.join(f'{counter}={getattr(self, counter)}' for counter in COUNTERS)
+        return f'{self.algorithm}{self.arguments!r}: {self.seconds * 1000:.3f} ms, {counters}'
+
+
+def current():
+    """Return the AlgorithmStats of the algorithm running in this thread, or None if not instrumented."""
+    return getattr(_local, 'stats', None)
+
+
+def add_sink(sink):
+    """Start sending the stats of every algorithm call to sink(stats)."""
+    _sinks.append(sink)
+
+
+def remove_sink(sink):
+    """Stop sending stats to a sink registered with add_sink."""
+    _sinks.remove(sink)
+
+
+def instrumented(method):
+    """
+    Decorate a graph algorithm so that, while any sink is registered, its
+    calls are timed and counted and their stats sent to the sinks.
+    Algorithms called by an instrumented algorithm add to its stats instead
+    of reporting their own.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not _sinks or getattr(_local, 'stats', None) is not None:
+            return method(self, *args, **kwargs)
+
+        with track(AlgorithmStats(f'{type(self).__name__}.{method.__name__}', args)):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def track(stats):
+    """
+    Make stats the current AlgorithmStats of this thread for the duration of
+    the block, so every instrumented algorithm run inside it counts into
+    stats (and honours its deadline), even with no sinks registered. The
+    block is timed, and stats are sent to the sinks when it ends.
+    """
+    previous = getattr(_local, 'stats', None)
+    _local.stats = stats
+    start = perf_counter()
+    try:
+        yield stats
+    finally:
+        stats.seconds = perf_counter() - start
+        _local.stats = previous
+        for sink in list(_sinks):
+            sink(stats)
+
+
+class StatsAggregator:
+    """ StatsAggregator Class
+    A thread-safe sink totalling the stats of every call per algorithm, and
+    keeping the slowest calls so they can be explained afterwards.
+    """
+
+    def __init__(self, keep_slowest=10):
+        """
+        Parameters:
+        keep_slowest (integer): How many of the slowest calls to keep.
+        """
+        self.__lock = threading.Lock()
+        self.__totals = {}  # algorithm -> {'calls', 'seconds', 'max_seconds', counter totals}
+        self.__slowest = []  # the slowest AlgorithmStats, slowest first
+        self.__keep_slowest = keep_slowest
+
+    def __call__(self, stats):
+        """Add one call's stats."""
+        with self.__lock:
+            totals = self.__totals.get(stats.algorithm)
+            if totals is None:
+                totals = self.__totals[stats.algorithm] = dict.fromkeys(
+                    ('calls', 'seconds', 'max_seconds') + COUNTERS, 0)
+            totals['calls'] += 1
+            totals['seconds'] += stats.seconds
+            totals['max_seconds'] = max(totals['max_seconds'], stats.seconds)
+            for counter in COUNTERS:
+                if counter == 'peak_frontier':
+                    totals[counter] = max(totals[counter], stats.peak_frontier)
+                else:
+                    totals[counter] += getattr(stats, counter)
+
+            if self.__keep_slowest:
+                self.__slowest.append(stats)
+                self.__slowest.sort(key=lambda each: each.seconds, reverse=True)
+                del self.__slowest[self.__keep_slowest:]
+
+    def summary(self):
+        """
+        Return the totals per algorithm.
+        Returns:
+        dict: algorithm -> calls, total and max seconds, counter totals (and
+        the largest peak_frontier).
+        """
+        with self.__lock:
+            return {algorithm: dict(totals) for algorithm, totals in self.__totals.items()}
+
+    def slowest(self):
+        """Return the stats of the slowest calls seen, slowest first."""
+        with self.__lock:
+            return list(self.__slowest)
+
+    def reset(self):
+        """Forget everything collected so far."""
+        with self.__lock:
+            self.__totals.clear()
+            self.__slowest.clear()
+
+    def to_json(self):
+        """Return the totals and the slowest calls as a JSON string."""
+        return json.dumps({
+            'algorithms': self.summary(),
+            'slowest': [stats.as_dict() for stats in self.slowest()],
+        }, indent=2, sort_keys=True)
+
+    def to_prometheus(self, prefix='graph_algorithm'):
+        """Return the totals in the Prometheus text exposition format."""
+        summary = self.summary()
+        lines = []
+        metrics = [('calls', 'calls_total', 'counter'), ('seconds', 'seconds_total', 'counter'),
+                   ('max_seconds', 'max_seconds', 'gauge')]
+        metrics += [(counter, counter + '_total', 'counter') for counter in COUNTERS if counter != 'peak_frontier']
+        metrics.append(('peak_frontier', 'peak_frontier', 'gauge'))
+        for key, name, kind in metrics:
+            lines.append(f'# TYPE {prefix}_{name} {kind}')
+            for algorithm in sorted(summary):
+                lines.append(f'{prefix}_{name}{{algorithm="{algorithm}"}} {summary[algorithm][key]}')
+        return '\n'.join(lines) + '\n'
+
+
+class JsonLinesSink:
+    """ JsonLinesSink Class
+    A sink writing every call's stats as one line of JSON to a text stream.
+    """
+
+    def __init__(self, stream):
+        """
+        Parameters:
+        stream (file): An open text stream, e.g. sys.stderr or a log file.
+        """
+        self.__stream = stream
+        self.__lock = threading.Lock()
+
+    def __call__(self, stats):
+        """Write one call's stats."""
+        line = json.dumps(stats.as_dict(), sort_keys=True)
+        with self.__lock:
+            self.__stream.write(line + '\n')
@@ -0,0 +1,219 @@
+"""
+ALT (A*, landmarks and the triangle inequality) preprocessing.
+
+For a landmark L and any vertices v and t, the triangle inequality gives
+
+    d(v, t) >= d(L, t) - d(L, v)    and    d(v, t) >= d(v, L) - d(t, L)
+
+so once the distances from (and, in a directed graph, to) a few landmarks
+are known, the largest of these bounds is an A* heuristic for any target.
+It is consistent, so A* stays exact, and it is usually much tighter than
+a geometric heuristic, because it follows the real road network.
+
+Binary file layout (little-endian, sections padded to 8 bytes, see snapshot):
+
+    header       magic b'GALT', version, flags, vertex count, landmark
+                 count, id table size in bytes
+    id table     as in graph snapshots
+    landmarks    int64[k] vertex indices of the landmarks
+    from         float64[k * V] distance from each landmark to each vertex
+    to           float64[k * V] distance from each vertex to each landmark,
+                 directed graphs only
+"""
+import random
+import struct
+from array import array
+
+from graphs.snapshot import SectionReader, encode_vertex_ids, write_sections
+
+MAGIC = b'GALT'
+VERSION = 1
+HEADER = struct.Struct('<4sHHqqq')
+
+FLAG_DIRECTED = 1
+FLAG_INTEGER_IDS = 8  # vertex ids are ints instead of strings, as in snapshots
+
+FARTHEST = 'farthest'
+RANDOM = 'random'
+
+INFINITY = float('inf')
+
+
+class LandmarkIndex:
+    """ LandmarkIndex Class
+    Distances between k landmark vertices and every vertex of a WeightedGraph,
+    used as lower bounds to guide A* search. Memory use is k * V floats (twice
+    that for a directed graph), so k trades memory for tighter bounds.
+
+    The index describes the graph at the time it was built: rebuild it after
+    changing the graph, or the bounds may overestimate and A* may return
+    longer paths.
+    """
+
+    def __init__(self, vertex_ids, landmarks, from_distances, to_distances=None):
+        """
+        Initialize an index from already-computed distance arrays.
+        Parameters:
+        vertex_ids (sequence): The vertex id for each index.
+        landmarks (sequence<int>): The vertex indices of the landmarks.
+        from_distances (sequence<float>): k * V distances from each landmark.
+        to_distances (sequence<float>): k * V distances to each landmark, or
+        None for an undirected graph, where both are the same.
+        """
+        self.__vertex_ids = vertex_ids
+        self.__index = {vertex_id: i for i, vertex_id in enumerate(vertex_ids)}
+        self.__landmarks = landmarks
+        self.__from = from_distances
+        self.__to = to_distances
+
+    @classmethod
+    def build(cls, graph, k=8, strategy=FARTHEST, seed=None):
+        """
+        Pick k landmarks and compute their distances with Dijkstra's Algorithm.
+        Takes O(k (E + V log V)) time.
+        Parameters:
+        graph (WeightedGraph): The graph to index.
+        k (integer): The number of landmarks.
+        strategy (string): 'farthest' repeatedly adds the vertex farthest from
+        every landmark chosen so far, which spreads them around the edge of
+        the graph; 'random' picks them uniformly.
+        seed: Seeds the random choices, for a reproducible index.
+        Returns:
+        LandmarkIndex: The index.
+        """
+        if strategy not in (FARTHEST, RANDOM):
+            raise ValueError(f'Unknown landmark strategy: {strategy}')
+
+        vertex_ids = [vertex.get_id() for vertex in graph.get_vertices()]
+        k = min(k, len(vertex_ids))
+        rng = random.Random(seed)
+        reverse = _reverse_graph(graph) if graph.is_directed() else None
+
+        landmarks = array('q')
+        from_distances = array('d')
+        to_distances = array('d') if reverse is not None else None
+
+        if strategy == RANDOM:
+            chosen = rng.sample(range(len(vertex_ids)), k)
+        elif vertex_ids:
+            # distance to the nearest landmark so far, seeded with the
+            # distances from a random vertex so the first pick is far from it
+            nearest = list(_distance_row(graph, vertex_ids, rng.choice(vertex_ids)))
+
+        for _ in range(k):
+            if strategy == FARTHEST:
+                # vertices no landmark reaches (inf) come first, covering every component
+                landmark = max(range(len(vertex_ids)), key=nearest.__getitem__)
+            else:
+                landmark = chosen[len(landmarks)]
+            landmarks.append(landmark)
+
+            distances = _distance_row(graph, vertex_ids, vertex_ids[landmark])
+            from_distances.extend(distances)
+            if reverse is not None:
+                to_distances.extend(_distance_row(reverse, vertex_ids, vertex_ids[landmark]))
+
+            if strategy == FARTHEST:
+                for i, distance in enumerate(distances):
+                    if nearest[i] == INFINITY or (distance != INFINITY and distance < nearest[i]):
+                        nearest[i] = distance
+                nearest[landmark] = -1  # never pick the same landmark twice
+
+        return cls(vertex_ids, landmarks, from_distances, to_distances)
+
+    def __len__(self):
+        """Return the number of landmarks."""
+        return len(self.__landmarks)
+
+    def get_landmarks(self):
+        """Return the ids of the landmark vertices."""
+        return [self.__vertex_ids[i] for i in self.__landmarks]
+
+    def lower_bound(self, vertex_id, target_id):
+        """
+        Return the best triangle-inequality lower bound on the distance from
+        vertex_id to target_id (inf if target_id cannot be reached from it).
+        Vertices added after the index was built get a bound of 0.
+        """
+        vertex = self.__index.get(vertex_id)
+        target = self.__index.get(target_id)
+        if vertex is None or target is None:
+            return 0
+
+        vertex_count = len(self.__vertex_ids)
+        from_distances = self.__from
+        to_distances = self.__from if self.__to is None else self.__to
+
+        # inf - inf is nan, which never compares greater, so landmarks that
+        # reach neither vertex are skipped without a special case
+        best = 0
+        for base in range(0, len(self.__landmarks) * vertex_count, vertex_count):
+            bound = from_distances[base + target] - from_distances[base + vertex]
+            if bound > best:
+                best = bound
+            bound = to_distances[base + vertex] - to_distances[base + target]
+            if bound > best:
+                best = bound
+        return best
+
+    def __call__(self, vertex_id, target_id):
+        """Return lower_bound(vertex_id, target_id), so the index can be passed as an A* heuristic."""
+        return self.lower_bound(vertex_id, target_id)
+
+    def save(self, filename):
+        """
+        Write the index to a binary file.
+        Parameters:
+        filename (string): The path of the file to write.
+        """
+        integer_ids, id_sections, id_table_size = encode_vertex_ids(self.__vertex_ids)
+        flags = FLAG_INTEGER_IDS if integer_ids else 0
+        if self.__to is not None:
+            flags |= FLAG_DIRECTED
+
+        sections = id_sections + [array('q', self.__landmarks), array('d', self.__from)]
+        if self.__to is not None:
+            sections.append(array('d', self.__to))
+
+        with open(filename, 'wb') as f:
+            header = HEADER.pack(MAGIC, VERSION, flags, len(self.__vertex_ids), len(self.__landmarks), id_table_size)
+            write_sections(f, header, sections)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Load an index saved with `save`, memory-mapping its distance arrays.
+        Parameters:
+        filename (string): The path of the file.
+        Returns:
+        LandmarkIndex: The index.
+        """
+        reader = SectionReader(filename, HEADER)
+        magic, version, flags, vertex_count, landmark_count, id_table_size = reader.header
+        if magic != MAGIC:
+            raise ValueError('Not a landmark index file')
+        if version != VERSION:
+            raise ValueError(f'Unsupported landmark index version: {version}')
+
+        vertex_ids = reader.take_vertex_ids(flags & FLAG_INTEGER_IDS, vertex_count, id_table_size)
+        landmarks = reader.take('q', landmark_count)
+        from_distances = reader.take('d', landmark_count * vertex_count)
+        to_distances = reader.take('d', landmark_count * vertex_count) if flags & FLAG_DIRECTED else None
+        return cls(vertex_ids, landmarks, from_distances, to_distances)
+
+
+def _distance_row(graph, vertex_ids, source_id):
+    """Return the distances from source_id to every vertex, in vertex_ids order (inf if unreachable)."""
+    distances, _ = graph._dijkstra(source_id)
+    return array('d', [distances.get(vertex_id, INFINITY) for vertex_id in vertex_ids])
+
+
+def _reverse_graph(graph):
+    """Return a copy of a directed WeightedGraph with every edge reversed."""
+    reverse = type(graph)(is_directed=True)
+    for vertex in graph.get_vertices():
+        reverse.add_vertex(vertex.get_id())
+    reverse.add_edges_bulk((neighbor.get_id(), vertex.get_id(), weight)
+                           for vertex in graph.get_vertices()
+                           for neighbor, weight in vertex.iter_neighbors_with_weights())
+    return reverse
@@ -0,0 +1,188 @@
+"""
+Whole-graph analytics on the adjacency matrix.
+
+AdjacencyMatrix holds a graph's CSR arrays as NumPy arrays, with the
+vertex ids in row order, so PageRank, degree vectors and k-hop
+reachability each run as a few vectorized sparse matrix-vector products
+instead of a Python loop over the edges. NumPy is required; SciPy is only
+needed to convert to and from `scipy.sparse` matrices.
+"""
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the rest of the package works without it
+    np = None
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+UNREACHED = -1
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError('NumPy is required for adjacency matrix analytics')
+
+
+def _require_scipy():
+    if sparse is None:
+        raise ImportError('SciPy is required for sparse matrix conversion')
+
+
+class AdjacencyMatrix:
+    """ AdjacencyMatrix Class
+    The adjacency of a graph in compressed sparse row form: row i holds the
+    edges out of the vertex `vertex_ids[i]`, with their weights (1 for an
+    unweighted graph). An undirected graph stores each edge in both rows,
+    so its matrix is symmetric.
+    """
+
+    def __init__(self, vertex_ids, indptr, indices, data):
+        """
+        Parameters:
+        vertex_ids (list): The vertex id for each row and column.
+        indptr (ndarray): V + 1 row offsets into `indices`.
+        indices (ndarray): The column (target vertex index) of every edge.
+        data (ndarray): The weight of every edge.
+        """
+        _require_numpy()
+        self.__vertex_ids = vertex_ids
+        self.__index = {vertex_id: i for i, vertex_id in enumerate(vertex_ids)}
+        self.__indptr = indptr
+        self.__indices = indices
+        self.__data = data
+        self.__sources = np.repeat(np.arange(len(vertex_ids)), np.diff(indptr))  # row of every edge
+
+    @classmethod
+    def from_compact(cls, compact_graph):
+        """
+        Build the matrix from a CompactGraph, sharing its arrays where possible.
+        Parameters:
+        compact_graph (CompactGraph): The compiled graph.
+        Returns:
+        AdjacencyMatrix: The adjacency matrix.
+        """
+        _require_numpy()
+        offsets, targets, weights = compact_graph.get_csr_arrays()
+        indices = np.asarray(targets)
+        data = np.ones(len(indices)) if weights is None else np.asarray(weights, dtype=float)
+        return cls(compact_graph.get_vertex_ids(), np.asarray(offsets), indices, data)
+
+    def __len__(self):
+        """Return the number of vertices."""
+        return len(self.__vertex_ids)
+
+    def get_vertex_ids(self):
+        """Return the vertex ids, in row order."""
+        return list(self.__vertex_ids)
+
+    def index_of(self, vertex_id):
+        """Return the row of a vertex id, raising KeyError if absent."""
+        return self.__index[vertex_id]
+
+    def to_sparse_matrix(self):
+        """Return the matrix as a `scipy.sparse.csr_array` (requires SciPy)."""
+        _require_scipy()
+        vertex_count = len(self.__vertex_ids)
+        return sparse.csr_array((self.__data, self.__indices, self.__indptr), shape=(vertex_count, vertex_count))
+
+    def _multiply_transposed(self, vector, weighted=True):
+        """
+        Return A^T @ vector: for each vertex, the sum over its incoming edges
+        of the source's entry (times the edge weight, if weighted).
+        """
+        contributions = vector[self.__sources]
+        if weighted:
+            contributions = contributions * self.__data
+        return np.bincount(self.__indices, weights=contributions, minlength=len(self.__vertex_ids))
+
+    def out_degrees(self, weighted=False):
+        """
+        Return the out-degree of every vertex, in row order.
+        Parameters:
+        weighted (boolean): Sum the edge weights instead of counting edges.
+        Returns:
+        ndarray: The out-degrees.
+        """
+        if weighted:
+            return np.bincount(self.__sources, weights=self.__data, minlength=len(self.__vertex_ids))
+        return np.diff(self.__indptr)
+
+    def in_degrees(self, weighted=False):
+        """Return the in-degree of every vertex, in row order; see out_degrees."""
+        if weighted:
+            return np.bincount(self.__indices, weights=self.__data, minlength=len(self.__vertex_ids))
+        return np.bincount(self.__indices, minlength=len(self.__vertex_ids))
+
+    def page_rank(self, damping=0.85, tolerance=1e-10, max_iterations=100, weighted=True):
+        """
+        Compute PageRank by power iteration. Each step follows an out-edge
+        (chosen in proportion to its weight, if weighted) with probability
+        `damping`, and otherwise jumps to a random vertex. Vertices without
+        out-edges spread their rank over every vertex.
+        Parameters:
+        damping (number): The probability of following an edge.
+        tolerance (number): Stop once the ranks change by less than this in total.
+        max_iterations (integer): The most power iterations to run.
+        weighted (boolean): Follow edges in proportion to their weights.
+        Returns:
+        ndarray: The rank of every vertex, in row order, summing to 1.
+        """
+        vertex_count = len(self.__vertex_ids)
+        if not vertex_count:
+            return np.zeros(0)
+
+        out_weight = self.out_degrees(weighted).astype(float)
+        dangling = out_weight == 0
+        inverse_out_weight = np.divide(1.0, out_weight, out=np.zeros(vertex_count), where=~dangling)
+
+        ranks = np.full(vertex_count, 1.0 / vertex_count)
+        for _ in range(max_iterations):
+            spread = self._multiply_transposed(ranks * inverse_out_weight, weighted)
+            teleport = (1 - damping + damping * ranks[dangling].sum()) / vertex_count
+            new_ranks = damping * spread + teleport
+            change = np.abs(new_ranks - ranks).sum()
+            ranks = new_ranks
+            if change < tolerance:
+                break
+        return ranks
+
+    def hop_distances(self, source_ids, max_hops):
+        """
+        Find every vertex within max_hops edges of any source, one sparse
+        matrix-vector product per hop.
+        Parameters:
+        source_ids (iterable): The ids of the source vertices.
+        max_hops (integer): The most edges to follow.
+        Returns:
+        ndarray: The fewest hops from the nearest source to every vertex, in
+        row order, or UNREACHED (-1) beyond max_hops.
+        """
+        hops = np.full(len(self.__vertex_ids), UNREACHED)
+        frontier = np.zeros(len(self.__vertex_ids), dtype=bool)
+        frontier[[self.__index[source_id] for source_id in source_ids]] = True
+        hops[frontier] = 0
+
+        for hop in range(1, max_hops + 1):
+            reached = np.zeros(len(self.__vertex_ids), dtype=bool)
+            reached[self.__indices[frontier[self.__sources]]] = True  # A^T @ frontier, over booleans
+            frontier = reached & (hops == UNREACHED)
+            if not frontier.any():
+                break
+            hops[frontier] = hop
+        return hops
+
+
+def from_sparse_matrix(matrix):
+    """
+    Read the stored entries of a square SciPy sparse matrix or dense NumPy array.
+    Returns:
+    tuple: The matrix size, and the rows, columns and values of its stored
+    entries as Python lists.
+    """
+    _require_scipy()
+    coo = sparse.coo_array(matrix)
+    if coo.shape[0] != coo.shape[1]:
+        raise ValueError(f'An adjacency matrix must be square, not {coo.shape[0]} x {coo.shape[1]}')
+    return coo.shape[0], coo.row.tolist(), coo.col.tolist(), coo.data.tolist()
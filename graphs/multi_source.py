@@ -0,0 +1,152 @@
+"""
+Bit-parallel breadth-first search from many sources at once.
+
+Each batch of sources is searched together: every vertex carries a bitmask
+with one bit per source of the batch, and one scan over a vertex's edges
+moves all of its frontier bits at once. Searches whose frontiers meet share
+the work, so one pass over the edges serves the whole batch.
+
+The pure Python engine keeps the masks as arbitrary-size ints. The NumPy
+engine keeps them as rows of uint64 words and advances each level with a
+handful of vectorized operations over the frontier's edges.
+"""
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to Python int bitmasks
+    np = None
+
+from graphs import instrumentation
+
+UNREACHED = -1
+
+
+def iter_levels(compact_graph, source_indices, max_depth=None, batch_size=64, use_numpy=None):
+    """
+    Search from every source and yield the vertices each one reaches, level
+    by level, one batch of sources at a time.
+    Parameters:
+    compact_graph (CompactGraph): The graph to search.
+    source_indices (list<int>): The vertex index of each source.
+    max_depth (integer): Do not search past this depth. If None, search everything reachable.
+    batch_size (integer): How many sources to search together; the width of
+    each bitmask. None searches every source in one batch.
+    use_numpy (boolean): Force the NumPy (True) or pure Python (False)
+    engine. By default NumPy is used when it is installed.
+    Yields:
+    (int, sequence, sequence): A depth, and the positions in source_indices
+    and the vertex indices of every (source, vertex) pair first reached at
+    that depth.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise ImportError('NumPy is required for use_numpy=True')
+
+    offsets, targets, _ = compact_graph.get_csr_arrays()
+    search = _search_numpy if use_numpy else _search_python
+    batch_size = batch_size or max(1, len(source_indices))
+    for start in range(0, len(source_indices), batch_size):
+        yield from search(offsets, targets, source_indices[start:start + batch_size], start, max_depth)
+
+
+def _search_python(offsets, targets, batch, first_position, max_depth):
+    """Search from one batch of sources with a Python int bitmask per vertex."""
+    seen = [0] * (len(offsets) - 1)  # vertex index -> bits of the sources that reached it
+    frontier = {}  # vertex index -> bits of the sources that reached it at this depth
+    for bit, source in enumerate(batch):
+        frontier[source] = frontier.get(source, 0) | 1 << bit
+    for vertex, bits in frontier.items():
+        seen[vertex] = bits
+
+    stats = instrumentation.current()
+    depth = 0
+    while frontier:
+        yield depth, *_decode_python(frontier, first_position)
+        if depth == max_depth:
+            return
+        depth += 1
+
+        if stats is not None:
+            edge_count = sum(offsets[vertex + 1] - offsets[vertex] for vertex in frontier)
+            stats.visit_many(len(frontier), edge_count, len(frontier))
+        reached = {}
+        for vertex, bits in frontier.items():
+            for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+                reached[neighbor] = reached.get(neighbor, 0) | bits
+
+        frontier = {}
+        for vertex, bits in reached.items():
+            bits &= ~seen[vertex]
+            if bits:
+                seen[vertex] |= bits
+                frontier[vertex] = bits
+
+
+def _decode_python(frontier, first_position):
+    """Expand {vertex index -> bits} into parallel lists of source positions and vertex indices."""
+    positions, vertices = [], []
+    for vertex, bits in frontier.items():
+        while bits:
+            lowest = bits & -bits
+            positions.append(first_position + lowest.bit_length() - 1)
+            vertices.append(vertex)
+            bits ^= lowest
+    return positions, vertices
+
+
+def _search_numpy(offsets, targets, batch, first_position, max_depth):
+    """Search from one batch of sources with a row of uint64 words per vertex."""
+    offsets = np.asarray(offsets)
+    targets = np.asarray(targets)
+    out_degrees = np.diff(offsets)
+    words = (len(batch) + 63) // 64
+
+    # the frontier is sparse: its vertex indices and, row by row, their new bits
+    sources = np.asarray(batch, dtype=np.int64)
+    source_bits = np.zeros((len(batch), words), dtype=np.uint64)
+    bit_numbers = np.arange(len(batch))
+    source_bits[bit_numbers, bit_numbers // 64] = np.left_shift(np.uint64(1), (bit_numbers % 64).astype(np.uint64))
+    frontier, bits = _merge_rows(sources, source_bits)
+
+    seen = np.zeros((len(out_degrees), words), dtype=np.uint64)
+    seen[frontier] = bits
+
+    stats = instrumentation.current()
+    depth = 0
+    while len(frontier):
+        yield depth, *_decode_numpy(frontier, bits, first_position)
+        if depth == max_depth:
+            return
+        depth += 1
+
+        # gather every edge out of the frontier, carrying its source's bits
+        counts = out_degrees[frontier]
+        edge_count = int(counts.sum())
+        if stats is not None:
+            stats.visit_many(len(frontier), edge_count, len(frontier))
+        if not edge_count:
+            return
+        first_edges = np.repeat(offsets[frontier] - (np.cumsum(counts) - counts), counts)
+        reached = targets[first_edges + np.arange(edge_count)]
+        reached_bits = np.repeat(bits, counts, axis=0)
+
+        reached, reached_bits = _merge_rows(reached, reached_bits)
+        reached_bits &= ~seen[reached]
+        new = reached_bits.any(axis=1)
+        frontier, bits = reached[new], reached_bits[new]
+        seen[frontier] |= bits
+
+
+def _merge_rows(vertices, bits):
+    """OR together the bit rows of repeated vertices; return the unique vertices and their rows."""
+    order = np.argsort(vertices, kind='stable')
+    vertices, bits = vertices[order], bits[order]
+    unique_vertices, first_rows = np.unique(vertices, return_index=True)
+    return unique_vertices, np.bitwise_or.reduceat(bits, first_rows, axis=0)
+
+
+def _decode_numpy(frontier, bits, first_position):
+    """Expand the frontier's bit rows into arrays of source positions and vertex indices."""
+    flags = np.unpackbits(bits.astype('<u8').view(np.uint8), axis=1, bitorder='little')
+    rows, columns = np.nonzero(flags)
+    return first_position + columns, frontier[rows]
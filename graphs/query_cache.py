@@ -0,0 +1,139 @@
+import copy
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from graphs.all_pairs import AllPairsShortestPaths
+
+
+class QueryCache:
+    """ QueryCache Class
+    A size-bounded least-recently-used cache of query results for one graph.
+    Every entry belongs to a graph version; as soon as the graph's version
+    moves on (because it was changed), all entries are discarded.
+    Safe to share between threads.
+    """
+
+    def __init__(self, maxsize=1024):
+        """
+        Parameters:
+        maxsize (integer): The most results to keep before evicting the least recently used.
+        """
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.__maxsize = maxsize
+        self.__entries = OrderedDict()  # key -> result, least recently used first
+        self.__version = None
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__invalidations = 0
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def lookup(self, key, version):
+        """
+        Return (True, result) if key is cached for this graph version, and
+        (False, None) otherwise.
+        """
+        with self.__lock:
+            if version != self.__version:
+                if self.__entries:
+                    self.__invalidations += 1
+                self.__entries.clear()
+                self.__version = version
+
+            if key in self.__entries:
+                self.__entries.move_to_end(key)
+                self.__hits += 1
+                return True, self.__entries[key]
+
+            self.__misses += 1
+            return False, None
+
+    def store(self, key, version, result):
+        """Cache result under key for this graph version, evicting the oldest entry if full."""
+        with self.__lock:
+            if version != self.__version:
+                return  # the graph changed while the query ran
+            self.__entries[key] = result
+            if len(self.__entries) > self.__maxsize:
+                self.__entries.popitem(last=False)
+                self.__evictions += 1
+
+    def clear(self):
+        """Remove every entry, keeping the statistics."""
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self):
+        """
+        Return the cache statistics.
+        Returns:
+        dict: hits, misses, evictions, invalidations (times the whole cache was
+        dropped because the graph changed), size and maxsize.
+        """
+        return {
+            'hits': self.__hits,
+            'misses': self.__misses,
+            'evictions': self.__evictions,
+            'invalidations': self.__invalidations,
+            'size': len(self.__entries),
+            'maxsize': self.__maxsize,
+        }
+
+
+def cached_query(method):
+    """
+    Decorate a graph query method so its results are served from the graph's
+    QueryCache, when one is enabled. Calls whose arguments are not hashable
+    are always run directly.
+
+    The cache keeps its own copy of each result and every caller gets a
+    fresh copy, so callers may modify what they are given. Read-only
+    results (AllPairsShortestPaths) are shared instead of copied.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = self._query_cache
+        if cache is None:
+            return method(self, *args, **kwargs)
+
+        key = (method.__qualname__, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+
+        version = self._version
+        found, result = cache.lookup(key, version)
+        if found:
+            return _copy_result(result)
+        result = method(self, *args, **kwargs)
+        cache.store(key, version, _copy_result(result))
+        return result
+
+    return wrapper
+
+
+def _copy_result(result):
+    """
+    Copy a query result: a list of vertex ids, a (distance, path) pair, a
+    dictionary of distances (or of distance dictionaries), or any other
+    object, which is deep-copied. Vertex ids and numbers are immutable, so
+    the common shapes only copy their containers. A read-only
+    AllPairsShortestPaths is returned as is.
+    """
+    if isinstance(result, AllPairsShortestPaths):
+        return result
+    if isinstance(result, list):
+        return list(result)
+    if isinstance(result, tuple):
+        return tuple(_copy_result(item) for item in result)
+    if isinstance(result, dict):
+        return {key: _copy_result(value) for key, value in result.items()}
+    if result is None or isinstance(result, (int, float, str)):
+        return result
+    return copy.deepcopy(result)
@@ -0,0 +1,201 @@
+"""
+Versioned binary snapshots of a CompactGraph.
+
+Layout (little-endian, every section starts on an 8-byte boundary):
+
+    header       magic b'GADT', version, flags, vertex count, edge count,
+                 id table size in bytes
+    id table     either int64[V] vertex ids, or int64[V + 1] offsets
+                 followed by the UTF-8 bytes of every string id
+    offsets      int64[V + 1] CSR offsets
+    targets      int32[E] or int64[E] neighbor indices
+    weights      float64[E], weighted graphs only
+
+Loading maps the file into memory and wraps each section in a memoryview,
+so nothing is copied: processes that load the same snapshot share one
+page-cached copy of it.
+"""
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+
+from graphs.compact_graph import CompactGraph
+
+MAGIC = b'GADT'
+VERSION = 1
+HEADER = struct.Struct('<4sHHqqq')
+
+FLAG_DIRECTED = 1
+FLAG_WEIGHTED = 2
+FLAG_WIDE_TARGETS = 4  # targets are int64 instead of int32
+FLAG_INTEGER_IDS = 8  # vertex ids are ints instead of strings
+
+
+def _padding(size):
+    """Return the number of bytes needed to pad `size` to a multiple of 8."""
+    return -size % 8
+
+
+class _StringTable(Sequence):
+    """A read-only sequence of strings, decoded from the snapshot on access."""
+
+    def __init__(self, offsets, data):
+        self.__offsets = offsets
+        self.__data = data
+
+    def __len__(self):
+        return len(self.__offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return str(self.__data[self.__offsets[i]:self.__offsets[i + 1]], 'utf-8')
+
+
+def encode_vertex_ids(vertex_ids):
+    """
+    Encode vertex ids as the sections of an id table.
+    Returns:
+    (boolean, list, integer): Whether the ids are integers, the sections
+    to write, and their total size in bytes.
+    """
+    if all(isinstance(vertex_id, int) for vertex_id in vertex_ids):
+        sections = [array('q', vertex_ids)]
+        integer_ids = True
+    elif all(isinstance(vertex_id, str) for vertex_id in vertex_ids):
+        encoded = [vertex_id.encode('utf-8') for vertex_id in vertex_ids]
+        id_offsets = array('q', [0])
+        for each in encoded:
+            id_offsets.append(id_offsets[-1] + len(each))
+        sections = [id_offsets, b''.join(encoded)]
+        integer_ids = False
+    else:
+        raise TypeError('Binary snapshots only support all-string or all-integer vertex ids')
+
+    size = sum(len(section) * getattr(section, 'itemsize', 1) for section in sections)
+    return integer_ids, sections, size
+
+
+def write_sections(f, header, sections):
+    """Write a packed header and then each section, little-endian and padded to 8 bytes."""
+    f.write(header)
+    f.write(b'\0' * _padding(len(header)))
+    for section in sections:
+        if isinstance(section, array):
+            if sys.byteorder != 'little':
+                section = array(section.typecode, section)
+                section.byteswap()
+            section = section.tobytes()
+        f.write(section)
+        f.write(b'\0' * _padding(len(section)))
+
+
+class SectionReader:
+    """Reads the padded sections of a memory-mapped binary file, in order, without copying."""
+
+    def __init__(self, filename, header):
+        """
+        Map the file and unpack its header.
+        Parameters:
+        filename (string): The path of the file.
+        header (struct.Struct): The layout of the file header.
+        """
+        with open(filename, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__view = memoryview(mapped)
+        self.header = header.unpack_from(self.__view)
+        self.__position = header.size + _padding(header.size)
+
+    def take_bytes(self, size):
+        """Return the next section as raw bytes."""
+        section = self.__view[self.__position:self.__position + size]
+        self.__position += size + _padding(size)
+        return section
+
+    def take(self, typecode, count):
+        """Return the next section as `count` items of an array typecode."""
+        section = self.take_bytes(count * array(typecode).itemsize)
+        if sys.byteorder != 'little':  # the file is little-endian, so copy and swap
+            section = array(typecode, section.tobytes())
+            section.byteswap()
+            return section
+        return section.cast(typecode)
+
+    def take_vertex_ids(self, integer_ids, count, size):
+        """Return the next id table, written by encode_vertex_ids, as a sequence of ids."""
+        if integer_ids:
+            return self.take('q', count)
+        id_offsets = self.take('q', count + 1)
+        return _StringTable(id_offsets, self.take_bytes(size - (count + 1) * 8))
+
+
+def save_snapshot(compact_graph, filename):
+    """
+    Write a compiled graph to a binary snapshot file.
+    Parameters:
+    compact_graph (CompactGraph): The graph to save.
+    filename (string): The path of the file to write.
+    """
+    compact_graph.compact()  # the file stores dense indices, without tombstones
+    vertex_ids = compact_graph.get_vertex_ids()
+    flags = 0
+    if compact_graph.is_directed():
+        flags |= FLAG_DIRECTED
+    if compact_graph.is_weighted():
+        flags |= FLAG_WEIGHTED
+    if len(vertex_ids) >= 2 ** 31:
+        flags |= FLAG_WIDE_TARGETS
+
+    integer_ids, id_sections, id_table_size = encode_vertex_ids(vertex_ids)
+    if integer_ids:
+        flags |= FLAG_INTEGER_IDS
+
+    offsets = array('q', [0])
+    targets = array('q' if flags & FLAG_WIDE_TARGETS else 'i')
+    weights = array('d')
+    for source, target, weight in compact_graph.iter_edges():
+        while len(offsets) <= source:
+            offsets.append(len(targets))
+        targets.append(target)
+        if flags & FLAG_WEIGHTED:
+            weights.append(weight)
+    while len(offsets) <= len(vertex_ids):
+        offsets.append(len(targets))
+
+    sections = id_sections + [offsets, targets]
+    if flags & FLAG_WEIGHTED:
+        sections.append(weights)
+
+    with open(filename, 'wb') as f:
+        header = HEADER.pack(MAGIC, VERSION, flags, len(vertex_ids), len(targets), id_table_size)
+        write_sections(f, header, sections)
+
+
+def load_snapshot(filename):
+    """
+    Load a binary snapshot by memory-mapping it, without copying the arrays.
+    Parameters:
+    filename (string): The path of the snapshot file.
+    Returns:
+    CompactGraph: A read-only graph backed by the mapped file.
+    """
+    reader = SectionReader(filename, HEADER)
+    magic, version, flags, vertex_count, edge_count, id_table_size = reader.header
+    if magic != MAGIC:
+        raise ValueError('Not a graph snapshot file')
+    if version != VERSION:
+        raise ValueError(f'Unsupported graph snapshot version: {version}')
+
+    vertex_ids = reader.take_vertex_ids(flags & FLAG_INTEGER_IDS, vertex_count, id_table_size)
+    offsets = reader.take('q', vertex_count + 1)
+    if flags & FLAG_WIDE_TARGETS:
+        targets = reader.take('q', edge_count)
+    else:
+        targets = reader.take('i', edge_count)
+    weights = reader.take('d', edge_count) if flags & FLAG_WEIGHTED else None
+
+    return CompactGraph(vertex_ids, offsets, targets, weights, bool(flags & FLAG_DIRECTED))
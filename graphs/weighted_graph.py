@@ -1,7 +1,17 @@
+from heapq import heappop, heappush
+from itertools import count
+from operator import itemgetter
+
+from graphs import all_pairs, edge_lists, heuristics, instrumentation, landmarks
+from graphs.compact_graph import CompactGraph
+from graphs.disjoint_set import DisjointSet
 from graphs.graph import Graph, Vertex
+from graphs.instrumentation import instrumented
+from graphs.query_cache import cached_query
 
 
 class WeightedVertex(Vertex):
+    __slots__ = ('__id', '__neighbors_dict')
 
     def __init__(self, vertex_id):
         """
@@ -19,10 +29,8 @@ class WeightedVertex(Vertex):
         vertex_obj (Vertex): An instance of Vertex to be stored as a neighbor.
         weight (number): The weight of this edge.
         """
-        if vertex_obj.get_id() in self.__neighbors_dict.keys():
-            return  # it's already a neighbor
-
-        self.__neighbors_dict[vertex_obj.get_id()] = (vertex_obj, weight)
+        # an existing edge keeps its weight
+        self.__neighbors_dict.setdefault(vertex_obj.__id, (vertex_obj, weight))
 
     def get_neighbors(self):
         """Return the neighbors of this vertex."""
@@ -32,6 +40,26 @@ class WeightedVertex(Vertex):
         """Return the neighbors of this vertex."""
         return list(self.__neighbors_dict.values())
 
+    def iter_neighbors(self):
+        """Iterate over the neighbors of this vertex without copying them into a list."""
+        return map(itemgetter(0), self.__neighbors_dict.values())
+
+    def iter_neighbors_with_weights(self):
+        """Iterate over (neighbor, weight) pairs without copying them into a list."""
+        return iter(self.__neighbors_dict.values())
+
+    def remove_neighbor(self, vertex_obj):
+        """
+        Remove a neighbor of this vertex, along with its edge weight.
+        Returns:
+        boolean: True if vertex_obj was a neighbor.
+        """
+        return self.__neighbors_dict.pop(vertex_obj.get_id(), None) is not None
+
+    def get_degree(self):
+        """Return the number of neighbors of this vertex."""
+        return len(self.__neighbors_dict)
+
     def get_id(self):
         """Return the id of this vertex."""
         return self.__id
@@ -56,6 +84,7 @@ class WeightedGraph(Graph):
         Parameters:
         is_directed (boolean): Whether the graph is directed (edges go in only one direction).
         """
+        super().__init__(is_directed)
         self.__vertex_dict = {}
         self.__is_directed = is_directed
 
@@ -72,6 +101,8 @@ class WeightedGraph(Graph):
             return False  # it's already there
         vertex_obj = WeightedVertex(vertex_id)
         self.__vertex_dict[vertex_id] = vertex_obj
+        self._vertex_added(vertex_obj)
+        self._graph_changed()
         return True
 
     def get_vertex(self, vertex_id):
@@ -81,6 +112,10 @@ class WeightedGraph(Graph):
         vertex_obj = self.__vertex_dict[vertex_id]
         return vertex_obj
 
+    def _pop_vertex(self, vertex_id):
+        """Remove a vertex object from the vertex dictionary and return it."""
+        return self.__vertex_dict.pop(vertex_id)
+
     def add_edge(self, vertex_id1, vertex_id2, weight):
         """
         Add an edge from vertex with id `vertex_id1` to vertex with id `vertex_id2`.
@@ -97,11 +132,70 @@ class WeightedGraph(Graph):
         vertex_obj1.add_neighbor(vertex_obj2, weight)
         if not self.__is_directed:
             vertex_obj2.add_neighbor(vertex_obj1, weight)
+        self._edge_added(vertex_obj1, vertex_obj2)
+        self._graph_changed()
+
+    def add_edges_bulk(self, edges, keep=edge_lists.KEEP_FIRST):
+        """
+        Add many weighted edges at once, creating any missing vertices.
+        Unlike `add_edge`, this skips the per-edge method calls and membership
+        checks, so it is the fast path for loading large graphs.
+        Parameters:
+        edges: (vertex_id1, vertex_id2, weight) triples, a 2-D NumPy array,
+        or columns (a pandas DataFrame or a dictionary of column name ->
+        sequence). Pass columns rather than a float array to keep integer ids.
+        keep (string): Which weight a repeated edge keeps: 'first', 'last' or
+        'min'. Edges already in the graph keep their weight, as with `add_edge`.
+        """
+        vertex_dict = self.__vertex_dict
+        get_vertex = vertex_dict.get
+        is_directed = self.__is_directed
+        maintain_indexes = self._has_maintained_indexes()
+
+        with edge_lists.gc_paused():
+            rows = edge_lists.edge_rows(edges, 3)
+            if keep != edge_lists.KEEP_FIRST:
+                rows = edge_lists.dedupe_weighted(rows, is_directed, keep)
+
+            for vertex_id1, vertex_id2, weight in rows:
+                vertex_obj1 = get_vertex(vertex_id1)
+                if vertex_obj1 is None:
+                    vertex_obj1 = vertex_dict[vertex_id1] = WeightedVertex(vertex_id1)
+                    if maintain_indexes:
+                        self._vertex_added(vertex_obj1)
+                vertex_obj2 = get_vertex(vertex_id2)
+                if vertex_obj2 is None:
+                    vertex_obj2 = vertex_dict[vertex_id2] = WeightedVertex(vertex_id2)
+                    if maintain_indexes:
+                        self._vertex_added(vertex_obj2)
+
+                vertex_obj1.add_neighbor(vertex_obj2, weight)
+                if not is_directed:
+                    vertex_obj2.add_neighbor(vertex_obj1, weight)
+                if maintain_indexes:
+                    self._edge_added(vertex_obj1, vertex_obj2)
+
+        self._graph_changed()
 
     def get_vertices(self):
         """Return all the vertices in the graph"""
         return list(self.__vertex_dict.values())
 
+    def contains_id(self, vertex_id):
+        return vertex_id in self.__vertex_dict
+
+    def is_directed(self):
+        """Return True if the graph is directed."""
+        return self.__is_directed
+
+    def compile(self):
+        """
+        Compile the graph, including its edge weights, into a frozen CSR representation.
+        Returns:
+        CompactGraph: The compiled graph.
+        """
+        return CompactGraph.from_graph(self, weighted=True)
+
     def get_edges(self):
         """Return all the edges in the graph"""
         return list()
@@ -118,150 +212,355 @@ class WeightedGraph(Graph):
         parent_map[vertex1_root] = vertex2_root
 
     def find(self, parent_map, vertex_id):
-        """Get the root (or, group label) for vertex_id."""
-        if parent_map[vertex_id] == vertex_id:
-            return vertex_id
-        return self.find(parent_map, parent_map[vertex_id])
-
+        """Get the root (or, group label) for vertex_id, compressing the path on the way."""
+        root = vertex_id
+        while parent_map[root] != root:
+            root = parent_map[root]
+        while parent_map[vertex_id] != root:
+            parent_map[vertex_id], vertex_id = root, parent_map[vertex_id]
+        return root
+
+    @instrumented
     def minimum_spanning_tree_kruskal(self):
         """
         Use Kruskal's Algorithm to return a list of edges, as tuples of
         (start_id, dest_id, weight) in the graph's minimum spanning tree.
+        If the graph is disconnected, return the minimum spanning forest.
+        """
+        spanning_tree, _ = self._kruskal()
+        return spanning_tree
+
+    @instrumented
+    def minimum_spanning_tree_prim(self):
+        """
+        Use Prim's Algorithm to return the total weight of all edges in the
+        graph's spanning tree.
+        If the graph is disconnected, return the weight of the minimum spanning forest.
+        """
+        _, total_mst_weight = self._prim()
+        return total_mst_weight
+
+    @instrumented
+    def minimum_spanning_forest(self, algorithm='kruskal'):
         """
-        # Create a list of all edges in the graph, sort them by weight
-        # from smallest to largest
+        Return the minimum spanning forest (one tree per connected component).
+        Parameters:
+        algorithm (string): Either 'kruskal' or 'prim'.
+        Returns:
+        (list, number): The forest's edges as (start_id, dest_id, weight)
+        tuples, and their total weight.
+        """
+        if algorithm == 'kruskal':
+            return self._kruskal()
+        if algorithm == 'prim':
+            return self._prim()
+        raise ValueError(f'Unknown minimum spanning tree algorithm: {algorithm}')
+
+    def _kruskal(self):
+        """Kruskal's Algorithm over a DisjointSet of vertex indices, in O(E log E)."""
+        vertices = self.get_vertices()
+        index = {vertex.get_id(): i for i, vertex in enumerate(vertices)}
+
+        # Create a list of all edges in the graph, as (weight, index1, index2).
+        # An undirected edge is stored in both vertices, so only keep one copy.
         edges = []
-        for vertex in self.get_vertices():
-            # print(vertex.get_neighbors_with_weights())
-            for neighbor, weight in vertex.get_neighbors_with_weights():
-                edges.append((vertex.get_id(), neighbor.get_id(), weight))
-        edges = sorted(edges, key=lambda x: x[2])
+        for i, vertex in enumerate(vertices):
+            for neighbor, weight in vertex.iter_neighbors_with_weights():
+                j = index[neighbor.get_id()]
+                if self.is_directed() or i < j:
+                    edges.append((weight, i, j))
+        edges.sort(key=itemgetter(0))
+        stats = instrumentation.current()
+        if stats is not None:
+            stats.vertices_visited += len(vertices)
+            stats.edges_scanned += len(edges)
+
+        groups = DisjointSet(len(vertices))
+        spanning_tree = []
+        total_weight = 0
 
-        # Create a dictionary `parent_map` to map vertex -> its "parent".
-        # Initialize it so that each vertex is its own parent.
-        parent_map = {x[0]: x[0] for x in edges}
+        # A spanning forest has at most V-1 edges; stop as soon as it is full.
+        for weight, i, j in edges:
+            if groups.union(i, j):
+                spanning_tree.append((vertices[i].get_id(), vertices[j].get_id(), weight))
+                total_weight += weight
+                if len(spanning_tree) == len(vertices) - 1:
+                    break
 
-        # Create an empty list to hold the solution (i.e. all edges in the final spanning tree)
+        return spanning_tree, total_weight
+
+    def _prim(self):
+        """Prim's Algorithm with a lazy-deletion binary heap, in O(E log V)."""
+        in_tree = set()
         spanning_tree = []
+        total_weight = 0
+        tie_breaker = count()
+        stats = instrumentation.current()
 
-        # While the spanning tree holds < V-1 edges,
-        while len(spanning_tree) <= len(edges) - 1:
-            # get the smallest edge.
-            current = edges.pop(0)
-            (vertex1, vertex2, weight) = current
-            # If the two vertices connected by the edge are in different sets
-            # (i.e. calling `find()` gets two different roots), then it will not create a cycle,
-            if self.find(parent_map, vertex1) != self.find(parent_map, vertex2):
-                # add it to the solution set and call `union()` on the two vertices.
-                spanning_tree.append(current)
-                self.union(parent_map, vertex1, vertex2)
-            else:
+        # restart from every vertex not yet reached, to cover disconnected graphs
+        for root in self.get_vertices():
+            if root.get_id() in in_tree:
                 continue
 
-        # Return the solution list.
-        return spanning_tree
-
-    def minimum_spanning_tree_prim(self):
+            # heap of (edge weight, tie breaker, tree vertex id, new vertex obj)
+            heap = [(0, next(tie_breaker), None, root)]
+            while heap:
+                weight, _, parent_id, vertex = heappop(heap)
+                vertex_id = vertex.get_id()
+                if vertex_id in in_tree:
+                    continue  # stale entry, already joined through a lighter edge
+                in_tree.add(vertex_id)
+                if stats is not None:
+                    stats.visit(vertex, len(heap))
+
+                if parent_id is not None:
+                    spanning_tree.append((parent_id, vertex_id, weight))
+                    total_weight += weight
+
+                for neighbor, neighbor_weight in vertex.iter_neighbors_with_weights():
+                    if neighbor.get_id() not in in_tree:
+                        heappush(heap, (neighbor_weight, next(tie_breaker), vertex_id, neighbor))
+                        if stats is not None:
+                            stats.push(len(heap))
+
+        return spanning_tree, total_weight
+
+    def _dijkstra(self, start_id, target_ids=None):
         """
-        Use Prim's Algorithm to return the total weight of all edges in the
-        graph's spanning tree.
-        Assume that the graph is connected.
-        """
-        total_mst_weight = 0
-        # Create a dictionary `vertex_to_weight` and initialize all
-        # vertices to INFINITY - hint: use `float('inf')`
-        vertex_to_weight = {x: float('inf') for x in self.get_vertices()}
-
-        # Choose one vertex and set its weight to 0
-        start_vertex = self.get_vertices()[0]
-        vertex_to_weight[start_vertex] = 0
-
-        # While `vertex_to_weight` is not empty:
-        while vertex_to_weight:
-            # Get the minimum-weighted remaining vertex,
-            min_weighted_vertex = min(vertex_to_weight.items(), key=lambda x: x[1])
-            # remove it from the dictionary, & add its weight to the total MST weight
-            current_vertex = min_weighted_vertex[0]
-            vertex_to_weight.pop(current_vertex, None)
-            total_mst_weight += min_weighted_vertex[1]
-            # 2. Update that vertex's neighbors, if edge weights are smaller than previous weights
-            # print(min_weighted_vertex)
-            try:
-                for vertex in current_vertex.get_neighbors_with_weights():
-                    neighbor, weight = vertex
-                    if neighbor in vertex_to_weight and weight < vertex_to_weight[neighbor]:
-                        vertex_to_weight[neighbor] = weight
-                        # print(vertex_to_weight)
-            except KeyError:
-                continue
+        Run Dijkstra's Algorithm from start_id using a binary heap with lazy
+        deletion: stale heap entries are skipped when popped instead of being
+        decreased in place.
+        Parameters:
+        start_id (string): The id of the start vertex.
+        target_ids (iterable<string>): Stop as soon as all of these are settled.
+        If None, settle every reachable vertex.
+        Returns:
+        (dict, dict): Settled vertex id -> distance, and vertex id -> the
+        previous vertex id on its shortest path (None for the start).
+        """
+        if not self.contains_id(start_id):
+            raise KeyError("Vertex not found")
+
+        remaining = None if target_ids is None else set(target_ids)
+        distances = {}  # settled vertex id -> final distance
+        best = {start_id: 0}  # tentative distances
+        predecessors = {start_id: None}
+
+        # heap of (distance, tie breaker, vertex obj); the tie breaker keeps
+        # vertex objects from ever being compared
+        tie_breaker = count()
+        heap = [(0, next(tie_breaker), self.get_vertex(start_id))]
+        stats = instrumentation.current()
+
+        while heap:
+            distance, _, vertex = heappop(heap)
+            vertex_id = vertex.get_id()
+            if vertex_id in distances:
+                continue  # stale entry, already settled with a smaller distance
+            distances[vertex_id] = distance
+            if stats is not None:
+                stats.visit(vertex, len(heap))
+
+            if remaining is not None:
+                remaining.discard(vertex_id)
+                if not remaining:
+                    break
+
+            for neighbor, weight in vertex.iter_neighbors_with_weights():
+                neighbor_id = neighbor.get_id()
+                new_distance = distance + weight
+                if neighbor_id not in distances and new_distance < best.get(neighbor_id, WeightedGraph.INFINITY):
+                    best[neighbor_id] = new_distance
+                    predecessors[neighbor_id] = vertex_id
+                    heappush(heap, (new_distance, next(tie_breaker), neighbor))
+                    if stats is not None:
+                        stats.relaxations += 1
+                        stats.push(len(heap))
+
+        return distances, predecessors
+
+    def _astar(self, start_id, target_id, heuristic):
+        """
+        Run A* search: Dijkstra's Algorithm with each vertex's heap priority
+        raised by a lower bound on its remaining distance to the target, so
+        vertices leading away from the target are expanded late or never.
+        Parameters:
+        heuristic (callable): heuristic(vertex_id, target_id) -> a lower bound
+        on the distance between them. It must be consistent (never drop by
+        more than an edge's weight along that edge) for the result to be optimal.
+        Returns:
+        (dict, dict, integer): Settled vertex id -> distance, the predecessor
+        links, and the number of vertices expanded.
+        """
+        distances = {}  # settled vertex id -> final distance
+        best = {start_id: 0}  # tentative distances
+        predecessors = {start_id: None}
+
+        # heap of (distance + heuristic, tie breaker, distance, vertex obj)
+        tie_breaker = count()
+        heap = [(heuristic(start_id, target_id), next(tie_breaker), 0, self.get_vertex(start_id))]
+        stats = instrumentation.current()
+
+        while heap:
+            _, _, distance, vertex = heappop(heap)
+            vertex_id = vertex.get_id()
+            if vertex_id in distances:
+                continue  # stale entry, already settled with a smaller distance
+            distances[vertex_id] = distance
+            if stats is not None:
+                stats.visit(vertex, len(heap))
+            if vertex_id == target_id:
+                break
+
+            for neighbor, weight in vertex.iter_neighbors_with_weights():
+                neighbor_id = neighbor.get_id()
+                new_distance = distance + weight
+                if neighbor_id not in distances and new_distance < best.get(neighbor_id, WeightedGraph.INFINITY):
+                    best[neighbor_id] = new_distance
+                    predecessors[neighbor_id] = vertex_id
+                    estimate = new_distance + heuristic(neighbor_id, target_id)
+                    heappush(heap, (estimate, next(tie_breaker), new_distance, neighbor))
+                    if stats is not None:
+                        stats.relaxations += 1
+                        stats.push(len(heap))
+
+        return distances, predecessors, len(distances)
+
+    @instrumented
+    def astar_shortest_path(self, start_id, target_id, heuristic=None, attribute='pos'):
+        """
+        Use A* search to find the shortest path from a start vertex to a destination.
+        Parameters:
+        start_id (string): The id of the start vertex.
+        target_id (string): The id of the target (end) vertex.
+        heuristic (callable or string): heuristic(vertex_id, target_id) -> a
+        lower bound on the distance between them; or 'euclidean' or
+        'haversine' to compare the coordinates stored in each vertex's
+        `attribute` (see set_vertex_attribute); or a LandmarkIndex (see
+        build_landmark_index). None searches like Dijkstra.
+        attribute (string): The coordinate attribute for the built-in heuristics.
+        Returns:
+        (number, list<string>, integer): The total weight, the vertex ids on the
+        path from start to end, and the number of vertices expanded. The weight
+        and path are None if the target cannot be reached.
+        """
+        if not self.contains_id(start_id) or not self.contains_id(target_id):
+            raise KeyError("One or both vertices are not in the graph!")
 
-        # Return total weight of MST
-        return total_mst_weight
+        if heuristic is None:
+            heuristic = heuristics.no_heuristic
+        elif isinstance(heuristic, str):
+            heuristic = heuristics.coordinate_heuristic(self, heuristic, attribute)
 
+        distances, predecessors, expanded = self._astar(start_id, target_id, heuristic)
+        if target_id not in distances:
+            return None, None, expanded
+        return distances[target_id], self._build_path(predecessors, target_id), expanded
+
+    @instrumented
+    def build_landmark_index(self, k=8, strategy=landmarks.FARTHEST, seed=None):
+        """
+        Precompute an ALT landmark index for fast repeated A* queries, e.g.
+        `graph.astar_shortest_path(start, target, graph.build_landmark_index())`.
+        See LandmarkIndex.build for the parameters.
+        Returns:
+        LandmarkIndex: The index; save it with its `save` method.
+        """
+        return landmarks.LandmarkIndex.build(self, k, strategy, seed)
+
+    @staticmethod
+    def _build_path(predecessors, target_id):
+        """Follow predecessor links back from target_id and return the path from the start."""
+        path = [target_id]
+        while predecessors[path[-1]] is not None:
+            path.append(predecessors[path[-1]])
+        path.reverse()
+        return path
+
+    @instrumented
+    @cached_query
     def find_shortest_path(self, start_id, target_id):
         """
         Use Dijkstra's Algorithm to return the total weight of the shortest path
         from a start vertex to a destination.
+        Returns None if the target cannot be reached.
         """
-        # Create a dictionary `vertex_to_distance` and initialize all
-        # vertices to INFINITY - hint: use `float('inf')`
-        vertex_to_distance = {x: float('inf') for x in self.get_vertices()}
-        start_vertex = self.get_vertex(start_id)
-        vertex_to_distance[start_vertex] = 0
-
-        # While `vertex_to_distance` is not empty:
-        while vertex_to_distance:
-            # Get the minimum-distance remaining vertex
-            min_weighted_vertex = min(vertex_to_distance.items(), key=lambda x: x[1])
-            # Remove it from the dictionary.
-            vertex_to_distance.pop(min_weighted_vertex[0])
-
-            # If it is the target vertex, return its distance.
-            if min_weighted_vertex[0].get_id() == target_id:
-                return min_weighted_vertex[1]
-
-            # Update that vertex's neighbors by adding the edge weight to the
-            #    vertex's distance, if it is lower than previous.
-            try:
-                for neighbor in min_weighted_vertex[0].get_neighbors_with_weights():
-                    vertex, weight = neighbor
-                    # if in dict and min weight + neighbor weight less than INF or etc
-                    if vertex in vertex_to_distance and weight + min_weighted_vertex[1] < vertex_to_distance[vertex]:
-                        # print(vertex, (weight + min_weighted_vertex[1]))
-                        vertex_to_distance[vertex] = weight + min_weighted_vertex[1]
-            except KeyError:
-                continue
+        if not self.contains_id(target_id):
+            raise KeyError("One or both vertices are not in the graph!")
 
-        # Return None if target vertex not found.
-        return None
+        distances, _ = self._dijkstra(start_id, [target_id])
+        return distances.get(target_id)
 
+    @instrumented
+    @cached_query
+    def find_shortest_route(self, start_id, target_id):
+        """
+        Use Dijkstra's Algorithm to find the shortest path from a start vertex
+        to a destination.
+        Returns:
+        (number, list<string>): The total weight and the vertex ids on the path,
+        from start to end, or None if the target cannot be reached.
+        """
+        return self.find_shortest_routes(start_id, [target_id])[target_id]
+
+    @instrumented
+    def find_shortest_routes(self, start_id, target_ids):
+        """
+        Find the shortest paths from a start vertex to several destinations in
+        a single Dijkstra run, stopping once every target is settled.
+        Returns:
+        dict: target id -> (total weight, list of vertex ids), or None if that
+        target cannot be reached.
+        """
+        target_ids = list(target_ids)
+        for target_id in target_ids:
+            if not self.contains_id(target_id):
+                raise KeyError("One or both vertices are not in the graph!")
+
+        distances, predecessors = self._dijkstra(start_id, target_ids)
+
+        routes = {}
+        for target_id in target_ids:
+            if target_id in distances:
+                routes[target_id] = (distances[target_id], self._build_path(predecessors, target_id))
+            else:
+                routes[target_id] = None
+        return routes
+
+    @instrumented
+    @cached_query
+    def find_all_distances(self, start_id):
+        """
+        Return a dictionary of vertex id -> shortest distance from start_id, for
+        every vertex reachable from it.
+        """
+        distances, _ = self._dijkstra(start_id)
+        return distances
+
+    @instrumented
     def floyd_warshall(self):
         """
         Return the All-Pairs-Shortest-Paths dictionary, containing the shortest
-        paths from each vertex to each other vertex.
-        """
-        # create a top-level dictionary to hold each vertex & map it to another
-        # dictionary
-        dist = dict()
-        all_vertex_ids = self.__vertex_dict.keys()
-        # set default values - either 0 (for v -> v) or infinity
-        for vertex1 in all_vertex_ids:
-            dist[vertex1] = dict()
-            for vertex2 in all_vertex_ids:
-                dist[vertex1][vertex2] = WeightedGraph.INFINITY
-            dist[vertex1][vertex1] = 0
-        # add all edge weights to the dictionary
-        all_vertex_objs = self.get_vertices()
-        for vertex in all_vertex_objs:
-            neighbors_with_weights = vertex.get_neighbors_with_weights()
-            for neighbor, weight in neighbors_with_weights:
-                dist[vertex.get_id()][neighbor.get_id()] = weight
-        # execute the algorithm - "relax" the distances using an intermediate vertex
-        for k in all_vertex_ids:
-            for i in all_vertex_ids:
-                for j in all_vertex_ids:
-                    dist[i][j] = min(dist[i][j], dist[i][k] + dist[k][j])
-        return dist
+        paths from each vertex to each other vertex. The matrices behind it
+        are cached by all_pairs_shortest_paths; the dictionary is built anew.
+        """
+        return self.all_pairs_shortest_paths().to_dict()
+
+    @instrumented
+    @cached_query
+    def all_pairs_shortest_paths(self, block_size=None, use_numpy=None):
+        """
+        Run Floyd-Warshall over a dense distance matrix built from the graph.
+        Parameters:
+        block_size (integer): Relax the matrix in tiles of this size (e.g.
+        256), for graphs whose matrix does not fit in cache. Requires NumPy.
+        use_numpy (boolean): Force NumPy on or off; by default it is used when installed.
+        Returns:
+        AllPairsShortestPaths: Distances and predecessors for every pair of
+        vertices, with `path(a, b)` for recovering routes. It is read-only,
+        and shared by every caller when the query cache is enabled.
+        """
+        return all_pairs.floyd_warshall(self.compile(), block_size, use_numpy)
 
 
 if __name__ == "__main__":
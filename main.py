@@ -39,7 +39,7 @@ if __name__ == '__main__':
 
     # Search the graph
     print('Performing BFS traversal...')
-    graph.bfs_traversal('A')
+    print(graph.bfs_traversal('A'))
 
     # Find shortest path
     print('Finding shortest path from vertex A to vertex E...')
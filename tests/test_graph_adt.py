@@ -1,7 +1,17 @@
 
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
 import unittest
+from graphs import all_pairs, components, instrumentation, matrix, multi_source
+from graphs.async_service import AsyncGraphService
 from graphs.graph import Graph
-from util.file_reader import read_graph_from_file
+from graphs.weighted_graph import WeightedGraph
+from util import graph_generators
+from util.file_reader import parse_edge, read_graph_from_file
 
 
 class TestGraph(unittest.TestCase):
@@ -38,6 +48,15 @@ class TestGraph(unittest.TestCase):
         self.assertEqual(len(vertex_b.get_neighbors()), 2)
         self.assertEqual(len(vertex_c.get_neighbors()), 2)
 
+    def test_vertex_iter_neighbors(self):
+        graph = Graph(is_directed=True)
+        vertex_a = graph.add_vertex('A')
+        graph.add_edge('A', 'B')
+        graph.add_edge('A', 'C')
+
+        self.assertEqual([neighbor.get_id() for neighbor in vertex_a.iter_neighbors()], ['B', 'C'])
+        self.assertFalse(hasattr(vertex_a, '__dict__'))
+
 class TestReadGraphFromFile(unittest.TestCase):
     def test_read_directed_graph_from_file(self):
         filename = 'test_files/graph_small_directed.txt'
@@ -77,6 +96,23 @@ class TestReadGraphFromFile(unittest.TestCase):
         with self.assertRaises(ValueError) as error:
             graph = read_graph_from_file(filename)
 
+    def test_read_weighted_graph_with_long_ids(self):
+        filename = 'test_files/graph_weighted_directed.txt'
+        progress = []
+        graph = read_graph_from_file(filename, chunk_size=8, batch_size=2,
+                                     progress=lambda bytes_read, edges_read: progress.append(edges_read))
+
+        self.assertIsInstance(graph, WeightedGraph)
+        self.assertEqual(len(graph.get_vertices()), 4)
+        self.assertEqual(graph.find_shortest_route('home', 'gym'), (6.5, ['home', 'cafe', 'work', 'gym']))
+        self.assertEqual(progress[-1], 4)
+
+    def test_parse_edge(self):
+        self.assertEqual(parse_edge('(A,B)'), ('A', 'B'))
+        self.assertEqual(parse_edge(' (node 1, node 2, 0.5)\r'), ('node 1', 'node 2', 0.5))
+        with self.assertRaises(ValueError):
+            parse_edge('A,B')
+
     def test_find_shortest_path(self):
         filename = 'test_files/graph_medium_undirected.txt'
         graph = read_graph_from_file(filename)
@@ -85,6 +121,23 @@ class TestReadGraphFromFile(unittest.TestCase):
 
         self.assertEqual(len(path_from_A_to_F), 4)
 
+    def test_find_shortest_path_bidirectional(self):
+        filename = 'test_files/graph_medium_undirected.txt'
+        graph = read_graph_from_file(filename)
+
+        path_from_A_to_F = graph.find_shortest_path('A', 'F', bidirectional=True)
+        self.assertEqual(len(path_from_A_to_F), 4)
+        self.assertEqual((path_from_A_to_F[0], path_from_A_to_F[-1]), ('A', 'F'))
+
+    def test_find_shortest_path_bidirectional_directed(self):
+        graph = Graph(is_directed=True)
+        graph.add_edges_bulk([('A', 'B'), ('B', 'C'), ('C', 'D'), ('A', 'X'), ('X', 'D'), ('D', 'A')])
+
+        self.assertEqual(graph.find_shortest_path('A', 'D', bidirectional=True), ['A', 'X', 'D'])
+        self.assertEqual(graph.find_shortest_path('D', 'C', bidirectional=True), ['D', 'A', 'B', 'C'])
+        graph.add_vertex('Z')
+        self.assertIsNone(graph.find_shortest_path('A', 'Z', bidirectional=True))
+
     def test_get_all_vertices_n_away(self):
         filename = 'test_files/graph_medium_undirected.txt'
         graph = read_graph_from_file(filename)
@@ -99,5 +152,805 @@ class TestReadGraphFromFile(unittest.TestCase):
         self.assertEqual(vertices_3_away, ['F'])
 
 
+class TestBreadthFirstSearch(unittest.TestCase):
+    def test_bfs_traversal(self):
+        graph = read_graph_from_file('test_files/graph_small_directed.txt')
+        self.assertEqual(graph.bfs_traversal('1'), ['1', '2', '4'])
+
+    def test_iter_bfs_levels(self):
+        graph = read_graph_from_file('test_files/graph_medium_undirected.txt')
+        levels = dict(graph.iter_bfs_levels('A'))
+        self.assertEqual(levels, {'A': 0, 'B': 1, 'C': 1, 'D': 2, 'E': 2, 'F': 3})
+
+        limited = dict(graph.iter_bfs_levels('A', max_depth=1))
+        self.assertEqual(limited, {'A': 0, 'B': 1, 'C': 1})
+
+    def test_iter_bfs_stops_early(self):
+        graph = Graph(is_directed=True)
+        graph.add_edges_bulk((i, i + 1) for i in range(100))
+
+        bfs = graph.iter_bfs(0)
+        self.assertEqual([next(bfs) for _ in range(3)], [0, 1, 2])
+
+
+class TestDepthFirstSearch(unittest.TestCase):
+    def test_iter_dfs_orders(self):
+        graph = Graph(is_directed=True)
+        graph.add_edge('A', 'B')
+        graph.add_edge('B', 'C')
+        graph.add_edge('A', 'D')
+        graph.add_vertex('E')
+
+        self.assertEqual(list(graph.iter_dfs('A')), ['A', 'B', 'C', 'D'])
+        self.assertEqual(list(graph.iter_dfs('A', order='post')), ['C', 'B', 'D', 'A'])
+        self.assertEqual(sorted(graph.iter_dfs()), ['A', 'B', 'C', 'D', 'E'])
+
+    def test_contains_cycle(self):
+        directed = Graph(is_directed=True)
+        directed.add_edge('A', 'B')
+        directed.add_edge('C', 'A')
+        directed.add_edge('C', 'B')
+        self.assertFalse(directed.contains_cycle())
+
+        # the cycle is unreachable from A and B
+        directed.add_edge('D', 'E')
+        directed.add_edge('E', 'D')
+        self.assertTrue(directed.contains_cycle())
+
+        undirected = Graph(is_directed=False)
+        undirected.add_edge('A', 'B')
+        undirected.add_edge('B', 'C')
+        self.assertFalse(undirected.contains_cycle())
+        undirected.add_edge('C', 'A')
+        self.assertTrue(undirected.contains_cycle())
+
+    def test_topological_sort_deep_graph(self):
+        graph = Graph(is_directed=True)
+        graph.add_edges_bulk((i, i + 1) for i in range(20000))
+
+        self.assertEqual(graph.topological_sort(), list(range(20001)))
+
+        graph.add_edge(20000, 0)
+        with self.assertRaises(ValueError):
+            graph.topological_sort()
+
+
+class TestBipartite(unittest.TestCase):
+    def test_bipartite_covers_every_component(self):
+        graph = Graph(is_directed=False)
+        graph.add_edges_bulk([('A', 'B'), ('B', 'C'), ('C', 'D'), ('D', 'A')])
+        self.assertTrue(graph.is_bipartite())
+
+        is_bipartite, (left, right) = graph.find_bipartition()
+        self.assertEqual((sorted(left), sorted(right)), (['A', 'C'], ['B', 'D']))
+
+        # a triangle in a second component
+        graph.add_edges_bulk([('X', 'Y'), ('Y', 'Z'), ('Z', 'X')])
+        self.assertFalse(graph.is_bipartite())
+        is_bipartite, cycle = graph.find_bipartition()
+        self.assertEqual(sorted(cycle), ['X', 'Y', 'Z'])
+
+    def test_odd_cycle_witness_directed(self):
+        graph = Graph(is_directed=True)
+        graph.add_edges_bulk([('A', 'B'), ('B', 'C'), ('C', 'D'), ('D', 'E'), ('A', 'E')])
+
+        for graph_or_compact in (graph, graph.compile()):
+            is_bipartite, cycle = graph_or_compact.find_bipartition()
+            self.assertFalse(is_bipartite)
+            self.assertEqual(sorted(cycle), ['A', 'B', 'C', 'D', 'E'])
+
+
+class TestConnectedComponents(unittest.TestCase):
+    def setUp(self):
+        self.graph = Graph(is_directed=True)
+        self.graph.add_edges_bulk([('A', 'B'), ('B', 'C'), ('C', 'A'), ('C', 'D'), ('D', 'E'), ('E', 'D'),
+                                   ('X', 'Y')])
+
+    def test_weak_components(self):
+        components = sorted(sorted(c) for c in self.graph.find_connected_components())
+        self.assertEqual(components, [['A', 'B', 'C', 'D', 'E'], ['X', 'Y']])
+
+    def test_strong_components(self):
+        components = sorted(sorted(c) for c in self.graph.find_connected_components(mode='strong'))
+        self.assertEqual(components, [['A', 'B', 'C'], ['D', 'E'], ['X'], ['Y']])
+
+        with self.assertRaises(ValueError):
+            self.graph.find_connected_components(mode='sideways')
+
+    def test_in_same_component_tracks_changes(self):
+        self.assertTrue(self.graph.in_same_component('A', 'E'))
+        self.assertFalse(self.graph.in_same_component('A', 'E', mode='strong'))
+        self.assertFalse(self.graph.in_same_component('A', 'X'))
+
+        self.graph.add_edge('E', 'A')
+        self.graph.add_edge('Y', 'A')
+        self.assertTrue(self.graph.in_same_component('A', 'E', mode='strong'))
+        self.assertTrue(self.graph.in_same_component('A', 'X'))
+
+
+class TestConnectivityIndex(unittest.TestCase):
+    def test_index_follows_mutations(self):
+        graph = Graph(is_directed=True)
+        graph.add_edge('A', 'B')
+        graph.enable_connectivity_index()
+
+        graph.add_vertex('C')
+        self.assertTrue(graph.are_connected('B', 'A'))
+        self.assertFalse(graph.are_connected('A', 'C'))
+        self.assertEqual(graph.component_size('C'), 1)
+
+        graph.add_edges_bulk([('C', 'D'), ('D', 'B')])
+        self.assertTrue(graph.are_connected('A', 'C'))
+        self.assertEqual(graph.component_size('A'), 4)
+        self.assertEqual(len(graph.find_connected_components()), 1)
+
+    def test_weighted_graph_index(self):
+        graph = WeightedGraph(is_directed=False)
+        graph.enable_connectivity_index()
+        for vertex_id in 'ABC':
+            graph.add_vertex(vertex_id)
+        graph.add_edge('A', 'B', 3)
+
+        self.assertTrue(graph.are_connected('A', 'B'))
+        self.assertFalse(graph.are_connected('A', 'C'))
+        with self.assertRaises(KeyError):
+            graph.are_connected('A', 'Z')
+
+    def test_without_index(self):
+        graph = read_graph_from_file('test_files/graph_small_directed.txt')
+        self.assertTrue(graph.are_connected('1', '4'))
+        self.assertEqual(graph.component_size('1'), 4)
+
+
+class TestCompactGraph(unittest.TestCase):
+    def test_compiled_traversals_match_graph(self):
+        filename = 'test_files/graph_medium_undirected.txt'
+        graph = read_graph_from_file(filename)
+        compact = graph.compile()
+
+        self.assertEqual(len(compact), 6)
+        self.assertEqual(compact.number_of_edges(), 18)
+        self.assertEqual(compact.bfs_traversal('A')[0], 'A')
+        self.assertEqual(len(compact.find_shortest_path('A', 'F')), 4)
+        self.assertEqual(sorted(compact.find_vertices_n_away('A', 2)), ['D', 'E'])
+        self.assertEqual(compact.find_vertices_n_away('A', 3), ['F'])
+
+    def test_compiled_components_and_topological_sort(self):
+        graph = Graph(is_directed=True)
+        graph.add_edge('A', 'B')
+        graph.add_edge('B', 'C')
+        graph.add_edge('D', 'C')
+        graph.add_edge('E', 'F')
+        compact = graph.compile()
+
+        components = sorted(sorted(c) for c in compact.find_connected_components())
+        self.assertEqual(components, [['A', 'B', 'C', 'D'], ['E', 'F']])
+
+        order = compact.topological_sort()
+        self.assertLess(order.index('A'), order.index('B'))
+        self.assertLess(order.index('B'), order.index('C'))
+        self.assertLess(order.index('D'), order.index('C'))
+
+        graph.add_edge('C', 'A')
+        with self.assertRaises(ValueError):
+            graph.compile().topological_sort()
+
+    def test_missing_vertex(self):
+        compact = read_graph_from_file('test_files/graph_small_directed.txt').compile()
+        self.assertIsNone(compact.find_shortest_path('4', '1'))
+        with self.assertRaises(KeyError):
+            compact.find_shortest_path('1', 'Z')
+
+
+class TestBatchQueries(unittest.TestCase):
+    def test_batch_shortest_paths(self):
+        graph = read_graph_from_file('test_files/graph_medium_undirected.txt')
+        queries = [('A', 'F'), ('F', 'A'), 'C']
+
+        results = list(graph.batch_shortest_paths(queries, max_workers=2))
+        self.assertEqual(len(results[0]), 4)
+        self.assertEqual(results[1][0], 'F')
+        self.assertEqual(results[2], {'A': 1, 'B': 1, 'C': 0, 'D': 1, 'E': 1, 'F': 2})
+
+    def test_batch_weighted_unordered(self):
+        graph = read_graph_from_file('test_files/graph_weighted_directed.txt')
+        queries = [('home', 'gym'), ('gym', 'home')]
+
+        results = dict(graph.batch_shortest_paths(queries, max_workers=2, ordered=False))
+        self.assertEqual(results[0], (6.5, ['home', 'cafe', 'work', 'gym']))
+        self.assertIsNone(results[1])
+
+    def test_batch_vertices_n_away(self):
+        graph = read_graph_from_file('test_files/graph_medium_undirected.txt')
+        results = list(graph.batch_vertices_n_away([('A', 1), ('A', 3)], max_workers=2))
+        self.assertEqual([sorted(result) for result in results], [['B', 'C'], ['F']])
+
+
+class TestQueryCache(unittest.TestCase):
+    def test_hits_and_invalidation(self):
+        graph = read_graph_from_file('test_files/graph_medium_undirected.txt')
+        self.assertIsNone(graph.query_cache_stats())
+        graph.enable_query_cache(maxsize=2)
+
+        first = graph.find_shortest_path('A', 'F')
+        self.assertEqual(graph.find_shortest_path('A', 'F'), first)
+        self.assertEqual(graph.query_cache_stats()['hits'], 1)
+
+        graph.add_edge('A', 'F')
+        self.assertEqual(graph.find_shortest_path('A', 'F'), ['A', 'F'])
+        stats = graph.query_cache_stats()
+        self.assertEqual((stats['misses'], stats['invalidations']), (2, 1))
+
+    def test_results_are_copies(self):
+        graph = read_graph_from_file('test_files/graph_medium_undirected.txt')
+        graph.enable_query_cache()
+        path = graph.find_shortest_path('A', 'F')
+        expected = list(path)
+        path.append('Z')
+        cached = graph.find_shortest_path('A', 'F')
+        cached.clear()
+        self.assertEqual(graph.find_shortest_path('A', 'F'), expected)
+
+        weighted = read_graph_from_file('test_files/graph_weighted_directed.txt')
+        weighted.enable_query_cache()
+        weighted.floyd_warshall()['home']['gym'] = 0
+        self.assertEqual(weighted.floyd_warshall()['home']['gym'], 6.5)
+        distance, route = weighted.find_shortest_route('home', 'gym')
+        expected = list(route)
+        route.clear()
+        self.assertEqual(weighted.find_shortest_route('home', 'gym'), (distance, expected))
+        self.assertEqual(weighted.query_cache_stats()['hits'], 2)
+
+    def test_lru_eviction(self):
+        graph = read_graph_from_file('test_files/graph_medium_undirected.txt')
+        graph.enable_query_cache(maxsize=2)
+
+        graph.find_vertices_n_away('A', 1)
+        graph.find_vertices_n_away('A', 2)
+        graph.find_vertices_n_away('A', 1)  # now most recently used
+        graph.find_vertices_n_away('A', 3)  # evicts ('A', 2)
+        graph.find_vertices_n_away('A', 1)
+
+        stats = graph.query_cache_stats()
+        self.assertEqual((stats['hits'], stats['evictions'], stats['size']), (2, 1, 2))
+
+    def test_weighted_queries(self):
+        graph = read_graph_from_file('test_files/graph_weighted_directed.txt')
+        graph.enable_query_cache()
+
+        self.assertEqual(graph.floyd_warshall()['home']['gym'], 6.5)
+        graph.floyd_warshall()
+        self.assertEqual(graph.query_cache_stats()['hits'], 1)
+        result = graph.all_pairs_shortest_paths()
+        self.assertIs(graph.all_pairs_shortest_paths(), result)  # read-only, so shared
+        with self.assertRaises((TypeError, ValueError)):
+            result.get_distance_matrix()[0][0] = -1
+
+        graph.add_edge('home', 'gym', 1)
+        self.assertEqual(graph.floyd_warshall()['home']['gym'], 1)
+
+
+class TestBinarySnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, 'graph.bin')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip_string_ids(self):
+        graph = read_graph_from_file('test_files/graph_medium_undirected.txt')
+        graph.save_binary(self.filename)
+        loaded = Graph.load_binary(self.filename)
+
+        self.assertFalse(loaded.is_directed())
+        self.assertEqual(loaded.get_vertex_ids(), ['A', 'B', 'C', 'D', 'E', 'F'])
+        self.assertEqual(loaded.number_of_edges(), 18)
+        self.assertEqual(len(loaded.find_shortest_path('A', 'F')), 4)
+
+    def test_round_trip_weighted_integer_ids(self):
+        graph = WeightedGraph(is_directed=True)
+        graph.add_edges_bulk([(1, 2, 0.5), (2, 3, 4)])
+        graph.save_binary(self.filename)
+        loaded = WeightedGraph.load_binary(self.filename)
+
+        self.assertTrue(loaded.is_weighted())
+        self.assertEqual(sorted(loaded.get_vertex_ids()), [1, 2, 3])
+        self.assertEqual(sorted(loaded.iter_edges()), [(0, 1, 0.5), (1, 2, 4.0)])
+
+    def test_mixed_ids_rejected(self):
+        graph = Graph()
+        graph.add_edge('A', 1)
+        with self.assertRaises(TypeError):
+            graph.save_binary(self.filename)
+
+
+class TestReverseIndex(unittest.TestCase):
+    def test_degrees_and_predecessors(self):
+        for maintained in (False, True):
+            graph = Graph(is_directed=True)
+            if maintained:
+                graph.enable_reverse_index()
+            graph.add_edges_bulk([('A', 'C'), ('B', 'C')])
+            graph.add_edge('C', 'D')
+
+            ids = sorted(vertex.get_id() for vertex in graph.get_predecessors('C'))
+            self.assertEqual(ids, ['A', 'B'])
+            self.assertEqual(graph.in_degree('C'), 2)
+            self.assertEqual(graph.out_degree('C'), 1)
+            self.assertEqual(graph.in_degree('A'), 0)
+
+            graph.add_edge('D', 'C')
+            self.assertEqual(graph.in_degree('C'), 3)
+
+    def test_undirected_degrees(self):
+        graph = Graph(is_directed=False)
+        graph.add_edges_bulk([('A', 'B'), ('A', 'C')])
+        self.assertEqual(graph.in_degree('A'), 2)
+        self.assertEqual(graph.out_degree('A'), 2)
+        with self.assertRaises(KeyError):
+            graph.in_degree('Z')
+
+    def test_kahn_topological_sort(self):
+        graph = WeightedGraph(is_directed=True)
+        graph.enable_reverse_index()
+        graph.add_edges_bulk([('A', 'B', 1), ('A', 'C', 1), ('B', 'D', 1), ('C', 'D', 1)])
+
+        order = graph.topological_sort(method='kahn')
+        position = {vertex_id: i for i, vertex_id in enumerate(order)}
+        for vertex in graph.get_vertices():
+            for neighbor in vertex.get_neighbors():
+                self.assertLess(position[vertex.get_id()], position[neighbor.get_id()])
+
+        graph.add_edge('D', 'A', 1)
+        with self.assertRaises(ValueError):
+            graph.topological_sort(method='kahn')
+        with self.assertRaises(ValueError):
+            graph.topological_sort(method='bogus')
+
+
+class TestRemoval(unittest.TestCase):
+    def test_remove_edge_undirected(self):
+        graph = Graph(is_directed=False)
+        graph.enable_connectivity_index()
+        graph.add_edges_bulk([('A', 'B'), ('B', 'C')])
+        self.assertTrue(graph.are_connected('A', 'C'))
+
+        graph.remove_edge('C', 'B')
+        self.assertEqual([v.get_id() for v in graph.get_vertex('B').get_neighbors()], ['A'])
+        self.assertFalse(graph.are_connected('A', 'C'))
+        self.assertEqual(graph.component_size('C'), 1)
+        with self.assertRaises(KeyError):
+            graph.remove_edge('B', 'C')
+
+    def test_remove_vertex_directed(self):
+        graph = Graph(is_directed=True)
+        graph.enable_reverse_index()
+        graph.enable_query_cache()
+        graph.add_edges_bulk([('A', 'B'), ('B', 'C'), ('C', 'B'), ('B', 'B')])
+        self.assertEqual(graph.find_shortest_path('A', 'C'), ['A', 'B', 'C'])
+
+        graph.remove_vertex('B')
+        self.assertFalse(graph.contains_id('B'))
+        self.assertEqual(graph.get_vertex('A').get_neighbors(), [])
+        self.assertEqual(graph.get_vertex('C').get_neighbors(), [])
+        self.assertEqual(graph.in_degree('C'), 0)
+        self.assertIsNone(graph.find_shortest_path('A', 'C'))
+        with self.assertRaises(KeyError):
+            graph.remove_vertex('B')
+
+    def test_remove_isolated_vertex_with_connectivity_index(self):
+        graph = Graph(is_directed=False)
+        graph.add_edge('a', 'b')
+        graph.add_vertex('z')
+        graph.enable_connectivity_index()
+
+        graph.remove_vertex('z')
+        self.assertEqual(graph.find_connected_components(), [['a', 'b']])
+        with self.assertRaises(KeyError):
+            graph.are_connected('z', 'z')
+
+    def test_compact_graph_tombstones(self):
+        graph = Graph(is_directed=True)
+        graph.add_edges_bulk([(i, i + 1) for i in range(10)])
+        compact = graph.compile()
+
+        compact.remove_edge(4, 5)
+        self.assertEqual(compact.number_of_edges(), 9)
+        self.assertEqual(compact.bfs_traversal(0), [0, 1, 2, 3, 4])
+        compact.remove_vertex(2)
+        self.assertEqual(len(compact), 10)
+        self.assertFalse(compact.contains_id(2))
+        self.assertEqual(compact.find_shortest_path(0, 1), [0, 1])
+        self.assertEqual(len(compact.find_connected_components()), 3)
+        self.assertEqual(compact.topological_sort()[0], 0)
+
+        compact.compact()
+        self.assertEqual(sorted(compact.get_vertex_ids()), [0, 1, 3, 4, 5, 6, 7, 8, 9, 10])
+        self.assertEqual(compact.number_of_edges(), 7)
+        self.assertEqual(compact.bfs_traversal(5), [5, 6, 7, 8, 9, 10])
+
+    def test_compact_graph_compacts_automatically(self):
+        graph = WeightedGraph(is_directed=False)
+        graph.add_edges_bulk([('A', 'B', 1), ('B', 'C', 2), ('C', 'D', 3)])
+        compact = graph.compile()
+
+        compact.remove_edge('B', 'A')
+        self.assertEqual(compact.number_of_edges(), 4)
+        compact.remove_edge('C', 'D')  # half the slots are now dead
+        self.assertEqual(compact.number_of_edges(), 2)
+        self.assertEqual(compact.find_shortest_route('B', 'C'), (2.0, ['B', 'C']))
+
+
+class TestGraphGenerators(unittest.TestCase):
+    @staticmethod
+    def edges(graph):
+        return sorted((vertex.get_id(), neighbor.get_id())
+                      for vertex in graph.get_vertices() for neighbor in vertex.iter_neighbors())
+
+    def test_seeded_generators_are_reproducible(self):
+        for generate in (lambda seed: graph_generators.erdos_renyi(60, 0.1, seed),
+                         lambda seed: graph_generators.barabasi_albert(60, 2, seed),
+                         lambda seed: graph_generators.random_dag(60, 0.1, seed)):
+            self.assertEqual(self.edges(generate(5)), self.edges(generate(5)))
+            self.assertNotEqual(self.edges(generate(5)), self.edges(generate(6)))
+
+    def test_erdos_renyi(self):
+        complete = graph_generators.erdos_renyi(10, 1, is_directed=True)
+        self.assertEqual(len(self.edges(complete)), 90)
+        self.assertNotIn((3, 3), self.edges(complete))
+
+        weighted = graph_generators.erdos_renyi(30, 0.5, seed=1, weights=(2, 4))
+        self.assertIsInstance(weighted, WeightedGraph)
+        self.assertEqual(len(weighted.get_vertices()), 30)
+        for vertex in weighted.get_vertices():
+            for _, weight in vertex.iter_neighbors_with_weights():
+                self.assertIn(weight, (2, 3, 4))
+
+    def test_barabasi_albert_and_dag(self):
+        graph = graph_generators.barabasi_albert(100, 3, seed=1)
+        self.assertEqual(len(self.edges(graph)), 2 * 3 * 97)
+        self.assertEqual(len(graph.find_connected_components()), 1)
+
+        dag = graph_generators.random_dag(100, 0.2, seed=1)
+        self.assertFalse(dag.contains_cycle())
+        self.assertEqual(len(dag.topological_sort()), 100)
+
+    def test_grid(self):
+        graph = graph_generators.grid(3, 4, weights=(1.0, 1.0))
+        self.assertEqual(len(self.edges(graph)), 2 * (3 * 3 + 2 * 4))
+        self.assertEqual(graph.get_vertex_attribute(6, 'pos'), (2, 1))
+        self.assertEqual(graph.astar_shortest_path(0, 11, 'euclidean')[0], 5)
+
+    def test_benchmark_smoke(self):
+        from benchmarks import run_benchmarks
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(run_benchmarks.main(['--size', '40', '--repeat', '1', '--only', 'graph.bfs*']), 0)
+
+
+class TestFromEdges(unittest.TestCase):
+    def test_from_edges_iterable(self):
+        graph = Graph.from_edges([('A', 'B'), ('B', 'C'), ('A', 'B')], is_directed=False, vertices=['Z'])
+        self.assertFalse(graph.is_directed())
+        self.assertEqual(sorted(vertex.get_id() for vertex in graph.get_vertices()), ['A', 'B', 'C', 'Z'])
+        self.assertEqual(sum(vertex.get_degree() for vertex in graph.get_vertices()), 4)  # repeated edge once
+        self.assertEqual(graph.find_shortest_path('C', 'A'), ['C', 'B', 'A'])
+
+    def test_from_edge_columns(self):
+        graph = Graph.from_edges({'src': [1, 2], 'dst': [2, 3], 'unused': ['x', 'y']})
+        self.assertEqual(graph.find_shortest_path(1, 3), [1, 2, 3])
+        with self.assertRaises(ValueError):
+            Graph.from_edges({'src': [1, 2]})
+
+    @unittest.skipIf(all_pairs.np is None, 'NumPy is not installed')
+    def test_from_numpy_array(self):
+        import numpy as np
+        graph = Graph.from_edges(np.array([[0, 1], [1, 2], [2, 0]]))
+        vertex_ids = [vertex.get_id() for vertex in graph.get_vertices()]
+        self.assertEqual(sorted(vertex_ids), [0, 1, 2])
+        self.assertIs(type(vertex_ids[0]), int)
+        self.assertTrue(graph.contains_cycle())
+
+
+@unittest.skipIf(matrix.np is None, 'NumPy is not installed')
+class TestAdjacencyMatrix(unittest.TestCase):
+    def setUp(self):
+        self.graph = Graph.from_edges([('A', 'B'), ('B', 'C'), ('C', 'A'), ('D', 'C')])
+
+    def test_page_rank_matches_dense_power_iteration(self):
+        import numpy as np
+        ranks = self.graph.page_rank()
+        self.assertAlmostEqual(sum(ranks.values()), 1)
+        self.assertAlmostEqual(ranks['D'], 0.15 / 4)  # nothing links to D
+
+        transition = np.array([[0, 1, 0, 0], [0, 0, 1, 0], [1, 0, 0, 0], [0, 0, 1, 0]], dtype=float)
+        expected = np.full(4, 0.25)
+        for _ in range(200):
+            expected = 0.85 * transition.T @ expected + 0.15 / 4
+        self.assertTrue(np.allclose([ranks[vertex_id] for vertex_id in 'ABCD'], expected))
+
+    def test_degree_vectors_and_k_hops(self):
+        vertex_ids, out_degrees, in_degrees = self.graph.degree_vectors()
+        self.assertEqual(vertex_ids, ['A', 'B', 'C', 'D'])
+        self.assertEqual(out_degrees.tolist(), [1, 1, 1, 1])
+        self.assertEqual(in_degrees.tolist(), [1, 1, 2, 0])
+
+        self.assertEqual(self.graph.k_hop_reachable(['A'], 1), {'A': 0, 'B': 1})
+        self.assertEqual(self.graph.k_hop_reachable(['D', 'B'], 5), {'D': 0, 'B': 0, 'C': 1, 'A': 2})
+
+    def test_matrix_rebuilt_after_changes(self):
+        before = self.graph.adjacency_matrix()
+        self.assertIs(self.graph.adjacency_matrix(), before)
+        self.graph.add_edge('A', 'D')
+        self.assertEqual(self.graph.k_hop_reachable(['A'], 1), {'A': 0, 'B': 1, 'D': 1})
+
+    @unittest.skipIf(matrix.sparse is None, 'SciPy is not installed')
+    def test_sparse_matrix_round_trip(self):
+        sparse_matrix, vertex_ids = self.graph.to_sparse_matrix()
+        self.assertEqual(vertex_ids, ['A', 'B', 'C', 'D'])
+        self.assertEqual(sparse_matrix.toarray().tolist(),
+                         [[0, 1, 0, 0], [0, 0, 1, 0], [1, 0, 0, 0], [0, 0, 1, 0]])
+
+        loaded = Graph.from_sparse_matrix(sparse_matrix, vertex_ids)
+        self.assertEqual(loaded.find_shortest_path('D', 'B'), ['D', 'C', 'A', 'B'])
+        undirected = Graph.from_sparse_matrix(sparse_matrix + sparse_matrix.T, is_directed=False)
+        self.assertEqual(undirected.find_shortest_path(1, 3), [1, 2, 3])
+        with self.assertRaises(ValueError):
+            Graph.from_sparse_matrix(sparse_matrix, ['A'])
+
+
+class TestMultiSourceBFS(unittest.TestCase):
+    def engines(self):
+        return (False, True) if multi_source.np is not None else (False,)
+
+    def test_levels_match_single_source_bfs(self):
+        for is_directed in (False, True):
+            graph = graph_generators.erdos_renyi(120, 0.03, seed=2, is_directed=is_directed)
+            compact = graph.compile()
+            source_ids = list(range(0, 120, 3))
+            sources = [compact.index_of(source_id) for source_id in source_ids]
+            for use_numpy in self.engines():
+                for batch_size in (1, 7, 64, None):
+                    reached = {source_id: [] for source_id in source_ids}
+                    for depth, positions, vertices in multi_source.iter_levels(
+                            compact, sources, None, batch_size, use_numpy):
+                        for position, vertex in zip(list(positions), list(vertices)):
+                            reached[source_ids[position]].append((compact.id_of(int(vertex)), depth))
+                    for source_id in source_ids:
+                        self.assertEqual(sorted(reached[source_id]), sorted(graph.iter_bfs_levels(source_id)))
+
+    def test_vertices_n_away_many(self):
+        graph = graph_generators.barabasi_albert(200, 2, seed=3)
+        answers = graph.find_vertices_n_away_many(range(0, 200, 10), 2)
+        for source_id, vertex_ids in answers.items():
+            self.assertEqual(sorted(vertex_ids), sorted(graph.find_vertices_n_away(source_id, 2)))
+
+        levels = graph.multi_source_bfs([0], max_depth=1)
+        self.assertEqual(levels[0][0], [0])
+        self.assertEqual(sorted(levels[0][1]), sorted(neighbor.get_id() for neighbor in graph.get_vertex(0).get_neighbors()))
+
+    def test_repeated_sources(self):
+        graph = Graph.from_edges([(0, 1), (1, 2), (2, 3)], is_directed=False)
+        self.assertEqual(graph.multi_source_bfs([0, 0, 3]),
+                         {0: [[0], [1], [2], [3]], 3: [[3], [2], [1], [0]]})
+        self.assertEqual(graph.find_vertices_n_away_many([0, 0], 1), {0: [1]})
+
+    def test_negative_distance(self):
+        graph = Graph.from_edges([(0, 1), (1, 2), (2, 3)], is_directed=False)
+        self.assertEqual(graph.find_vertices_n_away(0, -1), [])
+        self.assertEqual(graph.compile().find_vertices_n_away(0, -1), [])
+        self.assertEqual(graph.find_vertices_n_away_many([0, 3], -1), {0: [], 3: []})
+        with self.assertRaises(KeyError):
+            graph.find_vertices_n_away_many(['Z'], -1)
+
+    def test_distances(self):
+        graph = Graph.from_edges([('A', 'B'), ('B', 'C'), ('D', 'C')])
+        vertex_ids, distances = graph.multi_source_distances(['A', 'D'])
+        self.assertEqual(vertex_ids, ['A', 'B', 'C', 'D'])
+        self.assertEqual([list(row) for row in distances], [[0, 1, 2, -1], [-1, -1, 1, 0]])
+        self.assertEqual(graph.find_vertices_n_away_many(['D'], 3), {'D': []})
+        with self.assertRaises(KeyError):
+            graph.multi_source_bfs(['Z'])
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.aggregator = instrumentation.StatsAggregator(keep_slowest=2)
+        instrumentation.add_sink(self.aggregator)
+
+    def tearDown(self):
+        instrumentation.remove_sink(self.aggregator)
+
+    def test_counters(self):
+        graph = Graph(is_directed=True)
+        graph.add_edges_bulk([('A', 'B'), ('B', 'C'), ('A', 'C'), ('C', 'D')])
+        graph.bfs_traversal('A')
+        graph.bfs_traversal('B')
+
+        totals = self.aggregator.summary()['Graph.bfs_traversal']
+        self.assertEqual(totals['calls'], 2)
+        self.assertEqual(totals['vertices_visited'], 4 + 3)
+        self.assertEqual(totals['edges_scanned'], 4 + 2)
+        self.assertEqual(totals['peak_frontier'], 1)  # B or C waiting while the other is expanded
+        self.assertEqual(len(self.aggregator.slowest()), 2)
+
+    def test_weighted_and_nested_calls(self):
+        graph = WeightedGraph(is_directed=False)
+        graph.add_edges_bulk([('A', 'B', 1), ('B', 'C', 1), ('A', 'C', 5)])
+        graph.find_shortest_route('A', 'C')
+
+        summary = self.aggregator.summary()
+        # find_shortest_route calls find_shortest_routes, which reports into it
+        self.assertEqual(list(summary), ['WeightedGraph.find_shortest_route'])
+        self.assertEqual(summary['WeightedGraph.find_shortest_route']['relaxations'], 3)
+        self.assertEqual(summary['WeightedGraph.find_shortest_route']['heap_pushes'], 3)
+
+        text = self.aggregator.to_prometheus()
+        self.assertIn('# TYPE graph_algorithm_calls_total counter', text)
+        self.assertIn('graph_algorithm_calls_total{algorithm="WeightedGraph.find_shortest_route"} 1', text)
+        self.assertIn("('A', 'C')", self.aggregator.to_json())
+
+    def test_callback_and_json_lines_sinks(self):
+        calls = []
+        stream = io.StringIO()
+        sink = instrumentation.JsonLinesSink(stream)
+        instrumentation.add_sink(calls.append)
+        instrumentation.add_sink(sink)
+        try:
+            graph = Graph(is_directed=True)
+            graph.add_edge('A', 'B')
+            graph.topological_sort()
+        finally:
+            instrumentation.remove_sink(calls.append)
+            instrumentation.remove_sink(sink)
+
+        self.assertEqual([stats.algorithm for stats in calls], ['Graph.topological_sort'])
+        self.assertEqual(calls[0].vertices_visited, 2)
+        self.assertIn('"algorithm": "Graph.topological_sort"', stream.getvalue())
+
+    def test_component_and_multi_source_counters(self):
+        graph = Graph(is_directed=True)
+        graph.add_edges_bulk([('A', 'B'), ('B', 'C'), ('C', 'A'), ('C', 'D')])
+        graph.find_connected_components()
+        graph.find_connected_components(mode=components.STRONG)
+        graph.multi_source_bfs(['A', 'D'])
+        graph.multi_source_distances(['A'])
+
+        summary = self.aggregator.summary()
+        totals = summary['Graph.find_connected_components']
+        self.assertEqual(totals['calls'], 2)
+        self.assertEqual(totals['vertices_visited'], 4 + 4)
+        self.assertGreater(totals['edges_scanned'], 0)
+        for algorithm in ('Graph.multi_source_bfs', 'Graph.multi_source_distances'):
+            self.assertGreater(summary[algorithm]['vertices_visited'], 0)
+            self.assertGreater(summary[algorithm]['edges_scanned'], 0)
+
+    def test_all_pairs_counters(self):
+        graph = WeightedGraph(is_directed=True)
+        graph.add_edges_bulk([('A', 'B', 1), ('B', 'C', 1), ('A', 'C', 5)])
+        for use_numpy in ([False, True] if all_pairs.np is not None else [False]):
+            self.aggregator.reset()
+            graph.all_pairs_shortest_paths(use_numpy=use_numpy)
+            totals = self.aggregator.summary()['WeightedGraph.all_pairs_shortest_paths']
+            self.assertEqual(totals['vertices_visited'], 3)  # one expansion per pivot
+            self.assertEqual(totals['edges_scanned'], 3 * 3 * 3)
+            self.assertEqual(totals['relaxations'], 1)  # A -> C through B
+
+    def test_disabled(self):
+        instrumentation.remove_sink(self.aggregator)
+        try:
+            graph = Graph()
+            graph.add_edge('A', 'B')
+            graph.bfs_traversal('A')
+            self.assertIsNone(instrumentation.current())
+            self.assertEqual(self.aggregator.summary(), {})
+        finally:
+            instrumentation.add_sink(self.aggregator)
+
+
+class TestAsyncGraphService(unittest.TestCase):
+    def setUp(self):
+        self.graph = graph_generators.grid(80, 80)
+        self.far_corner = 80 * 80 - 1
+        self.calls = []
+        instrumentation.add_sink(self.calls.append)
+
+    def tearDown(self):
+        instrumentation.remove_sink(self.calls.append)
+
+    def test_coalesces_identical_queries(self):
+        async def run():
+            async with AsyncGraphService(self.graph, max_workers=2) as service:
+                return await asyncio.gather(*[service.find_shortest_path(0, self.far_corner) for _ in range(5)])
+
+        paths = asyncio.run(run())
+        self.assertEqual(len(paths[0]), 80 + 80 - 1)
+        self.assertTrue(all(path == paths[0] for path in paths))
+        self.assertEqual([stats.algorithm for stats in self.calls], ['Graph.find_shortest_path'])
+
+    def test_coalesces_queries_waiting_for_a_slot(self):
+        async def run():
+            async with AsyncGraphService(self.graph, max_workers=1, max_pending=1) as service:
+                return await asyncio.gather(service.bfs_traversal(0),
+                                            *[service.find_shortest_path(0, self.far_corner) for _ in range(3)])
+
+        results = asyncio.run(run())
+        self.assertTrue(all(path == results[1] for path in results[2:]))
+        self.assertEqual(sorted(stats.algorithm for stats in self.calls),
+                         ['Graph.bfs_traversal', 'Graph.find_shortest_path'])
+
+    def test_abandoned_search_is_not_shared(self):
+        class SlowGraph(Graph):
+            @instrumentation.instrumented
+            def slow_query(self):
+                stats = instrumentation.current()
+                for _ in range(50):
+                    stats.visit(self.get_vertex(0), 0)  # raises once the deadline has passed
+                    time.sleep(0.002)
+                return 'done'
+
+        graph = SlowGraph()
+        graph.add_vertex(0)
+
+        async def run():
+            async with AsyncGraphService(graph) as service:
+                with self.assertRaises(instrumentation.DeadlineExceeded):
+                    await service.query('slow_query', timeout=0.01)
+                return await service.query('slow_query')
+
+        self.assertEqual(asyncio.run(run()), 'done')
+        self.assertEqual(len(self.calls), 2)  # the second caller started its own search
+
+    def test_aclose_fails_queued_queries_without_blocking_the_loop(self):
+        class SlowGraph(Graph):
+            def slow_query(self, label):
+                time.sleep(0.05)
+                return label
+
+        graph = SlowGraph()
+
+        async def run():
+            service = AsyncGraphService(graph, max_workers=1, max_pending=1)
+            running = asyncio.ensure_future(service.query('slow_query', 'running'))
+            queued = asyncio.ensure_future(service.query('slow_query', 'queued'))
+            await asyncio.sleep(0.01)
+
+            ticks = 0
+            closing = asyncio.ensure_future(service.aclose())
+            while not closing.done():
+                ticks += 1
+                await asyncio.sleep(0.001)
+            await closing
+            with self.assertRaises(RuntimeError):
+                await queued
+            return await running, ticks
+
+        result, ticks = asyncio.run(run())
+        self.assertEqual(result, 'running')
+        self.assertGreater(ticks, 1)  # the loop kept running while the worker finished
+
+    def test_deadline_stops_the_search(self):
+        async def run():
+            async with AsyncGraphService(self.graph) as service:
+                with self.assertRaises(instrumentation.DeadlineExceeded):
+                    await service.query('bfs_traversal', 0, timeout=0.001)
+
+        asyncio.run(run())
+        self.assertEqual(len(self.calls), 1)
+        self.assertLess(self.calls[0].vertices_visited, 80 * 80)
+
+    def test_mutations_are_seen_by_later_queries(self):
+        async def run():
+            async with AsyncGraphService(self.graph) as service:
+                before = await service.find_vertices_n_away(0, 1)
+                await service.add_edge(0, self.far_corner)
+                after = await service.find_vertices_n_away(0, 1)
+                return before, after
+
+        before, after = asyncio.run(run())
+        self.assertNotIn(self.far_corner, before)
+        self.assertIn(self.far_corner, after)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
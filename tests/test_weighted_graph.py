@@ -0,0 +1,325 @@
+import os
+import random
+import tempfile
+import unittest
+from graphs import all_pairs, heuristics, matrix
+from graphs.landmarks import LandmarkIndex
+from graphs.disjoint_set import DisjointSet
+from graphs.weighted_graph import WeightedGraph
+
+
+def build_example_graph():
+    """Build the undirected example graph from weighted_graph.py."""
+    graph = WeightedGraph(is_directed=False)
+    for vertex_id in 'ABCDEFGHJ':
+        graph.add_vertex(vertex_id)
+
+    graph.add_edge('A', 'B', 4)
+    graph.add_edge('A', 'C', 8)
+    graph.add_edge('B', 'C', 11)
+    graph.add_edge('B', 'D', 8)
+    graph.add_edge('C', 'F', 1)
+    graph.add_edge('C', 'E', 4)
+    graph.add_edge('D', 'E', 2)
+    graph.add_edge('D', 'G', 7)
+    graph.add_edge('D', 'H', 4)
+    graph.add_edge('E', 'F', 6)
+    graph.add_edge('F', 'H', 2)
+    graph.add_edge('G', 'H', 14)
+    graph.add_edge('G', 'J', 9)
+    graph.add_edge('H', 'J', 10)
+    return graph
+
+
+class TestWeightedVertex(unittest.TestCase):
+    def test_iter_neighbors_with_weights(self):
+        graph = build_example_graph()
+        vertex_a = graph.get_vertex('A')
+
+        self.assertEqual([neighbor.get_id() for neighbor in vertex_a.iter_neighbors()], ['B', 'C'])
+        self.assertEqual([(neighbor.get_id(), weight) for neighbor, weight in vertex_a.iter_neighbors_with_weights()],
+                         [('B', 4), ('C', 8)])
+        self.assertFalse(hasattr(vertex_a, '__dict__'))
+
+
+class TestShortestPath(unittest.TestCase):
+    def test_find_shortest_path(self):
+        graph = build_example_graph()
+        self.assertEqual(graph.find_shortest_path('A', 'J'), 21)
+        self.assertEqual(graph.find_shortest_path('A', 'A'), 0)
+
+    def test_find_shortest_route(self):
+        graph = build_example_graph()
+        distance, path = graph.find_shortest_route('A', 'J')
+        self.assertEqual(distance, 21)
+        self.assertEqual(path, ['A', 'C', 'F', 'H', 'J'])
+
+    def test_find_shortest_routes_and_all_distances(self):
+        graph = build_example_graph()
+        graph.add_vertex('Z')
+
+        routes = graph.find_shortest_routes('A', ['E', 'G', 'Z'])
+        self.assertEqual(routes['E'], (12, ['A', 'C', 'E']))
+        self.assertEqual(routes['G'][0], 19)
+        self.assertIsNone(routes['Z'])
+
+        distances = graph.find_all_distances('A')
+        self.assertEqual(len(distances), 9)
+        self.assertEqual(distances['D'], 12)
+        self.assertNotIn('Z', distances)
+
+
+    def test_from_edges_keeps_weights(self):
+        edges = [('A', 'B', 4), ('B', 'A', 2), ('A', 'B', 7)]
+        first = WeightedGraph.from_edges(edges, is_directed=False)
+        self.assertEqual(first.find_shortest_route('A', 'B'), (4, ['A', 'B']))
+        self.assertEqual(first.find_shortest_route('B', 'A'), (4, ['B', 'A']))
+        lowest = WeightedGraph.from_edges(edges, is_directed=False, keep='min')
+        self.assertEqual(lowest.find_shortest_route('B', 'A'), (2, ['B', 'A']))
+        last = WeightedGraph.from_edges(edges, keep='last')
+        self.assertEqual(last.find_shortest_route('A', 'B'), (7, ['A', 'B']))
+        with self.assertRaises(ValueError):
+            WeightedGraph.from_edges(edges, keep='max')
+
+    def test_from_edge_columns(self):
+        graph = build_example_graph()
+        edges = [(vertex.get_id(), neighbor.get_id(), weight) for vertex in graph.get_vertices()
+                 for neighbor, weight in vertex.iter_neighbors_with_weights()]
+        columns = {'src': [e[0] for e in edges], 'dst': [e[1] for e in edges], 'weight': [e[2] for e in edges]}
+        loaded = WeightedGraph.from_edges(columns)
+        self.assertEqual(loaded.find_shortest_route('A', 'J')[0], 21)
+
+
+@unittest.skipIf(matrix.sparse is None, 'SciPy is not installed')
+class TestSparseMatrix(unittest.TestCase):
+    def test_weighted_round_trip(self):
+        graph = build_example_graph()
+        sparse_matrix, vertex_ids = graph.to_sparse_matrix()
+        self.assertEqual(sparse_matrix[vertex_ids.index('A'), vertex_ids.index('B')], 4)
+        self.assertTrue((sparse_matrix != sparse_matrix.T).nnz == 0)
+
+        loaded = WeightedGraph.from_sparse_matrix(sparse_matrix, vertex_ids, is_directed=False)
+        self.assertEqual(loaded.find_shortest_route('A', 'J'), (21, ['A', 'C', 'F', 'H', 'J']))
+
+    def test_weighted_degrees_and_page_rank(self):
+        graph = build_example_graph()
+        vertex_ids, out_degrees, _ = graph.degree_vectors(weighted=True)
+        self.assertEqual(out_degrees[vertex_ids.index('A')], 12)
+        ranks = graph.page_rank()
+        self.assertAlmostEqual(sum(ranks.values()), 1)
+        self.assertGreater(ranks['H'], ranks['A'])  # H has more, heavier edges
+
+
+class TestAStar(unittest.TestCase):
+    def setUp(self):
+        # a 15 x 15 undirected grid with unit edges and (x, y) coordinates
+        self.graph = WeightedGraph(is_directed=False)
+        size = 15
+        self.graph.add_edges_bulk([((x, y), (x + 1, y), 1) for x in range(size - 1) for y in range(size)])
+        self.graph.add_edges_bulk([((x, y), (x, y + 1), 1) for x in range(size) for y in range(size - 1)])
+        self.graph.set_vertex_attributes('pos', {(x, y): (x, y) for x in range(size) for y in range(size)})
+
+    def test_euclidean_expands_fewer_vertices(self):
+        distance, path, expanded = self.graph.astar_shortest_path((0, 7), (14, 7), 'euclidean')
+        plain_distance, _, plain_expanded = self.graph.astar_shortest_path((0, 7), (14, 7))
+
+        self.assertEqual(distance, 14)
+        self.assertEqual(plain_distance, 14)
+        self.assertEqual(path[0], (0, 7))
+        self.assertEqual(path[-1], (14, 7))
+        self.assertEqual(len(path), 15)
+        self.assertLess(expanded, plain_expanded / 4)
+
+    def test_custom_heuristic_and_unreachable(self):
+        manhattan = lambda vertex_id, target_id: abs(vertex_id[0] - target_id[0]) + abs(vertex_id[1] - target_id[1])
+        distance, _, expanded = self.graph.astar_shortest_path((0, 0), (3, 4), manhattan)
+        self.assertEqual(distance, 7)
+
+        self.graph.add_vertex('island')
+        self.assertEqual(self.graph.astar_shortest_path((0, 0), 'island', 'euclidean')[:2], (None, None))
+        with self.assertRaises(ValueError):
+            self.graph.astar_shortest_path((0, 0), (1, 1), 'bogus')
+
+    def test_example_graph_matches_dijkstra(self):
+        graph = build_example_graph()
+        distance, path, _ = graph.astar_shortest_path('A', 'J')
+        self.assertEqual((distance, path), graph.find_shortest_route('A', 'J'))
+
+    def test_haversine_distance(self):
+        london, paris = (51.5074, -0.1278), (48.8566, 2.3522)
+        self.assertAlmostEqual(heuristics.haversine_distance(london, paris), 343.5, delta=1)
+
+
+class TestLandmarkIndex(unittest.TestCase):
+    def setUp(self):
+        # a seeded random directed road-like graph on integer ids
+        rng = random.Random(7)
+        self.graph = WeightedGraph(is_directed=True)
+        size = 12
+        edges = []
+        for x in range(size):
+            for y in range(size):
+                vertex = x * size + y
+                if x + 1 < size:
+                    edges.append((vertex, vertex + size, rng.randint(1, 9)))
+                    edges.append((vertex + size, vertex, rng.randint(1, 9)))
+                if y + 1 < size:
+                    edges.append((vertex, vertex + 1, rng.randint(1, 9)))
+                    edges.append((vertex + 1, vertex, rng.randint(1, 9)))
+        self.graph.add_edges_bulk(edges)
+        self.index = self.graph.build_landmark_index(k=4, seed=1)
+
+    def test_exact_and_fewer_expansions(self):
+        rng = random.Random(3)
+        alt_expanded = plain_expanded = 0
+        for _ in range(20):
+            start, target = rng.randrange(144), rng.randrange(144)
+            distance, path, expanded = self.graph.astar_shortest_path(start, target, self.index)
+            self.assertEqual(distance, self.graph.find_shortest_path(start, target))
+            self.assertEqual((path[0], path[-1]), (start, target))
+            alt_expanded += expanded
+            plain_expanded += self.graph.astar_shortest_path(start, target)[2]
+        self.assertLess(alt_expanded, plain_expanded)
+
+    def test_farthest_landmarks_are_distinct(self):
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(len(set(self.index.get_landmarks())), 4)
+        with self.assertRaises(ValueError):
+            LandmarkIndex.build(self.graph, strategy='bogus')
+
+    def test_save_and_load(self):
+        descriptor, filename = tempfile.mkstemp(suffix='.alt')
+        os.close(descriptor)
+        try:
+            self.index.save(filename)
+            loaded = LandmarkIndex.load(filename)
+            self.assertEqual(loaded.get_landmarks(), self.index.get_landmarks())
+            for vertex, target in [(0, 143), (50, 7), (99, 99)]:
+                self.assertEqual(loaded.lower_bound(vertex, target), self.index.lower_bound(vertex, target))
+        finally:
+            os.remove(filename)
+
+    def test_undirected_string_ids(self):
+        graph = build_example_graph()
+        index = LandmarkIndex.build(graph, k=3, strategy='random', seed=2)
+        self.assertLessEqual(index.lower_bound('A', 'J'), 21)
+        self.assertEqual(graph.astar_shortest_path('A', 'J', index)[0], 21)
+
+
+class TestMinimumSpanningTree(unittest.TestCase):
+    def test_kruskal_and_prim_agree(self):
+        graph = build_example_graph()
+        spanning_tree = graph.minimum_spanning_tree_kruskal()
+
+        self.assertEqual(len(spanning_tree), 8)
+        self.assertEqual(sum(weight for _, _, weight in spanning_tree), 37)
+        self.assertEqual(graph.minimum_spanning_tree_prim(), 37)
+
+    def test_minimum_spanning_forest(self):
+        graph = build_example_graph()
+        graph.add_vertex('X')
+        graph.add_vertex('Y')
+        graph.add_edge('X', 'Y', 5)
+
+        for algorithm in ('kruskal', 'prim'):
+            edges, total_weight = graph.minimum_spanning_forest(algorithm)
+            self.assertEqual(len(edges), 9)
+            self.assertEqual(total_weight, 42)
+
+        with self.assertRaises(ValueError):
+            graph.minimum_spanning_forest('boruvka')
+
+
+class TestAllPairsShortestPaths(unittest.TestCase):
+    def assert_matches_dijkstra(self, graph, result):
+        for start_id in 'ABCDEFGHJ':
+            distances = graph.find_all_distances(start_id)
+            for target_id in 'ABCDEFGHJ':
+                self.assertEqual(result.distance(start_id, target_id), distances[target_id])
+
+    def test_floyd_warshall_dict(self):
+        graph = build_example_graph()
+        dist = graph.floyd_warshall()
+        self.assertEqual(dist['A']['J'], 21)
+        self.assertEqual(dist['J']['A'], 21)
+        self.assertEqual(dist['D']['D'], 0)
+
+    def test_pure_python_paths(self):
+        graph = build_example_graph()
+        result = graph.all_pairs_shortest_paths(use_numpy=False)
+        self.assert_matches_dijkstra(graph, result)
+        self.assertEqual(result.path('A', 'J'), ['A', 'C', 'F', 'H', 'J'])
+
+    @unittest.skipIf(all_pairs.np is None, 'NumPy is not installed')
+    def test_numpy_and_blocked_paths(self):
+        graph = build_example_graph()
+        for block_size in (None, 2, 4):
+            result = graph.all_pairs_shortest_paths(block_size=block_size, use_numpy=True)
+            self.assert_matches_dijkstra(graph, result)
+            self.assertEqual(result.path('A', 'J'), ['A', 'C', 'F', 'H', 'J'])
+
+
+    @unittest.skipIf(all_pairs.np is None, 'NumPy is not installed')
+    def test_blocked_matches_plain_on_random_graph(self):
+        graph = WeightedGraph(is_directed=True)
+        rng = random.Random(7)
+        graph.add_edges_bulk((rng.randrange(40), rng.randrange(40), rng.uniform(1, 5)) for _ in range(150))
+        plain = graph.all_pairs_shortest_paths(use_numpy=True)
+        for block_size in (3, 16, 64):
+            blocked = graph.all_pairs_shortest_paths(block_size=block_size, use_numpy=True)
+            for start_id in plain:
+                for target_id in plain:
+                    self.assertAlmostEqual(blocked.distance(start_id, target_id), plain.distance(start_id, target_id))
+                    path = blocked.path(start_id, target_id)
+                    self.assertEqual(path is None, plain.path(start_id, target_id) is None)
+
+    def test_zero_weight_edges(self):
+        graph = WeightedGraph(is_directed=False)
+        for vertex_id in range(6):
+            graph.add_vertex(vertex_id)
+        for edge in [(1, 2, 0), (1, 0, 3), (5, 3, 2), (1, 3, 1)]:
+            graph.add_edge(*edge)
+        rng = random.Random(4)
+        for vertex_id in range(6, 30):
+            graph.add_vertex(vertex_id)
+        for _ in range(60):
+            graph.add_edge(rng.randrange(30), rng.randrange(30), rng.choice([0, 0, 1, 2]))
+
+        options = [{'use_numpy': False}]
+        if all_pairs.np is not None:
+            options += [{'use_numpy': True}] + [{'block_size': size, 'use_numpy': True} for size in (2, 3, 5, 8)]
+        expected = graph.all_pairs_shortest_paths(use_numpy=False)
+        for kwargs in options:
+            result = graph.all_pairs_shortest_paths(**kwargs)
+            for start_id in range(30):
+                for target_id in range(30):
+                    distance = result.distance(start_id, target_id)
+                    self.assertEqual(distance, expected.distance(start_id, target_id))
+                    path = result.path(start_id, target_id)
+                    if path is None:
+                        self.assertEqual(distance, float('inf'))
+                        continue
+                    self.assertEqual((path[0], path[-1]), (start_id, target_id))
+                    length = sum(dict((neighbor.get_id(), weight) for neighbor, weight in
+                                      graph.get_vertex(a).iter_neighbors_with_weights())[b]
+                                 for a, b in zip(path, path[1:]))
+                    self.assertEqual(length, distance)
+        self.assertEqual(graph.all_pairs_shortest_paths(block_size=2).path(5, 0)[-1], 0)
+
+
+class TestDisjointSet(unittest.TestCase):
+    def test_union_and_find(self):
+        groups = DisjointSet(4)
+        self.assertTrue(groups.union(0, 1))
+        self.assertFalse(groups.union(1, 0))
+        self.assertTrue(groups.connected(0, 1))
+        self.assertFalse(groups.connected(0, 2))
+
+        element = groups.add()
+        groups.union(element, 2)
+        self.assertEqual(groups.set_size(2), 2)
+        self.assertEqual(groups.set_count(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
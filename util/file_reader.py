@@ -1,40 +1,153 @@
-
 from graphs.graph import Graph
+from graphs.weighted_graph import WeightedGraph
+
+CHUNK_SIZE = 1 << 20  # bytes read from disk at a time
+BATCH_SIZE = 1 << 16  # edges handed to the graph at a time
+
+
+def parse_edge(line):
+    """
+    Parse one edge line of the form `(id1,id2)` or `(id1,id2,weight)`.
+
+    Vertex ids may be any length; surrounding whitespace is ignored.
+
+    Arguments:
+    line (string): The line to parse, without its trailing newline
+
+    Returns:
+    tuple: (id1, id2) or (id1, id2, weight), with the weight as an int or float
+    """
+    line = line.strip()
+    if len(line) < 2 or line[0] != '(' or line[-1] != ')':
+        raise ValueError(f'Invalid edge: {line!r}')
+
+    fields = [field.strip() for field in line[1:-1].split(',')]
+    if len(fields) == 2:
+        return fields[0], fields[1]
+    if len(fields) == 3:
+        return fields[0], fields[1], parse_weight(fields[2])
+    raise ValueError(f'Invalid edge: {line!r}')
+
+
+def parse_weight(token):
+    """Return an edge weight token as an int if possible, otherwise as a float."""
+    try:
+        return int(token)
+    except ValueError:
+        return float(token)
+
+
+def iter_lines(f, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Lazily yield the lines of a binary file, reading it in large chunks.
 
+    Only complete lines are decoded, so a multi-byte character split across
+    two chunks is never cut in half. Memory use is bounded by the chunk size.
 
-def read_graph_from_file(filename):
+    Arguments:
+    f (file): A file opened in binary mode
+    chunk_size (integer): The number of bytes to read at a time
+    progress (callable): Called as progress(bytes_read) after each chunk
+
+    Yields:
+    string: Each line, without its line ending
+    """
+    remainder = b''
+    bytes_read = 0
+
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        bytes_read += len(chunk)
+
+        data = remainder + chunk
+        cut = data.rfind(b'\n')
+        if cut == -1:
+            remainder = data
+        else:
+            remainder = data[cut + 1:]
+            yield from data[:cut].decode('utf-8').split('\n')
+
+        if progress is not None:
+            progress(bytes_read)
+
+    if remainder:
+        yield remainder.decode('utf-8')
+
+
+def read_graph_from_file(filename, chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE, progress=None):
     """
     Read in data from the specified filename, and create and return a graph
     object corresponding to that data.
 
+    The first line is G (undirected) or D (directed), the second line lists
+    the vertex ids separated by commas, and every following line is an edge
+    `(id1,id2)`, or `(id1,id2,weight)` for a weighted graph. The edges are
+    streamed from disk and added in batches through the graph's bulk-insert
+    path, so the parser's memory use does not grow with the file size.
+
     Arguments:
     filename (string): The relative path of the file to be processed
+    chunk_size (integer): The number of bytes to read at a time
+    batch_size (integer): The number of edges to add to the graph at a time
+    progress (callable): Called as progress(bytes_read, edges_read) as the
+    file is read
 
     Returns:
-    Graph: A directed or undirected Graph object containing the specified
-    vertices and edges
+    Graph: A directed or undirected Graph (or WeightedGraph, if the edges
+    have weights) object containing the specified vertices and edges
     """
-
-    # TODO: Use 'open' to open the file
-    with open(filename, 'r', encoding='utf-8-sig') as f:
-        # TODO: Use the first line (G or D) to determine whether graph is directed
-        first = next(f).strip('\n')
+    with open(filename, 'rb') as f:
+        # Use the first line (G or D) to determine whether graph is directed
+        first_line = f.readline()
+        first = first_line.decode('utf-8-sig').strip()
 
         if first == 'D':
-            graph = Graph(is_directed=True)
+            is_directed = True
         elif first == 'G':
-            graph = Graph(is_directed=False)
+            is_directed = False
         else:
             raise ValueError('Invalid file format')
 
-        # TODO: Use the second line to add the vertices to the graph
-        for each in next(f).strip('\n').split(','):
-            graph.add_vertex(each)
+        vertex_line = f.readline()
+        header_bytes = len(first_line) + len(vertex_line)
+        vertex_ids = [each.strip() for each in vertex_line.decode('utf-8').strip().split(',') if each.strip()]
+
+        graph = None
+        batch = []
+        edges_read = 0
+
+        def report(bytes_read):
+            if progress is not None:
+                progress(header_bytes + bytes_read, edges_read)
+
+        for line in iter_lines(f, chunk_size, report):
+            if not line.strip():
+                continue
+
+            edge = parse_edge(line)
+            if graph is None:
+                # the first edge decides whether this is a weighted graph
+                edge_size = len(edge)
+                graph = WeightedGraph(is_directed) if edge_size == 3 else Graph(is_directed)
+                for vertex_id in vertex_ids:
+                    graph.add_vertex(vertex_id)
+            elif len(edge) != edge_size:
+                raise ValueError(f'Mixed weighted and unweighted edges: {line!r}')
+
+            batch.append(edge)
+            edges_read += 1
+            if len(batch) >= batch_size:
+                graph.add_edges_bulk(batch)
+                batch = []
 
-        # TODO: Use the 3rd+ line to add the edges to the graph
-        for line in f:
-            graph.add_edge(line[1], line[3])
+        if graph is None:  # no edges at all
+            graph = Graph(is_directed)
+            for vertex_id in vertex_ids:
+                graph.add_vertex(vertex_id)
 
+        graph.add_edges_bulk(batch)
         return graph
 
 
@@ -42,4 +155,4 @@ if __name__ == '__main__':
 
     graph = read_graph_from_file('test.txt')
 
-    print(graph)
\ No newline at end of file
+    print(graph)
@@ -0,0 +1,153 @@
+import math
+import random
+
+from graphs.graph import Graph
+from graphs.weighted_graph import WeightedGraph
+
+
+def _new_graph(vertex_count, is_directed, weights):
+    """Return an empty Graph (or WeightedGraph, if weights are wanted) with vertices 0..vertex_count-1."""
+    graph = WeightedGraph(is_directed) if weights else Graph(is_directed)
+    for vertex_id in range(vertex_count):
+        graph.add_vertex(vertex_id)
+    return graph
+
+
+def _add_edges(graph, edges, weights, rng):
+    """Add (id1, id2) pairs to graph, with a random weight in the `weights` range if given."""
+    if weights:
+        low, high = weights
+        if isinstance(low, int) and isinstance(high, int):
+            graph.add_edges_bulk((id1, id2, rng.randint(low, high)) for id1, id2 in edges)
+        else:
+            graph.add_edges_bulk((id1, id2, rng.uniform(low, high)) for id1, id2 in edges)
+    else:
+        graph.add_edges_bulk(edges)
+    return graph
+
+
+def erdos_renyi(vertex_count, edge_probability, seed=None, is_directed=False, weights=None):
+    """
+    Generate an Erdős–Rényi G(n, p) random graph, where each possible edge
+    exists independently with probability p. Runs in O(V + E) time by
+    jumping over absent edges with geometrically distributed skips.
+    Parameters:
+    vertex_count (integer): The number of vertices, with ids 0..vertex_count-1.
+    edge_probability (number): The probability of each edge.
+    seed: Seeds the random number generator, for a reproducible graph.
+    is_directed (boolean): Whether to generate a directed graph.
+    weights (tuple): A (low, high) range of random edge weights, which makes
+    a WeightedGraph; integer bounds give integer weights.
+    Returns:
+    Graph: The generated graph.
+    """
+    rng = random.Random(seed)
+    graph = _new_graph(vertex_count, is_directed, weights)
+    if edge_probability <= 0 or vertex_count < 2:
+        return graph
+
+    # number the candidate edges 0, 1, ... and skip ahead between kept ones
+    if is_directed:
+        candidate_count = vertex_count * (vertex_count - 1)
+
+        def to_edge(i):
+            source, target = divmod(i, vertex_count - 1)
+            return source, target + 1 if target >= source else target  # skip the self loop
+    else:
+        candidate_count = vertex_count * (vertex_count - 1) // 2
+        to_edge = _pair_from_index
+
+    return _add_edges(graph, _sample_edges(candidate_count, edge_probability, to_edge, rng), weights, rng)
+
+
+def _sample_edges(candidate_count, edge_probability, to_edge, rng):
+    """Keep each numbered candidate edge with probability edge_probability, and map the kept ones with to_edge."""
+    if edge_probability >= 1:
+        return [to_edge(i) for i in range(candidate_count)]
+
+    edges = []
+    log_q = math.log(1 - edge_probability)
+    i = -1
+    while True:
+        i += 1 + int(math.log(1 - rng.random()) / log_q)
+        if i >= candidate_count:
+            return edges
+        edges.append(to_edge(i))
+
+
+def _pair_from_index(i):
+    """Map i to the i-th pair (a, b) with a < b, ordered by b and then a."""
+    b = (1 + math.isqrt(1 + 8 * i)) // 2
+    a = i - b * (b - 1) // 2
+    return a, b
+
+
+def barabasi_albert(vertex_count, edges_per_vertex, seed=None, weights=None):
+    """
+    Generate an undirected Barabási–Albert preferential attachment graph:
+    each new vertex connects to `edges_per_vertex` existing vertices, chosen
+    with probability proportional to their degree, which gives the heavy
+    tailed degree distribution of social and web graphs.
+    See erdos_renyi for the other parameters.
+    """
+    rng = random.Random(seed)
+    graph = _new_graph(vertex_count, False, weights)
+
+    edges = []
+    # every vertex appears here once per edge end, so uniform choices are degree-weighted
+    endpoints = list(range(min(edges_per_vertex, vertex_count)))
+    for vertex_id in range(edges_per_vertex, vertex_count):
+        targets = set()
+        while len(targets) < edges_per_vertex:
+            targets.add(rng.choice(endpoints))
+        for target in targets:
+            edges.append((vertex_id, target))
+            endpoints.extend((vertex_id, target))
+    return _add_edges(graph, edges, weights, rng)
+
+
+def grid(rows, columns, seed=None, is_directed=False, weights=None):
+    """
+    Generate a rows x columns grid graph, like a street map. Vertex ids are
+    `row * columns + column`, and each vertex gets a 'pos' attribute of
+    (column, row) for the coordinate A* heuristics. Directed grids have
+    edges both ways.
+    See erdos_renyi for the other parameters. Weights should be at least 1
+    for the euclidean heuristic to stay admissible.
+    """
+    rng = random.Random(seed)
+    graph = _new_graph(rows * columns, is_directed, weights)
+
+    edges = []
+    for row in range(rows):
+        for column in range(columns):
+            vertex_id = row * columns + column
+            if column + 1 < columns:
+                edges.append((vertex_id, vertex_id + 1))
+            if row + 1 < rows:
+                edges.append((vertex_id, vertex_id + columns))
+    if is_directed:
+        edges += [(id2, id1) for id1, id2 in edges]
+
+    _add_edges(graph, edges, weights, rng)
+    graph.set_vertex_attributes('pos', {row * columns + column: (column, row)
+                                        for row in range(rows) for column in range(columns)})
+    return graph
+
+
+def random_dag(vertex_count, edge_probability, seed=None, weights=None):
+    """
+    Generate a random directed acyclic graph: an Erdős–Rényi graph whose
+    edges all point forwards in a random ordering of the vertices.
+    See erdos_renyi for the parameters.
+    """
+    rng = random.Random(seed)
+    graph = _new_graph(vertex_count, True, weights)
+    if edge_probability <= 0 or vertex_count < 2:
+        return graph
+
+    order = list(range(vertex_count))
+    rng.shuffle(order)
+    # every sampled pair (a, b) has a < b, so edges follow the shuffled order
+    pairs = _sample_edges(vertex_count * (vertex_count - 1) // 2, edge_probability, _pair_from_index, rng)
+    return _add_edges(graph, [(order[a], order[b]) for a, b in pairs], weights, rng)